@@ -0,0 +1,118 @@
+import asyncio
+from time import perf_counter
+
+from helpers import HTTP_POOL_MAXSIZE, execute_api_call, get_results
+
+# rows/columns requested per result page (API maximum per dimension is 1000)
+AFM_PAGE_LIMIT = 1000
+AFM_POLL_TIMEOUT = 300
+
+
+class AfmExecutionError(Exception):
+    pass
+
+
+class AsyncAfmClient:
+    """Execute many AFM definitions concurrently and stream their result pages.
+
+    Requests go through the shared pooled HTTP client (helpers.http_client) in worker threads, so the
+    number of requests in flight is capped by max_concurrency, at most the connection pool size.
+    Results not computed yet (202) are polled with exponential backoff.
+    """
+
+    def __init__(self, hostname: str, token: str, max_concurrency: int = HTTP_POOL_MAXSIZE,
+                 page_limit: int = AFM_PAGE_LIMIT, poll_timeout: float = AFM_POLL_TIMEOUT):
+        self.hostname = hostname
+        self.token = token
+        self.max_concurrency = min(max_concurrency, HTTP_POOL_MAXSIZE)
+        self.page_limit = page_limit
+        self.poll_timeout = poll_timeout
+        self._semaphore = None
+
+    async def _call(self, fn, *args, **kwargs):
+        async with self._semaphore:
+            return await asyncio.to_thread(fn, self.hostname, self.token, *args, **kwargs)
+
+    async def submit(self, workspace_id: str, afm: dict) -> dict:
+        """Submit an AFM execution, returns the execution response (result id and dimensions)."""
+        resp = await self._call(execute_api_call, workspace_id, afm)
+        if resp.status_code >= 300:
+            raise AfmExecutionError(f"execution failed ({resp.status_code}): {resp.text[:500]}")
+        return resp.json()["executionResponse"]
+
+    async def read_page(self, workspace_id: str, result_id: str, offset: list[int], limit: list[int]) -> dict:
+        """Read one result page, polling until the result is computed."""
+        delay = 0.1
+        started = perf_counter()
+        while True:
+            resp = await self._call(get_results, workspace_id, result_id, offset=offset, limit=limit)
+            if resp.status_code == 200:
+                return resp.json()
+            if resp.status_code != 202:
+                raise AfmExecutionError(f"reading result {result_id} failed ({resp.status_code}): {resp.text[:500]}")
+            if perf_counter() - started > self.poll_timeout:
+                raise AfmExecutionError(f"result {result_id} not ready in {self.poll_timeout} seconds")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5)
+
+    async def pages(self, workspace_id: str, afm: dict):
+        """Async generator of all result pages of one AFM execution.
+        The first page comes first, the rest as they complete (each page carries its paging.offset).
+        """
+        execution = await self.submit(workspace_id, afm)
+        result_id = execution["links"]["executionResult"]
+        dims = max(len(execution.get("dimensions") or []), 1)
+        limit = [self.page_limit] * dims
+        first = await self.read_page(workspace_id, result_id, [0] * dims, limit)
+        yield first
+        total = first["paging"]["total"]
+        offsets = [[r, c][:dims]
+                   for r in range(0, total[0], limit[0])
+                   for c in (range(0, total[1], limit[1]) if dims > 1 else [0])][1:]
+        for page in asyncio.as_completed([self.read_page(workspace_id, result_id, offset, limit) for offset in offsets]):
+            yield await page
+
+    async def stream(self, executions: dict):
+        """Run {key: (workspace_id, afm)} concurrently, yielding (key, page) as the pages arrive.
+        A failed execution yields (key, exception) and does not stop the others.
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        queue = asyncio.Queue()
+        done = object()
+
+        async def produce(key, workspace_id, afm):
+            try:
+                async for page in self.pages(workspace_id, afm):
+                    await queue.put((key, page))
+            except Exception as ex:
+                await queue.put((key, ex))
+            finally:
+                await queue.put((key, done))
+
+        tasks = [asyncio.create_task(produce(key, ws_id, afm)) for key, (ws_id, afm) in executions.items()]
+        pending = len(tasks)
+        try:
+            while pending:
+                key, item = await queue.get()
+                if item is done:
+                    pending -= 1
+                    continue
+                yield key, item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def execute_all(self, executions: dict) -> dict:
+        """Collect {key: [pages]} (or the exception of a failed execution) for {key: (workspace_id, afm)}."""
+        results = {key: [] for key in executions}
+        async for key, page in self.stream(executions):
+            if isinstance(page, Exception):
+                results[key] = page
+            elif isinstance(results[key], list):
+                results[key].append(page)
+        return results
+
+
+def execute_many(hostname: str, token: str, executions: dict, **kwargs) -> dict:
+    """Blocking wrapper of AsyncAfmClient.execute_all for scripts and Streamlit callbacks."""
+    return asyncio.run(AsyncAfmClient(hostname, token, **kwargs).execute_all(executions))
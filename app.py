@@ -1,19 +1,46 @@
 from pathlib import Path
 from collections import Counter
+from json import dumps
+from threading import Thread
+from time import time
+
+import attr
 
 import altair as alt
 import streamlit as st
 import streamlit.components.v1 as components
-from pandas import DataFrame, Timestamp, to_datetime
+from pandas import DataFrame, MultiIndex, Timestamp, concat, json_normalize, to_datetime
 
+from backup import DEFAULT_MAX_WORKERS as BACKUP_MAX_WORKERS, BackupEngine
 from common import LoadGoodDataSdk
+from crawler import DEFAULT_MAX_WORKERS as CRAWLER_MAX_WORKERS, WorkspaceCrawler
+from layout_store import LayoutStore
+from lineage import LineageIndex
+from schema_graph import DATASET_MEMBER_TYPES, center_candidates, graph_hash, reduce_graph
+from search_index import METRIC_SEARCH_FIELDS, VISUAL_SEARCH_FIELDS, SearchIndex
+from snapshot_store import SNAPSHOT_KEYS, SnapshotStore
+from workspace_cache import WorkspaceCache
 # from component import mycomponent # React specific component not relevant here
 from helpers import (
     csv_to_ldm_request, html_cytoscape, html_embedded_dashboard, time_it,
-    get_filter_contexts, probe_url,
+    get_filter_contexts, probe_url, workspace_model_version,
     process_filter_contexts_rest_response
 )
 
+# Shared (process-wide) workspace bundle cache limits
+WS_CACHE_MAX_BYTES = 512 * 2**20
+WS_CACHE_TTL = 3600
+# incremental refresh falls back to a full reload above this many changed objects (or share of the workspace)
+INCREMENTAL_MAX_CHANGES = 200
+INCREMENTAL_MAX_SHARE = 0.2
+# node limit of the level-of-detail graph sent to the browser
+GRAPH_MAX_NODES = 300
+# bundle keys of indexes derived from the frames, rebuilt on load instead of being stored in snapshots
+SEARCH_INDEX_KEY = "search_index"
+LINEAGE_KEY = "lineage"
+DERIVED_KEYS = (SEARCH_INDEX_KEY, LINEAGE_KEY)
+SEARCH_HELP = "Matches words, word prefixes, substrings and (when nothing else matches) similar words; best matches first."
+
 
 def _is_empty_analytics(analytics_obj) -> bool:
     """Check if analytics object is empty (no metrics, visualizations, or dashboards)."""
@@ -109,6 +136,24 @@ def get_analytics_lists(analytics_obj):
         db = getattr(analytics_obj, "dashboards", [])
     return list(mx or []), list(vz or []), list(db or [])
 
+def dashboard_visualization_ids(dashboard) -> list[str]:
+    """Ids of the visualizations placed on a dashboard (in layout order)."""
+    found = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            identifier = node.get("identifier")
+            if isinstance(identifier, dict) and identifier.get("type") in ("visualizationObject", "insight"):
+                found.append(identifier.get("id"))
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(getattr(dashboard, "content", None))
+    return list(dict.fromkeys(v for v in found if v))
+
 def build_dashboard_rows(dashboards, ws_id: str, fc_map: dict | None = None, base_host: str | None = None) -> list[dict]:
     """Build dashboard rows. If base_host is not provided, gets it from session state gd instance."""
     if base_host is None:
@@ -123,7 +168,7 @@ def build_dashboard_rows(dashboards, ws_id: str, fc_map: dict | None = None, bas
             "is_hidden": None,
             "is_valid": None,
             "created_at": getattr(d, "created_at", None) or getattr(d, "created", None),
-            "modified_at": getattr(d, "updated_at", None) or getattr(d, "updated", None),
+            "modified_at": getattr(d, "updated_at", None) or getattr(d, "updated", None) or getattr(d, "modified_at", None),
             "filter_context_id": None,
             "filter_context_definition": None,
             # enriched FC fields (computed best-effort)
@@ -215,7 +260,7 @@ def build_metric_rows(metrics: list) -> list[dict]:
             "maql": None,
             "format": None,
             "created_at": getattr(m, "created_at", None) or getattr(m, "created", None),
-            "modified_at": getattr(m, "updated_at", None) or getattr(m, "updated", None),
+            "modified_at": getattr(m, "updated_at", None) or getattr(m, "updated", None) or getattr(m, "modified_at", None),
             "tags": None,
         }
         content = getattr(m, "content", None)
@@ -266,7 +311,7 @@ def build_visual_rows(visuals: list) -> list[dict]:
             "description": getattr(v, "description", None),
             "type": None,
             "created_at": getattr(v, "created_at", None) or getattr(v, "created", None),
-            "modified_at": getattr(v, "updated_at", None) or getattr(v, "updated", None),
+            "modified_at": getattr(v, "updated_at", None) or getattr(v, "updated", None) or getattr(v, "modified_at", None),
             "tags": None,
             "bucket_count": None,
             "measures_count": None,
@@ -385,92 +430,383 @@ def _flatten_dict(d: dict, parent_key: str = "", sep: str = ".") -> dict:
     return items
 
 
-def build_filter_context_rows_from_analytics(analytics_obj, dashes_df: DataFrame | None = None) -> tuple[list[dict], dict]:
-    """Extract filter contexts directly from the analytics object.
-    Returns a tuple: (rows, fc_map) where fc_map maps filter context id -> definition dict.
+def _filter_list(definition) -> list:
+    """Filters of a filter context definition (supports the {"filterContext": {"filters": ...}} shape)."""
+    if not isinstance(definition, dict):
+        return []
+    if isinstance(definition.get("filters"), list):
+        return definition["filters"]
+    inner = definition.get("filterContext")
+    if isinstance(inner, dict) and isinstance(inner.get("filters"), list):
+        return inner["filters"]
+    return []
+
+
+def build_filter_context_frame(analytics_obj) -> tuple[DataFrame, dict]:
+    """Filter contexts of the analytics object as one DataFrame built column by column.
+    Returns (df, fc_map) where fc_map maps filter context id -> definition dict.
     """
-    rows: list[dict] = []
-    fc_map: dict = {}
-    # Dashboard usage counts if provided
-    used_counts = {}
-    if isinstance(dashes_df, DataFrame) and not dashes_df.empty and "filter_context_id" in dashes_df.columns:
-        try:
-            for v, cnt in dashes_df["filter_context_id"].value_counts().items():
-                used_counts[str(v)] = int(cnt)
-        except Exception:
-            used_counts = {}
-    # Try to read filter contexts from analytics as dict
+    fcs = [fc for fc in (getattr(analytics_obj, "filter_contexts", None) or []) if getattr(fc, "id", None)]
+    definitions = [fc.content if isinstance(fc.content, dict) else {} for fc in fcs]
+    filters = [_filter_list(d) for d in definitions]
+    df = DataFrame({
+        "id": [fc.id for fc in fcs],
+        "title": [fc.title for fc in fcs],
+        "description": [fc.description for fc in fcs],
+        "tags": [fc.tags for fc in fcs],
+        "created_at": [fc.created_at for fc in fcs],
+        "modified_at": [fc.modified_at for fc in fcs],
+        "filter_count": [len(f) for f in filters],
+        "attribute_filter_count": [sum(1 for x in f if isinstance(x, dict) and (x.get("attributeFilter") or x.get("attribute_filter"))) for f in filters],
+        "date_filter_count": [sum(1 for x in f if isinstance(x, dict) and (x.get("dateFilter") or x.get("date_filter"))) for f in filters],
+        "definition": definitions,
+        "dashboards_using": 0,
+    })
+    return df, dict(zip(df["id"].astype(str), definitions))
+
+
+def flatten_filter_definitions(fc_df: DataFrame, def_col: str = "definition", id_col: str = "id") -> DataFrame:
+    """Definitions flattened into def.* columns (def.filters[i].<path> per filter) in one columnar pass.
+    Unlike _flatten_dict, lists nested inside a filter (e.g. attribute element values) stay as list cells."""
+    if fc_df.empty or def_col not in fc_df.columns:
+        return fc_df
+    defs = [d if isinstance(d, dict) else {} for d in fc_df[def_col].tolist()]
+    base = fc_df.drop(columns=[def_col]).reset_index(drop=True)
+    # top-level keys except the filter list
+    top = json_normalize([{k: v for k, v in d.items() if k != "filters"} for d in defs], sep=".")
+    parts = [base, top.add_prefix("def.")]
+    # one row per (context, filter position), normalized at once and pivoted back to one row per context
+    exploded = DataFrame({"pos_row": range(len(defs)), "filter": [d.get("filters") if isinstance(d.get("filters"), list) else [] for d in defs]})
+    exploded = exploded.explode("filter").dropna(subset=["filter"])
+    if not exploded.empty:
+        exploded["pos"] = exploded.groupby("pos_row").cumcount()
+        flat = json_normalize(exploded["filter"].tolist(), sep=".")
+        flat.index = MultiIndex.from_arrays([exploded["pos_row"].to_numpy(), exploded["pos"].to_numpy()])
+        wide = flat.unstack(level=1).dropna(axis=1, how="all")
+        wide.columns = [f"def.filters[{pos}].{key}" for key, pos in wide.columns]
+        wide = wide[sorted(wide.columns, key=lambda c: (int(c[len("def.filters["):c.index("]")]), c))]
+        parts.append(wide.reindex(range(len(defs))))
+    return concat(parts, axis=1)
+
+
+def link_filter_contexts(fc_df: DataFrame, dashes_df: DataFrame) -> tuple[DataFrame, DataFrame, DataFrame]:
+    """Cross-reference filter contexts and dashboards with a single groupby/merge each.
+    Returns (fc_df with dashboards_using, flattened fc_df for display, dashes_df with filter_context_display).
+    """
+    if not dashes_df.empty and "filter_context_id" in dashes_df.columns:
+        usage = dashes_df.groupby(dashes_df["filter_context_id"].astype(str)).size()
+        if not fc_df.empty:
+            fc_df = fc_df.assign(dashboards_using=fc_df["id"].astype(str).map(usage).fillna(0).astype(int))
+        # "<fc id> • <title> • <n> filters • a:<x>/d:<y>" shown in the dashboards table
+        fc_id = dashes_df["filter_context_id"].fillna("").astype(str)
+        display = fc_id.where(fc_id != "", "-")
+        if not fc_df.empty:
+            info = fc_id.to_frame("id").merge(
+                fc_df[["id", "title", "filter_count", "attribute_filter_count", "date_filter_count"]].astype({"id": str}),
+                on="id", how="left")
+            info.index = dashes_df.index
+            has_info = info["filter_count"].notna()
+            title = info["title"].fillna("").astype(str)
+            detail = (
+                title.where(title == "", " • " + title)
+                + " • " + info["filter_count"].fillna(0).astype(int).astype(str) + " filters"
+                + " • a:" + info["attribute_filter_count"].fillna(0).astype(int).astype(str)
+                + "/d:" + info["date_filter_count"].fillna(0).astype(int).astype(str)
+            )
+            display = display.where(~has_info, fc_id + detail)
+        dashes_df = dashes_df.assign(filter_context_display=display)
+    return fc_df, flatten_filter_definitions(fc_df), dashes_df
+
+
+def load_workspace_bundle(gd: LoadGoodDataSdk, ws_id: str, ws_name: str) -> dict:
+    """Fetch analytics, LDM and PDM mapping of a workspace and prebuild the DataFrames rendered in the tabs."""
+    loaded_at = time()
+    # Analytics via high-level call (with retry logic)
+    analytics = None
+    # reported by the caller, this also runs in crawler and background refresh threads
+    load_warnings = []
     try:
-        a_dict = _to_plain_dict(analytics_obj) or {}
-        fcs = (
-            a_dict.get("filter_contexts")
-            or a_dict.get("filterContexts")
-            or []
-        )
-        for it in fcs or []:
-            # Support both dict items or SDK model dicts
-            if isinstance(it, dict):
-                fid = it.get("id") or (it.get("identifier") or {}).get("id")
-                att = it.get("attributes") if isinstance(it.get("attributes"), dict) else {}
-                title = att.get("title") or att.get("name")
-                desc = att.get("description")
-                tags = att.get("tags")
-                created = att.get("createdAt") or att.get("created_at") or att.get("created")
-                updated = att.get("modifiedAt") or att.get("updated_at") or att.get("updated")
-                # try multiple places for the definition
-                definition = (
-                    att.get("content") if isinstance(att.get("content"), dict) else None
-                ) or (
-                    it.get("content") if isinstance(it.get("content"), dict) else None
-                ) or (
-                    att.get("definition") if isinstance(att.get("definition"), dict) else None
-                ) or {}
-                # if filters are stored directly on attributes, coerce
-                if not definition and isinstance(att.get("filters"), list):
-                    definition = {"filters": att.get("filters")}
-                if fid:
-                    fc_map[str(fid)] = definition
-                    # compute counts from definition (various shapes)
-                    filt_list = []
-                    if isinstance(definition, dict):
-                        if isinstance(definition.get("filters"), list):
-                            filt_list = definition.get("filters")
-                        elif isinstance(definition.get("filterContext"), dict) and isinstance(definition.get("filterContext").get("filters"), list):
-                            filt_list = definition.get("filterContext").get("filters")
-                    rows.append({
-                        "id": fid,
-                        "title": title,
-                        "description": desc,
-                        "tags": tags,
-                        "created_at": created,
-                        "modified_at": updated,
-                        "filter_count": len(filt_list) if isinstance(filt_list, list) else 0,
-                        "definition": definition,
-                        "dashboards_using": used_counts.get(str(fid), 0),
-                    })
-    except Exception:
-        pass
-    # If nothing extracted, try to derive minimal rows from dashboards
-    if not rows and isinstance(dashes_df, DataFrame) and not dashes_df.empty and "filter_context_id" in dashes_df.columns:
+        analytics = gd.details(wks_id=ws_id, by="id")
+    except Exception as ex:
+        analytics = None
+        print(f"fetching analytics of workspace {ws_id} failed: {ex}")
+        load_warnings.append("Failed to fetch analytics for the selected workspace.")
+    # If analytics object exists but has no expected lists, retry by name
+    if analytics is not None and _is_empty_analytics(analytics):
         try:
-            fcs = dashes_df[["filter_context_id", "title"]].dropna().copy()
-            fcs = fcs.groupby("filter_context_id").first().reset_index()
-            for _, r in fcs.iterrows():
-                fid = str(r.get("filter_context_id"))
-                rows.append({
-                    "id": fid,
-                    "title": r.get("title"),
-                    "description": None,
-                    "tags": None,
-                    "created_at": None,
-                    "modified_at": None,
-                    "filter_count": None,
-                    "definition": None,
-                    "dashboards_using": used_counts.get(fid, 0),
-                })
+            analytics = gd.details(wks_id=ws_name, by="name")
         except Exception:
             pass
-    return rows, fc_map
+
+    # LDM via high-level call (SDK-first, API fallback handled internally)
+    datasets_rows, columns_rows, refs_rows = gd.load_ldm(ws_id)
+
+    # Ensure workspace-bound data sources are available for mapping and cache
+    workspace_datasources = _extract_datasources(gd)
+    # Attempt to enrich LDM columns with data source via PDM table mapping (best-effort)
+    # High-level call (SDK-first, API fallback handled internally)
+    table_to_ds = gd.load_pdm_mapping(ws_id)
+
+    # If we have any table->DS mapping, annotate columns_rows and datasets_rows summaries
+    if table_to_ds and columns_rows:
+        # Pre-build ds id->name map
+        dsid_to_name = {str(d.get("id")): d.get("name") for d in workspace_datasources}
+        for col in columns_rows:
+            # Prefer explicit source_table captured earlier
+            table_name = col.get("source_table")
+            sc = col.get("source_column")
+            # If no explicit table, try parsing from string-valued source_column
+            if not table_name and isinstance(sc, str):
+                s = sc
+                # Common forms: schema.table.column or table.column
+                parts = s.split(".")
+                if len(parts) >= 2:
+                    table_name = parts[-2]
+            # If source_column is dict, try its table field
+            if not table_name and isinstance(sc, dict):
+                table_name = sc.get("table") or sc.get("name") or sc.get("dataset")
+            if table_name:
+                key_full = str(table_name).lower()
+                key_base = key_full.split(".")[-1]
+                dsid = table_to_ds.get(key_full) or table_to_ds.get(key_base)
+                if dsid:
+                    col["data_source_id"] = dsid
+                    col["data_source_name"] = dsid_to_name.get(str(dsid))
+        # Aggregate to dataset level (majority data source among its columns)
+        ds_majority = {}
+        for ds in datasets_rows:
+            dsid = ds.get("dataset_id")
+            ds_cols = [c for c in columns_rows if c.get("dataset_id") == dsid and c.get("data_source_id")]
+            votes = Counter([c.get("data_source_id") for c in ds_cols])
+            if votes:
+                top_id, _ = votes.most_common(1)[0]
+                ds["data_source_id"] = top_id
+                ds["data_source_name"] = dsid_to_name.get(str(top_id))
+
+    # Build cache entry
+    ds_df = DataFrame(datasets_rows)
+    cols_df = DataFrame(columns_rows)
+    refs_df = DataFrame(refs_rows)
+    # Prebuild analytics dataframes for render (to avoid recomputation each rerun)
+    try:
+        def get_lists(aobj):
+            if not aobj:
+                return [], [], []
+            mx = getattr(aobj, "metrics", None) or getattr(aobj, "measures", [])
+            vz = getattr(aobj, "visualization_objects", None) or getattr(aobj, "visualizations", None) or getattr(aobj, "insights", [])
+            db = getattr(aobj, "analytical_dashboards", None) or getattr(aobj, "dashboards", [])
+            return list(mx or []), list(vz or []), list(db or [])
+        _mx, _vz, _db = get_lists(analytics)
+        pre_metrics_df = DataFrame(build_metric_rows(_mx)) if _mx else DataFrame()
+        pre_visuals_df = DataFrame(build_visual_rows(_vz)) if _vz else DataFrame()
+        pre_filter_ctx_df, fc_map = build_filter_context_frame(analytics)
+        pre_dashes_df = DataFrame(build_dashboard_rows(_db, ws_id, fc_map, base_host=gd._host)) if _db else DataFrame()
+        pre_filter_ctx_df, pre_filter_ctx_flat_df, pre_dashes_df = link_filter_contexts(pre_filter_ctx_df, pre_dashes_df)
+    except Exception:
+        pre_metrics_df = DataFrame(); pre_visuals_df = DataFrame(); pre_dashes_df = DataFrame(); pre_filter_ctx_df = DataFrame()
+        pre_filter_ctx_flat_df = DataFrame()
+    return with_derived_indexes({
+        "name": ws_name,
+        "loaded_at": loaded_at,
+        "load_warnings": load_warnings,
+        "analytics": analytics,
+        "ldm_ds_df": ds_df,
+        "ldm_cols_df": cols_df,
+        "ldm_refs_df": refs_df,
+        "ldm_counts": {"tables": len(ds_df), "columns": len(cols_df)},
+        "datasources": workspace_datasources,
+        "metrics_df": pre_metrics_df,
+        "visuals_df": pre_visuals_df,
+        "dashes_df": pre_dashes_df,
+        "filter_ctx_df": pre_filter_ctx_df,
+        "filter_ctx_flat_df": pre_filter_ctx_flat_df,
+    })
+
+
+def with_derived_indexes(bundle: dict) -> dict:
+    """Add search indexes over the metrics and visualizations frames and the metric lineage to the bundle."""
+    bundle[SEARCH_INDEX_KEY] = {
+        "metrics": SearchIndex.from_frame(bundle.get("metrics_df", DataFrame()), METRIC_SEARCH_FIELDS),
+        "visuals": SearchIndex.from_frame(bundle.get("visuals_df", DataFrame()), VISUAL_SEARCH_FIELDS),
+    }
+    bundle[LINEAGE_KEY] = LineageIndex.from_metrics(bundle.get("metrics_df", DataFrame()))
+    return bundle
+
+
+def lineage_frame(keys) -> DataFrame:
+    """"type/id" lineage keys as a two column DataFrame."""
+    return DataFrame([key.split("/", 1) for key in sorted(keys)], columns=["type", "id"])
+
+
+def search_frame(df: DataFrame, index: SearchIndex | None, fields: dict, query: str, tags_query: str = "") -> DataFrame:
+    """Rows of a bundle frame matching the search (best first) and the tags filter."""
+    if df.empty or not (query or tags_query):
+        return df
+    if index is None or index.size != len(df):
+        # bundle from before the index existed or a frame rebuilt since
+        index = SearchIndex.from_frame(df, fields)
+    rows = index.search(query) if query else list(range(len(df)))
+    if tags_query:
+        tagged = set(index.search(tags_query, fields=("tags",), fuzzy=False))
+        rows = [row for row in rows if row in tagged]
+    return df.iloc[rows]
+
+
+def _patch_frame(df: DataFrame, rows: list[dict]) -> DataFrame:
+    """Replace rows of df by id with the given rows (appending new ids)."""
+    if not rows:
+        return df
+    patch_df = DataFrame(rows)
+    if df.empty or "id" not in df.columns:
+        return patch_df
+    return concat([df[~df["id"].isin(patch_df["id"])], patch_df], ignore_index=True)
+
+
+def refresh_workspace_bundle(gd: LoadGoodDataSdk, ws_id: str, ws_name: str, bundle: dict) -> dict:
+    """Patch a loaded bundle with the analytics objects modified since it was loaded.
+    Falls back to a full load when objects were deleted or the delta is too large. The LDM is kept as is.
+    """
+    since = bundle.get("loaded_at") or bundle.get("snapshot_saved_at")
+    analytics = bundle.get("analytics")
+    if not since or analytics is None:
+        return load_workspace_bundle(gd, ws_id, ws_name)
+    loaded_at = time()
+    try:
+        changes = gd.modified_analytics(ws_id, since)
+    except Exception as ex:
+        print(f"incremental refresh of workspace {ws_id} failed, reloading: {ex}")
+        return load_workspace_bundle(gd, ws_id, ws_name)
+
+    patched = {}
+    changed_count, total_count = 0, 0
+    for attr_name, (objects, total) in changes.items():
+        current = list(getattr(analytics, attr_name, None) or [])
+        changed_ids = {o.id for o in objects}
+        merged = [o for o in current if o.id not in changed_ids] + objects
+        # fewer objects on the server than cached (with the changes applied) means deletions
+        if len(merged) != total:
+            print(f"{attr_name} of workspace {ws_id} changed in count ({len(merged)} cached, {total} on server), reloading")
+            return load_workspace_bundle(gd, ws_id, ws_name)
+        patched[attr_name] = merged
+        changed_count += len(objects)
+        total_count += total
+    if changed_count > min(INCREMENTAL_MAX_CHANGES, INCREMENTAL_MAX_SHARE * total_count):
+        print(f"{changed_count} objects of workspace {ws_id} changed, reloading")
+        return load_workspace_bundle(gd, ws_id, ws_name)
+    new_bundle = {k: v for k, v in bundle.items() if k not in SNAPSHOT_KEYS}
+    new_bundle["loaded_at"] = loaded_at
+    if not changed_count:
+        return new_bundle
+    # copy instead of mutating the layer shared with other sessions
+    new_bundle["analytics"] = attr.evolve(analytics, **patched)
+    new_bundle["metrics_df"] = _patch_frame(bundle["metrics_df"], build_metric_rows(changes["metrics"][0]))
+    new_bundle["visuals_df"] = _patch_frame(bundle["visuals_df"], build_visual_rows(changes["visualization_objects"][0]))
+    changed_dashes = changes["analytical_dashboards"][0]
+    if changes["filter_contexts"][0]:
+        fc_df, fc_map = build_filter_context_frame(new_bundle["analytics"])
+        # dashboards embed counts of their filter context, rebuild those pointing to the changed ones
+        changed_fc_ids = {str(fc.id) for fc in changes["filter_contexts"][0]}
+        dashes_df = bundle["dashes_df"]
+        if not dashes_df.empty and "filter_context_id" in dashes_df.columns:
+            affected = set(dashes_df.loc[dashes_df["filter_context_id"].astype(str).isin(changed_fc_ids), "id"])
+            changed_dash_ids = {d.id for d in changed_dashes}
+            changed_dashes = changed_dashes + [d for d in patched["analytical_dashboards"]
+                                               if d.id in affected and d.id not in changed_dash_ids]
+    else:
+        fc_df = bundle["filter_ctx_df"]
+        fc_map = dict(zip(fc_df["id"].astype(str), fc_df["definition"])) if "definition" in fc_df.columns else {}
+    dashes_df = _patch_frame(bundle["dashes_df"], build_dashboard_rows(changed_dashes, ws_id, fc_map, base_host=gd._host))
+    new_bundle["filter_ctx_df"], new_bundle["filter_ctx_flat_df"], new_bundle["dashes_df"] = link_filter_contexts(fc_df, dashes_df)
+    print(f"workspace {ws_id} patched with {changed_count} changed objects")
+    return with_derived_indexes(new_bundle)
+
+
+def load_workspace_bundle_snapshot(gd: LoadGoodDataSdk, ws_id: str, ws_name: str, use_snapshot: bool = True,
+                                   previous: dict | None = None, fingerprint: str = "") -> dict:
+    """Load the bundle incrementally on top of a previous bundle when there is one, else serve the on-disk
+    snapshot of the current model version (fingerprint) when available, refreshing it in background, else
+    load it from GoodData - on top of an older snapshot when there is one - and store the snapshot."""
+    store = get_snapshot_store()
+    if use_snapshot and previous is None:
+        snapshot = store.load(gd._host, ws_id)
+        if snapshot is not None:
+            with_derived_indexes(snapshot)
+        if snapshot is not None and snapshot["snapshot_fingerprint"] == fingerprint:
+            Thread(target=_refresh_snapshot, args=(gd._host, gd._token, ws_id, ws_name), daemon=True).start()
+            return snapshot
+        # taken before the model changed, patched now rather than served stale
+        previous = snapshot
+    if previous is not None:
+        bundle = refresh_workspace_bundle(gd, ws_id, ws_name, previous)
+    else:
+        bundle = load_workspace_bundle(gd, ws_id, ws_name)
+    store.save(gd._host, ws_id, bundle, exclude=DERIVED_KEYS, fingerprint=fingerprint)
+    return bundle
+
+
+def _refresh_snapshot(host: str, token: str, ws_id: str, ws_name: str):
+    # runs outside the script thread: its own SDK wrapper (details() mutates the wrapper's state), no st.* calls,
+    # failures are left in get_refresh_failures() for the next rerun to show
+    ws_cache = get_workspace_cache()
+    key = ws_cache.key(host, ws_id)
+    try:
+        bundle = load_workspace_bundle(LoadGoodDataSdk(host, token), ws_id, ws_name)
+        get_snapshot_store().save(host, ws_id, bundle, exclude=DERIVED_KEYS, fingerprint=key[2][0])
+        ws_cache.put(key, bundle)
+        get_refresh_failures().pop((host, ws_id), None)
+    except Exception as ex:
+        print(f"background refresh of workspace {ws_id} failed: {ex}")
+        get_refresh_failures()[(host, ws_id)] = str(ex)
+
+
+@st.cache_resource
+def get_refresh_failures() -> dict:
+    """{(host, workspace id): error} of failed background snapshot refreshes."""
+    return {}
+
+
+@st.cache_resource
+def get_workspace_cache() -> WorkspaceCache:
+    # the model version comes from the server, so changes made outside the app are picked up
+    return WorkspaceCache(max_bytes=WS_CACHE_MAX_BYTES, ttl=WS_CACHE_TTL,
+                          fingerprint=lambda host, ws_id: workspace_model_version(host, st.secrets["GOODDATA_TOKEN"], ws_id))
+
+
+@st.cache_resource
+def get_snapshot_store() -> SnapshotStore:
+    return SnapshotStore()
+
+
+@st.cache_resource
+def get_layout_store() -> LayoutStore:
+    return LayoutStore()
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_target_sdk(host: str, token: str) -> LoadGoodDataSdk:
+    """SDK wrapper of another environment (layout promotion target)."""
+    return LoadGoodDataSdk(host, token)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def load_graph_elements(_gd: LoadGoodDataSdk, host: str, ws_id: str, version: tuple) -> tuple[list[dict], str]:
+    """Dependency graph elements of a workspace and their hash, cached per workspace model version."""
+    elements = _gd.ws_schema_elements(ws_id)
+    return elements, graph_hash(elements)
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def graph_centers(graph_key: str, _elements: list[dict], types: tuple) -> dict:
+    """{node id: label} of the nodes a reduced graph can be centered on, cached per graph hash and node types."""
+    return center_candidates(_elements, collapse=True, types=types)
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def layout_graph(graph_key: str, _elements: list[dict], types: tuple, center: str | None, hops: int,
+                 max_nodes: int) -> tuple[str, int]:
+    """Reduced graph with computed positions (JSON) and its node count, cached per graph hash and view options."""
+    reduced = reduce_graph(_elements, collapse=True, types=types, center=center, hops=hops, max_nodes=max_nodes)
+    return dumps(reduced), sum(1 for el in reduced if "source" not in el["data"])
 
 
 def main():
@@ -481,9 +817,6 @@ def main():
         st.session_state["gd"] = LoadGoodDataSdk(st.secrets["GOODDATA_HOST"], st.secrets["GOODDATA_TOKEN"])
     if "timing" not in st.session_state:
         st.session_state["timing"] = []
-    # Unified per-workspace cache
-    if "ws_cache" not in st.session_state:
-        st.session_state["ws_cache"] = {}
     if "current_ws_id" not in st.session_state:
         st.session_state["current_ws_id"] = None
 
@@ -505,117 +838,39 @@ def main():
         # Then the workspace selector and actions
         ws_name = st.selectbox("Select a workspace", options=[w.name for w in st.session_state["gd"].workspaces])
         refresh_ws = st.button("Reload workspace details")
+        full_reload = st.checkbox("Full reload (including LDM)", help="Otherwise only analytics objects modified since the last load are fetched")
         # Resolve workspace id
         ws_obj = st.session_state["gd"].specific(ws_name, of_type="workspace", by="name")
         ws_id = ws_obj.id
-        # Ensure cache is populated on selection change or explicit reload
-        ws_cache = st.session_state.get("ws_cache", {})
-        need_load = refresh_ws or (st.session_state.get("current_ws_id") != ws_id) or (ws_id not in ws_cache)
-        if need_load:
-            with st.spinner("Loading workspace metadata..."):
-                # Analytics via high-level call (with retry logic)
-                analytics = None
-                try:
-                    analytics = st.session_state["gd"].details(wks_id=ws_id, by="id")
-                except Exception:
-                    analytics = None
-                    st.warning("Failed to fetch analytics for the selected workspace.")
-                # If analytics object exists but has no expected lists, retry by name
-                if analytics is not None and _is_empty_analytics(analytics):
-                    try:
-                        analytics = st.session_state["gd"].details(wks_id=ws_name, by="name")
-                    except Exception:
-                        pass
-                
-                # LDM via high-level call (SDK-first, API fallback handled internally)
-                datasets_rows, columns_rows, refs_rows = st.session_state["gd"].load_ldm(ws_id)
-
-                # Ensure workspace-bound data sources are available for mapping and cache
-                workspace_datasources = _extract_datasources(st.session_state.get("gd"))
-                # Attempt to enrich LDM columns with data source via PDM table mapping (best-effort)
-                # High-level call (SDK-first, API fallback handled internally)
-                table_to_ds = st.session_state["gd"].load_pdm_mapping(ws_id)
-
-                # If we have any table->DS mapping, annotate columns_rows and datasets_rows summaries
-                if table_to_ds and columns_rows:
-                    # Pre-build ds id->name map
-                    dsid_to_name = {str(d.get("id")): d.get("name") for d in workspace_datasources}
-                    for col in columns_rows:
-                        # Prefer explicit source_table captured earlier
-                        table_name = col.get("source_table")
-                        sc = col.get("source_column")
-                        # If no explicit table, try parsing from string-valued source_column
-                        if not table_name and isinstance(sc, str):
-                            s = sc
-                            # Common forms: schema.table.column or table.column
-                            parts = s.split(".")
-                            if len(parts) >= 2:
-                                table_name = parts[-2]
-                        # If source_column is dict, try its table field
-                        if not table_name and isinstance(sc, dict):
-                            table_name = sc.get("table") or sc.get("name") or sc.get("dataset")
-                        if table_name:
-                            key_full = str(table_name).lower()
-                            key_base = key_full.split(".")[-1]
-                            dsid = table_to_ds.get(key_full) or table_to_ds.get(key_base)
-                            if dsid:
-                                col["data_source_id"] = dsid
-                                col["data_source_name"] = dsid_to_name.get(str(dsid))
-                    # Aggregate to dataset level (majority data source among its columns)
-                    ds_majority = {}
-                    for ds in datasets_rows:
-                        dsid = ds.get("dataset_id")
-                        ds_cols = [c for c in columns_rows if c.get("dataset_id") == dsid and c.get("data_source_id")]
-                        votes = Counter([c.get("data_source_id") for c in ds_cols])
-                        if votes:
-                            top_id, _ = votes.most_common(1)[0]
-                            ds["data_source_id"] = top_id
-                            ds["data_source_name"] = dsid_to_name.get(str(top_id))
-
-                # Build cache entry and set current ws
-                ds_df = DataFrame(datasets_rows)
-                cols_df = DataFrame(columns_rows)
-                refs_df = DataFrame(refs_rows)
-                # Prebuild analytics dataframes for render (to avoid recomputation each rerun)
-                try:
-                    def get_lists(aobj):
-                        if not aobj:
-                            return [], [], []
-                        mx = getattr(aobj, "metrics", None) or getattr(aobj, "measures", [])
-                        vz = getattr(aobj, "visualization_objects", None) or getattr(aobj, "visualizations", None) or getattr(aobj, "insights", [])
-                        db = getattr(aobj, "analytical_dashboards", None) or getattr(aobj, "dashboards", [])
-                        return list(mx or []), list(vz or []), list(db or [])
-                    _mx, _vz, _db = get_lists(analytics)
-                    pre_metrics_df = DataFrame(build_metric_rows(_mx)) if _mx else DataFrame()
-                    pre_visuals_df = DataFrame(build_visual_rows(_vz)) if _vz else DataFrame()
-                    pre_filter_ctx_rows, fc_map = build_filter_context_rows_from_analytics(analytics)
-                    pre_filter_ctx_df = DataFrame(pre_filter_ctx_rows)
-                    pre_dashes_df = DataFrame(build_dashboard_rows(_db, ws_id, fc_map)) if _db else DataFrame()
-                except Exception:
-                    pre_metrics_df = DataFrame(); pre_visuals_df = DataFrame(); pre_dashes_df = DataFrame(); pre_filter_ctx_df = DataFrame()
-                st.session_state.setdefault("ws_cache", {})[ws_id] = {
-                    "name": ws_name,
-                    "analytics": analytics,
-                    "ldm_ds_df": ds_df,
-                    "ldm_cols_df": cols_df,
-                    "ldm_refs_df": refs_df,
-                    "ldm_counts": {"tables": len(ds_df), "columns": len(cols_df)},
-                    "datasources": workspace_datasources,
-                    "metrics_df": pre_metrics_df,
-                    "visuals_df": pre_visuals_df,
-                    "dashes_df": pre_dashes_df,
-                    "filter_ctx_df": pre_filter_ctx_df,
-                }
-                st.session_state["current_ws_id"] = ws_id
+        # Ensure the shared cache holds the workspace bundle (loaded once for all sessions)
+        ws_cache = get_workspace_cache()
+        host = st.session_state["gd"]._host
+        if refresh_ws:
+            # drop the workspace lookup tables and start a new version of the shared bundle
+            st.session_state["gd"].reload(ws_id)
+            ws_cache.invalidate(host, ws_id)
+        with st.spinner("Loading workspace metadata..."):
+            # a new version (Reload or a model change on the server) patches the bundle of the previous one
+            ws_key = ws_cache.key(host, ws_id)
+            cache_entry = ws_cache.get_or_load(
+                ws_key,
+                lambda: load_workspace_bundle_snapshot(st.session_state["gd"], ws_id, ws_name, use_snapshot=not refresh_ws,
+                                                       previous=None if full_reload else ws_cache.latest(host, ws_id),
+                                                       fingerprint=ws_key[2][0]),
+            )
+        st.session_state["current_ws_id"] = ws_id
 
         # Sidebar cache summary
-        ws_cache = st.session_state.get("ws_cache", {})
-        cache_entry_sb = ws_cache.get(ws_id, {})
-        counts_sb = cache_entry_sb.get("ldm_counts", {"tables": 0, "columns": 0})
+        counts_sb = cache_entry.get("ldm_counts", {"tables": 0, "columns": 0})
         st.caption(f"Cached: {counts_sb.get('tables', 0)} tables • {counts_sb.get('columns', 0)} columns")
+        for load_warning in cache_entry.get("load_warnings") or ():
+            st.warning(load_warning)
+        refresh_failure = get_refresh_failures().pop((st.session_state["gd"]._host, ws_id), None)
+        if refresh_failure:
+            st.warning(f"Background refresh of the workspace snapshot failed: {refresh_failure}")
+        if cache_entry.get("snapshot_saved_at"):
+            st.caption(f"Served from snapshot of {Timestamp.fromtimestamp(cache_entry['snapshot_saved_at']):%Y-%m-%d %H:%M}, refreshing in background")
         with st.expander("Data actions"):
-            current_ws_id = st.session_state.get("current_ws_id")
-            cache_entry = ws_cache.get(current_ws_id) or {}
             analytics = cache_entry.get("analytics")
 
             viz_options = [d.title for d in getattr(analytics, "visualization_objects", [])] if analytics else []
@@ -666,22 +921,88 @@ def main():
             )
             uploaded_file = st.file_uploader("2. Upload your CSV file", type=["csv"])
             upload_csv = st.button("3. Process CSV")
+        with st.expander("Organization audit"):
+            crawl_workers = st.number_input("Concurrent workspaces", min_value=1, max_value=32,
+                                            value=CRAWLER_MAX_WORKERS, key="crawl_workers")
+            crawl_resume = st.checkbox("Resume an interrupted crawl", value=True, key="crawl_resume")
+            crawl = st.button("Crawl all workspaces")
+            show_org_tables = st.button("Show organization-wide tables")
         with st.expander("Backup & Restore"):
-            st.write("Need to find a way to backup and restore using python sdk")
-            backup = st.button("Backup selected workspace")
-            # backup_ldm = st.download_button("Backup data model for selected workspace", st.session_state["analytics"])
-            # backup_analytics = st.download_button("Backup analytics for selected workspace", st.session_state["analytics"])
+            backup_all = st.checkbox("All workspaces", key="backup_all")
+            backup_workers = st.number_input("Concurrent workspaces", min_value=1, max_value=32,
+                                             value=BACKUP_MAX_WORKERS, key="backup_workers")
+            backup = st.button("Backup selected workspace" if not backup_all else "Backup all workspaces")
+            backup_engine = BackupEngine(st.session_state["gd"], max_workers=int(backup_workers))
+            backup_files = [p.name for p in reversed(backup_engine.backups(ws_id))]
+            restore_file = st.selectbox("Backup to restore", backup_files, key="restore_file")
+            restore_ldm = st.checkbox("Restore the LDM as well", value=False, key="restore_ldm")
+            restore = st.button("Restore selected workspace", disabled=not backup_files)
+            st.divider()
+            st.caption("Layout snapshots (content-addressed, restores only changed objects)")
+            layout_snapshot = st.button("Snapshot layouts of selected workspace")
+            layout_names = list(reversed(get_layout_store().snapshots(st.session_state["gd"]._host, ws_id)))
+            layout_name = st.selectbox("Snapshot", layout_names, key="layout_snapshot")
+            layout_target_host = st.text_input("Target host", placeholder="Current host", key="layout_target_host",
+                                               help="Another environment (with its API token) promotes the snapshot there")
+            layout_target_token = st.text_input("Target API token", type="password", key="layout_target_token",
+                                                disabled=not layout_target_host)
+            layout_gd = get_target_sdk(layout_target_host, layout_target_token) \
+                if layout_target_host and layout_target_token else st.session_state["gd"]
+            layout_target = st.selectbox("Target workspace", [w.name for w in layout_gd.workspaces],
+                                         index=None, placeholder="Selected workspace", key="layout_target",
+                                         help="Another workspace promotes the snapshot there")
+            layout_diff = st.button("Diff with live workspace", disabled=not layout_names)
+            layout_restore = st.button("Restore changed objects", disabled=not layout_names)
 
     active_ws = st.session_state["gd"].specific(ws_name, of_type="workspace", by="name")
     #if backup_analytics:
     #    st.write(st.session_state["gd"].export(active_ws))
     if backup:
-        st.session_state["gd"].export(wks_id=active_ws.id, location=Path.cwd())
-        exported_path = Path.cwd().joinpath("gooddata_layouts", org.id, "workspaces", active_ws.id, "analytics_model")
-        st.write(f"Workspace: {active_ws.name} backed up to /gooddata_layouts/..., below a list of folders")
-        for folder in exported_path.iterdir():
-            for file in exported_path.joinpath(folder).glob("*.yaml"):
-                st.write(file)
+        backup_ids = [w.id for w in st.session_state["gd"].workspaces] if backup_all else [active_ws.id]
+        progress_bar = st.progress(0.0, text="Backing up workspaces...")
+        stats = backup_engine.run(backup_ids, progress=lambda done, total, done_id: progress_bar.progress(
+            done / total, text=f"{done}/{total} workspaces backed up ({done_id})"))
+        progress_bar.empty()
+        st.write(f"{stats['workspaces']} workspaces backed up to {backup_engine.root}: {stats['objects']} objects "
+                 f"({stats['changed']} new or changed), {stats['bytes'] / 1024:.1f} KiB in {stats['seconds']}s")
+        st.dataframe(DataFrame(stats["reports"]), width='stretch')
+        if stats["failed"]:
+            st.warning(f"{len(stats['failed'])} workspaces failed: {stats['failed']}")
+    elif restore and restore_file:
+        report = backup_engine.restore(active_ws.id, backup=restore_file, ldm=restore_ldm)
+        st.write(f"Workspace: {active_ws.name} restored from {restore_file} ({report['objects']} objects, "
+                 f"{report['seconds']}s)")
+    elif layout_snapshot:
+        report = get_layout_store().snapshot(st.session_state["gd"], active_ws.id)
+        st.write(f"Workspace: {active_ws.name} snapshot {report['snapshot']}: {report['objects']} objects, "
+                 f"{report['new_objects']} new ({report['bytes'] / 1024:.1f} KiB) in {report['seconds']}s")
+    elif (layout_diff or layout_restore) and layout_name:
+        target_id = layout_gd.get_id(layout_target, of_type="workspace") if layout_target else active_ws.id
+        report = get_layout_store().restore(layout_gd, active_ws.id, layout_name, target_ws_id=target_id,
+                                            source_host=st.session_state["gd"]._host, dry_run=layout_diff)
+        st.write(f"Snapshot {layout_name} of {active_ws.name} -> workspace {target_id} on {layout_gd._host}: "
+                 f"{report['upserted']} objects to restore, {report['deleted']} to delete "
+                 f"({report['bytes_sent'] / 1024:.1f} KiB) in {report['seconds']}s")
+        if layout_diff:
+            st.dataframe(DataFrame([{"object": key, "action": action} for action in ("upserts", "deletes")
+                                    for key in report[action]]), width='stretch')
+    elif crawl or show_org_tables:
+        crawler = WorkspaceCrawler(st.session_state["gd"], load_workspace_bundle, get_snapshot_store(),
+                                   max_workers=int(crawl_workers), exclude=DERIVED_KEYS,
+                                   fingerprint=get_workspace_cache().fingerprint)
+        if crawl:
+            progress_bar = st.progress(0.0, text="Crawling workspaces...")
+            stats = crawler.run(resume=crawl_resume, progress=lambda done, total, crawled_id: progress_bar.progress(
+                done / total, text=f"{done}/{total} workspaces crawled ({crawled_id})"))
+            progress_bar.empty()
+            st.write(stats)
+            if stats["failed"]:
+                st.warning(f"{len(stats['failed'])} workspaces failed, crawl again to retry them")
+        org_tabs = crawler.org_tables()
+        for (name, org_df), org_tab in zip(org_tabs.items(), st.tabs([n.title() for n in org_tabs])):
+            with org_tab:
+                st.caption(f"{len(org_df)} {name} in {org_df['workspace_id'].nunique() if not org_df.empty else 0} workspaces")
+                st.dataframe(org_df, width='stretch')
     elif clear_cache:
         ds_active = st.session_state["gd"].get_id(name=ds_list, of_type="datasource")
         st.session_state["gd"].clear_cache(ds_id=ds_active)
@@ -739,14 +1060,22 @@ def main():
             st.info("[Placeholder] CSV S3 uploader logic will be implemented here.")
         elif prep_option == "LDM preparation":
             st.write("LDM Preparation: Generating request based on CSV fields...")
-            st.write(csv_to_ldm_request(uploaded_file))
+            ldm_prep = csv_to_ldm_request(uploaded_file, data_source_id=assigned_ds.get("id") if assigned_ds else "")
+            st.caption("Column profile (types, cardinality, date formats, key candidates)")
+            st.dataframe(ldm_prep["profile"], width='stretch')
+            ldm_col, pdm_col = st.columns(2)
+            with ldm_col:
+                st.caption("Declarative LDM")
+                st.json(ldm_prep["ldm"], expanded=False)
+                st.download_button("Download LDM", dumps(ldm_prep["ldm"], indent=2), file_name="ldm.json", mime="application/json")
+            with pdm_col:
+                st.caption("Declarative PDM")
+                st.json(ldm_prep["pdm"], expanded=False)
+                st.download_button("Download PDM", dumps(ldm_prep["pdm"], indent=2), file_name="pdm.json", mime="application/json")
     else:
         st.write(f"Selected workspace: {active_ws.name}")
 
         # Read from unified cache
-        ws_id_active = st.session_state.get("current_ws_id")
-        ws_cache = st.session_state.get("ws_cache", {})
-        cache_entry = ws_cache.get(ws_id_active, {})
         analytics = cache_entry.get("analytics")
 
         # Prefer prebuilt DataFrames from cache; compute only if missing
@@ -757,15 +1086,10 @@ def main():
             mx_list, vz_list, db_list = get_analytics_lists(analytics)
             metrics_df = DataFrame(build_metric_rows(mx_list)) if mx_list else DataFrame()
             visuals_df = DataFrame(build_visual_rows(vz_list)) if vz_list else DataFrame()
-            pre_filter_ctx_rows, fc_map = build_filter_context_rows_from_analytics(analytics)
+            filter_ctx_df, fc_map = build_filter_context_frame(analytics)
             dashes_df = DataFrame(build_dashboard_rows(db_list, active_ws.id, fc_map)) if db_list else DataFrame()
-            # Store back into cache for reuse
-            if cache_entry is not None:
-                cache_entry["metrics_df"] = metrics_df
-                cache_entry["visuals_df"] = visuals_df
-                cache_entry["dashes_df"] = dashes_df
-                # also (re)build filter contexts
-                cache_entry["filter_ctx_df"] = DataFrame(pre_filter_ctx_rows)
+            # cache entries are shared and sized once when stored, the frames stay local to this run
+            _, _, dashes_df = link_filter_contexts(filter_ctx_df, dashes_df)
 
         tab_overview, tab_metrics, tab_visuals, tab_dash, tab_filters, tab_ldm, tab_graph = st.tabs([
             "Overview", "Metrics", "Visualizations", "Dashboards", "Filter Contexts", "LDM", "Graph"
@@ -788,69 +1112,81 @@ def main():
         with tab_metrics:
             st.subheader("Metrics")
             col1, col2, col3 = st.columns([1, 1, 1])
-            q_title = col1.text_input("Title contains", key="mx_title_q")
+            q_search = col1.text_input("Search", key="mx_search_q", help=SEARCH_HELP)
             q_tags = col2.text_input("Tags contains", key="mx_tags_q")
             show_full = col3.checkbox("Show full structure", value=False, key="mx_full")
-            df = metrics_df.copy()
+            df = metrics_df
             # Ensure enriched columns are present even if cache predates the change
             required_cols = {"description", "maql", "format", "created_at", "modified_at"}
             if not df.empty and not required_cols.issubset(set(df.columns)):
                 try:
                     mx_list, _, _ = get_analytics_lists(analytics)
                     df = DataFrame(build_metric_rows(mx_list)) if mx_list else DataFrame()
-                    # update cache so subsequent renders use enriched columns
-                    cache_entry = st.session_state.get("ws_cache", {}).get(st.session_state.get("current_ws_id"), None)
-                    if isinstance(cache_entry, dict):
-                        cache_entry["metrics_df"] = df
                 except Exception:
                     pass
-            # Optional full structure view
+            # search the indexed frame, the full structure view shows the same objects in the same order
+            df = search_frame(df, cache_entry.get(SEARCH_INDEX_KEY, {}).get("metrics"), METRIC_SEARCH_FIELDS, q_search, q_tags)
             if show_full and analytics is not None:
                 try:
                     mx_list, _, _ = get_analytics_lists(analytics)
-                    df = DataFrame(build_flat_rows(mx_list)) if mx_list else DataFrame()
+                    full_df = DataFrame(build_flat_rows(mx_list)) if mx_list else DataFrame()
+                    if (q_search or q_tags) and "id" in df.columns and "id" in full_df.columns:
+                        full_df = df[["id"]].merge(full_df, on="id", how="inner")
+                    df = full_df
                 except Exception:
                     pass
             if not df.empty:
-                if q_title and "title" in df.columns:
-                    df = df[df["title"].astype(str).str.contains(q_title, case=False, na=False)]
-                if q_tags and "tags" in df.columns:
-                    df = df[df["tags"].astype(str).str.contains(q_tags, case=False, na=False)]
                 st.dataframe(df, width='stretch')
+            elif q_search or q_tags:
+                st.info("No metrics match the search.")
             else:
                 st.info("No metrics found in this workspace.")
+            lineage = cache_entry.get(LINEAGE_KEY) or LineageIndex.from_metrics(metrics_df)
+            if lineage.stats()["metrics"]:
+                with st.expander("Lineage (from MAQL)"):
+                    lineage_ids = sorted(metrics_df["id"].astype(str).tolist())
+                    picked = st.selectbox("Metric", lineage_ids, key="mx_lineage_id")
+                    picked_key = f"metric/{picked}"
+                    c1, c2 = st.columns(2)
+                    c1.markdown("**Upstream** (referenced, transitively)")
+                    c1.dataframe(lineage_frame(lineage.upstream(picked_key)), width='stretch')
+                    c2.markdown("**Downstream** (metrics impacted by a change)")
+                    c2.dataframe(lineage_frame(lineage.downstream(picked_key)), width='stretch')
+                    missing = lineage.missing()
+                    if missing:
+                        st.warning(f"{len(missing)} metrics reference undefined metrics: "
+                                   + ", ".join(f"{k} -> {', '.join(sorted(v))}" for k, v in list(missing.items())[:10]))
 
         with tab_visuals:
             st.subheader("Visualizations")
             col1, col2, col3 = st.columns([1, 1, 1])
-            q_title = col1.text_input("Title contains", key="viz_title_q")
+            q_search = col1.text_input("Search", key="viz_search_q", help=SEARCH_HELP)
             q_tags = col2.text_input("Tags contains", key="viz_tags_q")
             show_full = col3.checkbox("Show full structure", value=False, key="vz_full")
-            df = visuals_df.copy()
+            df = visuals_df
             # Ensure enriched columns are present even if cache predates the change
             required_cols_vz = {"description", "type", "created_at", "modified_at", "bucket_count"}
             if not df.empty and not required_cols_vz.issubset(set(df.columns)):
                 try:
                     _, vz_list, _ = get_analytics_lists(analytics)
                     df = DataFrame(build_visual_rows(vz_list)) if vz_list else DataFrame()
-                    # update cache so subsequent renders use enriched columns
-                    cache_entry = st.session_state.get("ws_cache", {}).get(st.session_state.get("current_ws_id"), None)
-                    if isinstance(cache_entry, dict):
-                        cache_entry["visuals_df"] = df
                 except Exception:
                     pass
+            # search the indexed frame, the full structure view shows the same objects in the same order
+            df = search_frame(df, cache_entry.get(SEARCH_INDEX_KEY, {}).get("visuals"), VISUAL_SEARCH_FIELDS, q_search, q_tags)
             if show_full and analytics is not None:
                 try:
                     _, vz_list, _ = get_analytics_lists(analytics)
-                    df = DataFrame(build_flat_rows(vz_list)) if vz_list else DataFrame()
+                    full_df = DataFrame(build_flat_rows(vz_list)) if vz_list else DataFrame()
+                    if (q_search or q_tags) and "id" in df.columns and "id" in full_df.columns:
+                        full_df = df[["id"]].merge(full_df, on="id", how="inner")
+                    df = full_df
                 except Exception:
                     pass
             if not df.empty:
-                if q_title and "title" in df.columns:
-                    df = df[df["title"].astype(str).str.contains(q_title, case=False, na=False)]
-                if q_tags and "tags" in df.columns:
-                    df = df[df["tags"].astype(str).str.contains(q_tags, case=False, na=False)]
                 st.dataframe(df, width='stretch')
+            elif q_search or q_tags:
+                st.info("No visualizations match the search.")
             else:
                 st.info("No visualizations found in this workspace.")
 
@@ -867,91 +1203,35 @@ def main():
                     df = df[df["tags"].astype(str).str.contains(q_tags, case=False, na=False)]
                 df = df.fillna("")
 
-                # Render header
-                hdr = st.container()
-                with hdr:
-                    hcols = st.columns([0.5, 0.5, 0.6, 2, 2, 1.2, 0.8, 0.8, 1.2, 1.2, 1.8])
-                    hcols[0].markdown("**📎**")
-                    hcols[1].markdown("**🌳**")
-                    hcols[2].markdown("**🔗**")
-                    hcols[3].markdown("**ID**")
-                    hcols[4].markdown("**Title**")
-                    hcols[5].markdown("**Filter Ctx**")
-                    hcols[6].markdown("**Hidden**")
-                    hcols[7].markdown("**Valid**")
-                    hcols[8].markdown("**Created**")
-                    hcols[9].markdown("**Modified**")
-                    hcols[10].markdown("**Tags**")
+                # One virtualized table (only the visible rows are rendered), actions apply to the selected row;
+                # filter context summary precomputed in the bundle by link_filter_contexts
+                dash_columns = {"app_url": "🔗", "id": "ID", "title": "Title", "filter_context_display": "Filter Ctx",
+                                "is_hidden": "Hidden", "is_valid": "Valid", "created_at": "Created",
+                                "modified_at": "Modified", "tags": "Tags"}
+                if "filter_context_display" not in df.columns and "filter_context_id" in df.columns:
+                    df = df.assign(filter_context_display=df["filter_context_id"])
+                dash_table = df[[c for c in dash_columns if c in df.columns]].rename(columns=dash_columns)
+                dash_event = st.dataframe(
+                    dash_table, width='stretch', hide_index=True, on_select="rerun", selection_mode="single-row",
+                    key="dash_table", column_config={"🔗": st.column_config.LinkColumn("🔗", display_text="open")},
+                )
+                selected_rows = dash_event.selection.rows
+                selected_dash = df.iloc[selected_rows[0]] if selected_rows else None
+                act_cols = st.columns([1, 1, 1, 3])
+                embed_clicked = act_cols[0].button("📎 Embed", disabled=selected_dash is None, key="dash_embed")
+                schema_clicked = act_cols[1].button("🌳 Schema", disabled=selected_dash is None, key="dash_schema")
+                compute_clicked = act_cols[2].button("⚡ Compute", disabled=selected_dash is None, key="dash_compute",
+                                                     help="Compute all insights of the dashboard concurrently")
+                act_cols[3].caption(f"{len(df)} dashboards" + (f" • selected: {selected_dash['title']}"
+                                                                if selected_dash is not None else " • select a row"))
 
                 # Track clicked action
                 clicked_action = None
                 clicked_dash_id = None
                 clicked_dash_title = None
-
-                # Rows
-                fc_lookup = {}
-                try:
-                    fctx_df_cached = cache_entry.get("filter_ctx_df")
-                    if isinstance(fctx_df_cached, DataFrame) and not fctx_df_cached.empty:
-                        for _, rr in fctx_df_cached.fillna("").iterrows():
-                            fc_lookup[str(rr.get("id"))] = rr.to_dict()
-                except Exception:
-                    fc_lookup = {}
-
-                for _, r in df.iterrows():
-                    rid = str(r.get("id", ""))
-                    rtitle = str(r.get("title", ""))
-                    rfcid = str(r.get("filter_context_id", ""))
-                    rhidden = str(r.get("is_hidden", ""))
-                    rvalid = str(r.get("is_valid", ""))
-                    rcreated = str(r.get("created_at", ""))
-                    rmodified = str(r.get("modified_at", ""))
-                    rtags = str(r.get("tags", ""))
-                    rapp = str(r.get("app_url", ""))
-                    fc_display = rfcid or "-"
-                    if rfcid and fc_lookup:
-                        info = fc_lookup.get(rfcid)
-                        if isinstance(info, dict):
-                            parts = []
-                            t = info.get("title")
-                            if t:
-                                parts.append(str(t))
-                            fc_total = info.get("filter_count")
-                            # fallback: try to compute from this row's own definition if missing in cache
-                            if (fc_total is None or str(fc_total) == "") and isinstance(r.get("filter_context_definition"), dict):
-                                try:
-                                    rdef = r.get("filter_context_definition")
-                                    if isinstance(rdef.get("filters"), list):
-                                        fc_total = len(rdef.get("filters"))
-                                    elif isinstance(rdef.get("filterContext"), dict) and isinstance(rdef.get("filterContext").get("filters"), list):
-                                        fc_total = len(rdef.get("filterContext").get("filters"))
-                                except Exception:
-                                    pass
-                            if fc_total is not None:
-                                parts.append(f"{fc_total} filters")
-                            a_cnt = info.get("attribute_filter_count")
-                            d_cnt = info.get("date_filter_count")
-                            if (a_cnt is not None and str(a_cnt) != "") or (d_cnt is not None and str(d_cnt) != ""):
-                                parts.append(f"a:{a_cnt or 0}/d:{d_cnt or 0}")
-                            if parts:
-                                fc_display = f"{rfcid} • " + " • ".join(parts)
-                    cols = st.columns([0.5, 0.5, 0.6, 2, 2, 1.2, 0.8, 0.8, 1.2, 1.2, 1.8])
-                    if cols[0].button("📎", key=f"embed_{rid}"):
-                        clicked_action, clicked_dash_id, clicked_dash_title = "embed", rid, rtitle
-                    if cols[1].button("🌳", key=f"schema_{rid}"):
-                        clicked_action, clicked_dash_id, clicked_dash_title = "schema", rid, rtitle
-                    if rapp:
-                        cols[2].link_button("🔗", rapp)
-                    else:
-                        cols[2].markdown("-")
-                    cols[3].markdown(rid)
-                    cols[4].markdown(rtitle or "-")
-                    cols[5].markdown(fc_display)
-                    cols[6].markdown(rhidden or "-")
-                    cols[7].markdown(rvalid or "-")
-                    cols[8].markdown(rcreated or "-")
-                    cols[9].markdown(rmodified or "-")
-                    cols[10].markdown(rtags or "-")
+                if selected_dash is not None and (embed_clicked or schema_clicked or compute_clicked):
+                    clicked_action = "embed" if embed_clicked else "schema" if schema_clicked else "compute"
+                    clicked_dash_id, clicked_dash_title = str(selected_dash.get("id", "")), str(selected_dash.get("title", ""))
 
                 # Inline render under the table
                 if clicked_action == "embed" and clicked_dash_id:
@@ -993,6 +1273,17 @@ def main():
                         st.write(f"dashboard loaded in {time_it(t, True)*1000} milliseconds")
                     except Exception as _e:
                         st.error(f"Failed to embed dashboard: {_e}")
+                elif clicked_action == "compute" and clicked_dash_id:
+                    dashboard = next((d for d in get_analytics_lists(analytics)[2] if str(d.id) == clicked_dash_id), None)
+                    vis_ids = dashboard_visualization_ids(dashboard) if dashboard is not None else []
+                    if vis_ids:
+                        t = time_it()
+                        with st.spinner(f"Computing {len(vis_ids)} insights..."):
+                            computed_df = st.session_state["gd"].refresh_dashboard(active_ws.id, vis_ids)
+                        st.write(f"{len(vis_ids)} insights computed in {time_it(t, True):.2f} seconds")
+                        st.dataframe(computed_df, width='stretch')
+                    else:
+                        st.info("No insights found on this dashboard.")
                 elif clicked_action == "schema" and (clicked_dash_title or clicked_dash_id):
                     # Try to render schema by title first; fall back to id
                     try:
@@ -1022,54 +1313,27 @@ def main():
 
         with tab_filters:
             st.subheader("Filter Contexts")
-            # Prefer dedicated filter contexts dataframe from cache; fallback to dashboard-derived aggregation
-            fctx_df_cached = cache_entry.get("filter_ctx_df", DataFrame())
-            # If cached df missing expected columns, rebuild and update cache
-            required_cols_fc = {"title", "created_at", "modified_at", "filter_count"}
-            if (fctx_df_cached is None) or fctx_df_cached.empty or not required_cols_fc.issubset(set(fctx_df_cached.columns)):
-                try:
-                    pre_filter_ctx_rows, _ = build_filter_context_rows_from_analytics(analytics)
-                    fctx_df_cached = DataFrame(pre_filter_ctx_rows)
-                    # update cache so subsequent renders use enriched columns
-                    cache_entry = st.session_state.get("ws_cache", {}).get(st.session_state.get("current_ws_id"), None)
-                    if isinstance(cache_entry, dict):
-                        cache_entry["filter_ctx_df"] = fctx_df_cached
-                except Exception:
-                    pass
-            if fctx_df_cached is not None and not fctx_df_cached.empty:
-                df = fctx_df_cached.copy()
-                # Expand definition to columns (prefix def.) if present
-                if "definition" in df.columns:
-                    try:
-                        expl = DataFrame([_flatten_dict(x if isinstance(x, dict) else {}) for x in df["definition"].tolist()])
-                        expl = expl.add_prefix("def.")
-                        df = df.drop(columns=["definition"]).join(expl)
-                    except Exception:
-                        pass
-                st.dataframe(df, width='stretch')
-            else:
-                # Build from dashboards dataframe if available; aggregate unique FCs
-                df_dash = dashes_df.copy()
-                if not df_dash.empty and "filter_context_id" in df_dash.columns:
-                    # Keep only rows with FC ids
-                    fcs = df_dash[df_dash["filter_context_id"].astype(str).str.len() > 0][["filter_context_id", "filter_context_definition", "title", "id"]].copy() if "filter_context_definition" in df_dash.columns else df_dash[["filter_context_id", "title", "id"]].copy()
-                    # Group by id; if definition dict present, take first
-                    try:
-                        fcs = fcs.dropna(subset=["filter_context_id"]).groupby("filter_context_id").first().reset_index()
-                    except Exception:
-                        pass
-                    # If definition is dict, expand a few common keys
-                    if "filter_context_definition" in fcs.columns:
-                        try:
-                            # Normalize dict column into prefixed columns
-                            expl = DataFrame([_flatten_dict(x if isinstance(x, dict) else {}) for x in fcs["filter_context_definition"].tolist()])
-                            expl = expl.add_prefix("def.")
-                            fcs = fcs.drop(columns=["filter_context_definition"]).join(expl)
-                        except Exception:
-                            pass
+            # flattened once per bundle load (see link_filter_contexts), not on every rerun
+            fctx_flat_df = cache_entry.get("filter_ctx_flat_df")
+            if fctx_flat_df is None:
+                fctx_df_cached = cache_entry.get("filter_ctx_df")
+                if fctx_df_cached is None or "filter_count" not in fctx_df_cached.columns:
+                    fctx_df_cached, _ = build_filter_context_frame(analytics)
+                _, fctx_flat_df, _ = link_filter_contexts(fctx_df_cached, dashes_df)
+            if not fctx_flat_df.empty:
+                st.dataframe(fctx_flat_df, width='stretch')
+            elif not dashes_df.empty and "filter_context_id" in dashes_df.columns:
+                # analytics without filter contexts (e.g. REST fallback): the ones referenced by dashboards
+                fcs = dashes_df[dashes_df["filter_context_id"].astype(str).str.len() > 0]
+                fcs = fcs.drop_duplicates("filter_context_id")[["filter_context_id", "title", "id"]].rename(
+                    columns={"title": "dashboard_title", "id": "dashboard_id"})
+                if not fcs.empty:
+                    st.caption("Filter contexts referenced by dashboards (definitions not available)")
                     st.dataframe(fcs, width='stretch')
                 else:
                     st.info("No filter contexts discovered from dashboards.")
+            else:
+                st.info("No filter contexts found in this workspace.")
 
         with tab_ldm:
             st.subheader("Logical Data Model")
@@ -1100,7 +1364,28 @@ def main():
         with tab_graph:
             st.subheader("Dependent Entities Graph")
             try:
-                components.html(html_cytoscape(st.session_state["gd"].ws_schema(active_ws.id)), height=650)
+                graph_version = get_workspace_cache().version(st.session_state["gd"]._host, active_ws.id)
+                elements, elements_hash = load_graph_elements(st.session_state["gd"], st.session_state["gd"]._host, active_ws.id, graph_version)
+                lod = st.toggle("Level of detail", value=True,
+                                help="Fold attributes and facts into datasets, limit the graph and lay it out on the server")
+                if lod:
+                    node_labels = {el["data"]["id"]: f'{el["data"]["label"]} ({el["data"]["type"]})'
+                                   for el in elements if "source" not in el["data"]}
+                    g_cols = st.columns([2, 2, 1, 1])
+                    node_types = sorted({el["data"]["type"] for el in elements if "source" not in el["data"]})
+                    selected_types = g_cols[0].multiselect("Node types", options=node_types,
+                                                           default=[t for t in node_types if t not in DATASET_MEMBER_TYPES])
+                    # only nodes left after folding into datasets and type filtering can be a center
+                    center_labels = graph_centers(elements_hash, elements, tuple(selected_types))
+                    center = g_cols[1].selectbox("Around object", options=[None] + sorted(center_labels, key=center_labels.get),
+                                                 format_func=lambda x: "<whole workspace>" if x is None else center_labels[x])
+                    hops = g_cols[2].number_input("Hops", min_value=1, max_value=6, value=2, disabled=center is None)
+                    max_nodes = g_cols[3].number_input("Max nodes", min_value=50, max_value=5000, value=GRAPH_MAX_NODES, step=50)
+                    reduced_json, shown = layout_graph(elements_hash, elements, tuple(selected_types), center, hops, max_nodes)
+                    st.caption(f"Showing {shown} of {len(node_labels)} nodes")
+                    components.html(html_cytoscape(reduced_json), height=650)
+                else:
+                    components.html(html_cytoscape(dumps(elements), layout_key=elements_hash), height=650)
             except Exception as e:
                 st.error(f"Failed to render graph: {e}")
 
@@ -0,0 +1,173 @@
+import gzip
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from time import strftime, time
+from typing import Callable, Iterable
+
+from gooddata_sdk import CatalogDeclarativeAnalytics, CatalogDeclarativeModel
+
+DEFAULT_BACKUP_ROOT = Path.cwd() / "gooddata_backups"
+DEFAULT_MAX_WORKERS = 4
+BACKUP_SUFFIX = ".jsonl.gz"
+# object lists of the declarative layouts (camelCase as in the API), one backup line per object
+ANALYTICS_KINDS = ("analyticalDashboards", "analyticalDashboardExtensions", "attributeHierarchies", "dashboardPlugins",
+                   "filterContexts", "metrics", "visualizationObjects", "exportDefinitions", "memoryItems", "parameters")
+LDM_KINDS = ("datasets", "dateInstances")
+
+
+def object_hash(content) -> str:
+    """sha256 of the canonical JSON of a layout object."""
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def layout_objects(analytics: dict, ldm: dict) -> Iterable[tuple[str, str, dict]]:
+    """(kind, id, content) of every object of the declarative analytics model and LDM (as to_dict() returns them)."""
+    for layer, kinds, layout in (("analytics", ANALYTICS_KINDS, analytics), ("ldm", LDM_KINDS, ldm)):
+        for kind in kinds:
+            for content in (layout or {}).get(layer, {}).get(kind) or []:
+                yield kind, content["id"], content
+
+
+def assemble_layouts(objects: Iterable[tuple[str, str, dict]]) -> tuple[dict, dict]:
+    """Inverse of layout_objects: (analytics, ldm) declarative dicts, objects sorted by id."""
+    analytics = {kind: [] for kind in ANALYTICS_KINDS}
+    ldm = {kind: [] for kind in LDM_KINDS}
+    for kind, _, content in sorted(objects, key=lambda o: (o[0], o[1])):
+        (ldm if kind in LDM_KINDS else analytics)[kind].append(content)
+    return {"analytics": analytics}, {"ldm": ldm}
+
+
+def fetch_layouts(gd, ws_id: str) -> tuple[dict, dict]:
+    """Live (analytics, ldm) declarative dicts of a workspace."""
+    content = gd._sdk.catalog_workspace_content
+    return (content.get_declarative_analytics_model(ws_id).to_dict(camel_case=True),
+            content.get_declarative_ldm(ws_id).to_dict(camel_case=True))
+
+
+class BackupEngine:
+    """Concurrent backups of workspace layouts into one gzipped JSON-lines file per workspace and run.
+
+    Every line is one object of the analytics model or LDM: {"kind", "id", "hash", "content"}. An
+    object whose hash equals the one in the previous backup of the workspace is written without its
+    content, with "ref" naming the backup file holding it, so an unchanged workspace costs a few
+    bytes per object. Files live in <root>/<host>/<workspace id>/<timestamp>.jsonl.gz.
+    """
+
+    def __init__(self, gd, root: Path = DEFAULT_BACKUP_ROOT, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.gd = gd
+        self.root = Path(root)
+        self.max_workers = max_workers
+
+    def path(self, ws_id: str) -> Path:
+        host_slug = re.sub(r"[^a-zA-Z0-9_.-]", "_", self.gd._host.split("://")[-1])
+        return self.root / host_slug / ws_id
+
+    def backups(self, ws_id: str) -> list[Path]:
+        """Backup files of a workspace, oldest first."""
+        folder = self.path(ws_id)
+        return sorted(folder.glob(f"*{BACKUP_SUFFIX}")) if folder.exists() else []
+
+    @staticmethod
+    def _read_lines(path: Path) -> list[dict]:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _previous(self, ws_id: str) -> dict:
+        # {(kind, id): (hash, file holding the content)} of the latest backup
+        backups = self.backups(ws_id)
+        if not backups:
+            return {}
+        return {(line["kind"], line["id"]): (line["hash"], line.get("ref") or backups[-1].name)
+                for line in self._read_lines(backups[-1])}
+
+    def backup(self, ws_id: str) -> dict:
+        """Back up one workspace, returns its report."""
+        start = time()
+        previous = self._previous(ws_id)
+        analytics, ldm = fetch_layouts(self.gd, ws_id)
+        folder = self.path(ws_id)
+        folder.mkdir(parents=True, exist_ok=True)
+        target = folder / f"{strftime('%Y%m%dT%H%M%S')}-{int(time() * 1000) % 1000:03d}{BACKUP_SUFFIX}"
+        tmp = target.with_name(f".{target.name}.tmp")
+        counts = {"objects": 0, "changed": 0, "unchanged": 0}
+        seen = set()
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for kind, obj_id, content in layout_objects(analytics, ldm):
+                digest = object_hash(content)
+                line = {"kind": kind, "id": obj_id, "hash": digest}
+                old = previous.get((kind, obj_id))
+                if old and old[0] == digest:
+                    line["ref"] = old[1]
+                    counts["unchanged"] += 1
+                else:
+                    line["content"] = content
+                    counts["changed"] += 1
+                counts["objects"] += 1
+                seen.add((kind, obj_id))
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+        tmp.replace(target)
+        return {
+            "workspace_id": ws_id,
+            "file": str(target),
+            **counts,
+            "removed": len(set(previous) - seen),
+            "bytes": target.stat().st_size,
+            "seconds": round(time() - start, 2),
+        }
+
+    def run(self, ws_ids: list[str], progress: Callable | None = None) -> dict:
+        """Back up the workspaces on max_workers threads.
+        progress(finished, total, workspace_id) is called from the calling thread after each workspace."""
+        start = time()
+        reports, failed = [], {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="backup") as pool:
+            futures = {pool.submit(self.backup, ws_id): ws_id for ws_id in ws_ids}
+            for finished, future in enumerate(as_completed(futures), start=1):
+                ws_id = futures[future]
+                try:
+                    reports.append(future.result())
+                except Exception as ex:
+                    failed[ws_id] = str(ex)
+                    print(f"backup of workspace {ws_id} failed: {ex}")
+                if progress:
+                    progress(finished, len(ws_ids), ws_id)
+        return {
+            "workspaces": len(reports),
+            "failed": failed,
+            "objects": sum(r["objects"] for r in reports),
+            "changed": sum(r["changed"] for r in reports),
+            "unchanged": sum(r["unchanged"] for r in reports),
+            "bytes": sum(r["bytes"] for r in reports),
+            "seconds": round(time() - start, 1),
+            "reports": sorted(reports, key=lambda r: r["workspace_id"]),
+        }
+
+    def read(self, ws_id: str, backup: str = "") -> list[tuple[str, str, dict]]:
+        """(kind, id, content) of all objects of a backup (the latest by default), refs resolved."""
+        folder = self.path(ws_id)
+        path = folder / backup if backup else (self.backups(ws_id) or [None])[-1]
+        if path is None or not path.exists():
+            raise FileNotFoundError(f"no backup {backup or '(latest)'} of workspace {ws_id}")
+        lines = self._read_lines(path)
+        referenced = {}
+        for name in {line["ref"] for line in lines if "ref" in line}:
+            referenced[name] = {(line["kind"], line["id"]): line.get("content")
+                                for line in self._read_lines(folder / name) if "content" in line}
+        return [(line["kind"], line["id"],
+                 line["content"] if "content" in line else referenced[line["ref"]][(line["kind"], line["id"])])
+                for line in lines]
+
+    def restore(self, ws_id: str, backup: str = "", target_ws_id: str = "", ldm: bool = True) -> dict:
+        """Put the layouts of a backup into target_ws_id (the backed-up workspace by default)."""
+        start = time()
+        objects = self.read(ws_id, backup)
+        analytics, ldm_layout = assemble_layouts(objects)
+        target_ws_id = target_ws_id or ws_id
+        content = self.gd._sdk.catalog_workspace_content
+        if ldm:
+            content.put_declarative_ldm(target_ws_id, CatalogDeclarativeModel.from_dict(ldm_layout))
+        content.put_declarative_analytics_model(target_ws_id, CatalogDeclarativeAnalytics.from_dict(analytics))
+        return {"workspace_id": target_ws_id, "objects": len(objects), "seconds": round(time() - start, 2)}
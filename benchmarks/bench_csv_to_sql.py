@@ -0,0 +1,88 @@
+"""Benchmark: chunked column-wise iter_csv_sql vs. the former iterrows csv_to_sql.
+
+A CSV with ids, text (some with quotes), integers, floats, dates and empty cells is generated in a
+temporary directory. The former csv_to_sql read and rendered every row before keeping the first
+limit ones, so it is measured for limit=200 on LEGACY_MAX_ROWS rows only (pass --legacy-all to run
+it on the full file as well).
+
+    python benchmarks/bench_csv_to_sql.py [rows] [--legacy-all]
+"""
+import sys
+import tempfile
+from pathlib import Path
+from random import Random
+from time import perf_counter
+
+from pandas import read_csv
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import csv_to_sql, encapsulate, iter_csv_sql  # noqa: E402
+
+LEGACY_MAX_ROWS = 100000
+BATCH_ROWS = 1000
+
+
+def write_csv(path: Path, rows: int, seed: int = 1) -> None:
+    rnd = Random(seed)
+    names = ["Prague", "Brno", "O'Hare", "San Francisco", "Zürich", ""]
+    with path.open("w") as f:
+        f.write("id,city,quantity,price,order_date,note\n")
+        for i in range(rows):
+            f.write(f"{i},{rnd.choice(names)},{rnd.randint(1, 500)},{rnd.random() * 1000:.2f},"
+                    f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d},note {i % 97}\n")
+
+
+def legacy_csv_to_sql(csv_filename, limit=200):
+    df = read_csv(csv_filename)
+    columns = df.columns
+    rows = [
+        "SELECT "
+        + ", ".join(
+            [
+                f"'{str(row[col])}' AS {encapsulate(col.strip())}"
+                if isinstance(row[col], str)
+                else f"{str(row[col])} AS {encapsulate(col.strip())}"
+                for col in columns
+            ]
+        )
+        for _, row in df.iterrows()
+    ]
+    return {"title": csv_filename, "query": " UNION ALL ".join(rows[:limit]) + ";"}
+
+
+def timed(fn, *args, **kwargs):
+    start = perf_counter()
+    result = fn(*args, **kwargs)
+    return result, perf_counter() - start
+
+
+def main(rows: int = 1000000, legacy_all: bool = False):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.csv"
+        write_csv(path, rows)
+        print(f"rows={rows} size={path.stat().st_size / 2**20:.1f} MiB")
+
+        if legacy_all:
+            _, legacy_full = timed(legacy_csv_to_sql, path)
+            print(f"legacy csv_to_sql(limit=200) on {rows} rows: {legacy_full:8.2f}s")
+        legacy_path = Path(tmp) / "legacy.csv"
+        write_csv(legacy_path, min(rows, LEGACY_MAX_ROWS))
+        _, legacy = timed(legacy_csv_to_sql, legacy_path)
+        print(f"legacy csv_to_sql(limit=200) on {min(rows, LEGACY_MAX_ROWS)} rows: {legacy:8.2f}s")
+
+        result, limited = timed(csv_to_sql, path)
+        print(f"csv_to_sql(limit=200) on {rows} rows:        {limited:8.4f}s ({len(result['query'])} chars)")
+
+        start = perf_counter()
+        batches, chars = 0, 0
+        for query in iter_csv_sql(path, batch_rows=BATCH_ROWS):
+            batches += 1
+            chars += len(query)
+        streamed = perf_counter() - start
+        print(f"iter_csv_sql(batch_rows={BATCH_ROWS}) all {rows} rows: {streamed:8.2f}s, {batches} queries, "
+              f"{chars / 2**20:.1f} MiB of SQL, {rows / streamed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    main(int(args[0]) if args else 1000000, "--legacy-all" in sys.argv)
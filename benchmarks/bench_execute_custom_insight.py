@@ -0,0 +1,86 @@
+"""Benchmark: single-pass exec_def_to_data_frame vs. the former double execution.
+
+The former execute_custom_insight read the result via for_exec_def and then read it again via
+for_exec_result_id. The stubbed factory below builds a large result in both calls (as the real
+result convertor does after paging the result), so the benchmark shows the cost of the extra pass. The second read used the default page size of
+gooddata_pandas (100 rows), which the stub mirrors.
+
+    python benchmarks/bench_execute_custom_insight.py [rows]
+"""
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter, sleep
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "extended"))
+from gooddata.execute import exec_def_to_data_frame  # noqa: E402
+
+PAGE_SIZE = 10000
+PAGE_LATENCY = 0.002  # seconds per result page "on the wire"
+
+
+class StubMetadata:
+    class execution_response:
+        result_id = "stub-result-id"
+
+
+class StubFrames:
+    def __init__(self, rows: int):
+        self.rows = rows
+
+    def _read_result(self, page_size: int) -> pd.DataFrame:
+        for _ in range(0, self.rows, page_size):
+            sleep(PAGE_LATENCY)
+        index = pd.MultiIndex.from_arrays([
+            np.arange(self.rows).astype(str),
+            np.random.choice(["A", "B", "C", "D"], self.rows),
+        ])
+        columns = pd.MultiIndex.from_tuples([("sum_", "fact_amount"), ("count_", "attribute_id")])
+        return pd.DataFrame(np.random.rand(self.rows, 2), index=index, columns=columns)
+
+    def for_exec_def(self, exec_def, page_size=100):
+        return self._read_result(page_size), StubMetadata()
+
+    def for_exec_result_id(self, result_id, page_size=100):  # gooddata_pandas default page size
+        return self._read_result(page_size), StubMetadata()
+
+
+def two_pass(frames, execution_definition):
+    # the former execute_custom_insight body
+    df, df_metadata = frames.for_exec_def(exec_def=execution_definition, page_size=PAGE_SIZE)
+    df_from_result_id, df_metadata_from_result_id = frames.for_exec_result_id(
+        result_id=df_metadata.execution_response.result_id,
+    )
+    df_from_result_id.columns = df_from_result_id.columns.map(''.join)
+    return df_from_result_id
+
+
+def single_pass(frames, execution_definition):
+    df, _ = exec_def_to_data_frame(frames, execution_definition, page_size=PAGE_SIZE)
+    return df
+
+
+def measure(func, frames) -> tuple[float, float]:
+    tracemalloc.start()
+    start = perf_counter()
+    func(frames, None)
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main(rows: int = 1_000_000) -> None:
+    frames = StubFrames(rows)
+    results = {name: measure(func, frames) for name, func in (("two_pass", two_pass), ("single_pass", single_pass))}
+    for name, (elapsed, peak) in results.items():
+        print(f"{name:<12} rows={rows} time={elapsed:.3f}s peak_memory={peak:.1f}MiB")
+    (t2, m2), (t1, m1) = results["two_pass"], results["single_pass"]
+    print(f"speedup={t2 / t1:.2f}x memory_ratio={m2 / m1:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,96 @@
+"""Benchmark: columnar filter-context frames vs. the former per-row building in the app tabs.
+
+A synthetic workspace with dashboards, each pointing to one of the filter contexts (a few date and
+attribute filters each), is generated. The former path built filter context rows one dict at a time,
+flattened every definition with _flatten_dict on each rerun of the Filter Contexts tab and looked up
+the filter context of each dashboard row through iterrows. The new path builds the frames once per
+bundle load with build_filter_context_frame/link_filter_contexts.
+
+    python benchmarks/bench_filter_contexts.py [dashboards]
+"""
+import sys
+from pathlib import Path
+from random import Random
+from time import perf_counter
+from types import SimpleNamespace
+
+from pandas import DataFrame
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from app import _flatten_dict, build_filter_context_frame, link_filter_contexts  # noqa: E402
+
+
+def synthetic_workspace(n_dashboards: int, seed: int = 1):
+    rnd = Random(seed)
+    n_contexts = max(n_dashboards // 2, 1)
+    contexts = []
+    for i in range(n_contexts):
+        filters = [{"dateFilter": {"from": -rnd.randint(1, 12), "to": 0, "granularity": "GDC.time.month", "type": "relative"}}]
+        for j in range(rnd.randint(0, 5)):
+            filters.append({"attributeFilter": {
+                "displayForm": {"identifier": {"id": f"label_{j}", "type": "label"}},
+                "negativeSelection": bool(rnd.getrandbits(1)),
+                "attributeElements": {"uris": [f"value_{k}" for k in range(rnd.randint(0, 3))]},
+                "localIdentifier": f"af_{i}_{j}",
+            }})
+        contexts.append(SimpleNamespace(id=f"fc_{i}", title=f"Filter context {i}", description=None, tags=[],
+                                        created_at="2024-01-01 00:00", modified_at=None,
+                                        content={"filters": filters, "version": "2"}))
+    dashes_df = DataFrame({
+        "id": [f"dash_{i}" for i in range(n_dashboards)],
+        "title": [f"Dashboard {i}" for i in range(n_dashboards)],
+        "filter_context_id": [f"fc_{rnd.randrange(n_contexts)}" for _ in range(n_dashboards)],
+    })
+    return SimpleNamespace(filter_contexts=contexts), dashes_df
+
+
+def legacy(analytics, dashes_df):
+    # filter context rows one dict at a time
+    rows = []
+    for fc in analytics.filter_contexts:
+        definition = fc.to_dict().get("content") if hasattr(fc, "to_dict") else fc.content
+        filters = definition.get("filters") or []
+        rows.append({
+            "id": fc.id, "title": fc.title, "created_at": fc.created_at, "modified_at": fc.modified_at,
+            "definition": definition, "filter_count": len(filters),
+            "attribute_filter_count": sum(1 for f in filters if "attributeFilter" in f),
+            "date_filter_count": sum(1 for f in filters if "dateFilter" in f),
+        })
+    fc_df = DataFrame(rows)
+    # Filter Contexts tab
+    expl = DataFrame([_flatten_dict(x) for x in fc_df["definition"].tolist()]).add_prefix("def.")
+    flat = fc_df.drop(columns=["definition"]).join(expl)
+    # Dashboards tab
+    fc_lookup = {str(r.get("id")): r.to_dict() for _, r in fc_df.fillna("").iterrows()}
+    displays = []
+    for _, r in dashes_df.iterrows():
+        info = fc_lookup.get(str(r.get("filter_context_id")))
+        displays.append(f"{r['filter_context_id']} • {info['title']} • {info['filter_count']} filters • "
+                        f"a:{info['attribute_filter_count']}/d:{info['date_filter_count']}")
+    return flat, displays
+
+
+def columnar(analytics, dashes_df):
+    fc_df, _ = build_filter_context_frame(analytics)
+    _, flat, dashes_df = link_filter_contexts(fc_df, dashes_df)
+    return flat, dashes_df["filter_context_display"].tolist()
+
+
+def timed(fn, *args):
+    start = perf_counter()
+    result = fn(*args)
+    return result, perf_counter() - start
+
+
+def main(n_dashboards: int = 10000):
+    for size in sorted({1000, n_dashboards}):
+        analytics, dashes_df = synthetic_workspace(size)
+        (_, legacy_displays), legacy_time = timed(legacy, analytics, dashes_df)
+        (flat, displays), columnar_time = timed(columnar, analytics, dashes_df)
+        assert displays == legacy_displays
+        print(f"dashboards={size:>7} filter contexts={len(flat):>6} columns={flat.shape[1]:>4} "
+              f"legacy={legacy_time:7.3f}s columnar={columnar_time:7.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,80 @@
+"""Benchmark: chunked dataframe_to_pdf vs. the former tabulate + multi_cell export.
+
+A DataFrame shaped like an insight result (attribute columns and metric columns) is exported to a
+temporary directory by both versions. The former one put a tabulate grid of all rows of a page into
+one multi_cell (num_pages=2, as LoadGoodDataSdk.data called it). Time, peak Python memory
+(tracemalloc) and page count are reported.
+
+    python benchmarks/bench_pdf_export.py [rows]
+"""
+import math
+import re
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from random import Random
+from time import perf_counter
+
+from fpdf import FPDF
+from pandas import DataFrame
+from tabulate import tabulate
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import dataframe_to_pdf  # noqa: E402
+
+
+def insight_frame(rows: int, seed: int = 1) -> DataFrame:
+    rnd = Random(seed)
+    regions = ["Europe", "North America", "South America", "Asia", "Africa", "Oceania"]
+    return DataFrame({
+        "Region": [rnd.choice(regions) for _ in range(rows)],
+        "Product": [f"Product {rnd.randint(1, 500)}" for _ in range(rows)],
+        "Date": [f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}" for _ in range(rows)],
+        "Revenue": [round(rnd.random() * 10000, 2) for _ in range(rows)],
+        "Orders": [rnd.randint(1, 100) for _ in range(rows)],
+        "Margin %": [round(rnd.random(), 3) for _ in range(rows)],
+    })
+
+
+def legacy_dataframe_to_pdf(dataframe, pdf_path, num_pages):
+    rows_per_page = math.ceil(len(dataframe) / num_pages)
+    pdf = FPDF()
+    for page in range(num_pages):
+        start_idx = page * rows_per_page
+        end_idx = min((page + 1) * rows_per_page, len(dataframe))
+        page_df = dataframe.iloc[start_idx:end_idx]
+        pdf.add_page()
+        table = tabulate(page_df, headers='keys', tablefmt='grid', showindex=False)
+        pdf.set_font("Arial", size=12)
+        pdf.multi_cell(0, 10, table)
+    pdf.output(pdf_path)
+
+
+def measure(fn, *args, **kwargs):
+    tracemalloc.start()
+    start = perf_counter()
+    fn(*args, **kwargs)
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def page_count(path: Path) -> int:
+    return len(re.findall(rb"/Type /Page\b", path.read_bytes()))
+
+
+def main(rows: int = 100000):
+    df = insight_frame(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn, kwargs in (("legacy", legacy_dataframe_to_pdf, {"num_pages": 2}),
+                                 ("streaming", dataframe_to_pdf, {})):
+            path = Path(tmp) / f"{name}.pdf"
+            elapsed, peak = measure(fn, df, str(path), **kwargs)
+            print(f"{name:>9}: rows={rows} {elapsed:7.2f}s peak={peak / 2**20:7.1f} MiB "
+                  f"pages={page_count(path):>5} size={path.stat().st_size / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,78 @@
+"""Benchmark: SearchIndex queries vs. the former substring scans of the Metrics tab.
+
+A synthetic metrics frame (titles, descriptions, tags and MAQL built from a small business vocabulary)
+is indexed once; then a set of prefix, substring, multi-word and misspelled queries is timed against
+the index (first query of a term = cold, repeated = warm, all matches ranked = all) and against
+str.contains over a copy of the frame, as the tab did on every keystroke.
+
+    python benchmarks/bench_search_index.py [objects]
+"""
+import sys
+from pathlib import Path
+from random import Random
+from statistics import median
+from time import perf_counter
+
+from pandas import DataFrame
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from search_index import METRIC_SEARCH_FIELDS, SearchIndex  # noqa: E402
+
+WORDS = ["revenue", "order", "customer", "product", "margin", "discount", "region", "campaign", "quantity",
+         "price", "cost", "profit", "churn", "retention", "inventory", "shipping", "return", "payment",
+         "subscription", "employee", "salary", "forecast", "budget", "invoice", "lead", "opportunity"]
+AGGREGATIONS = ["SUM", "AVG", "COUNT", "MAX", "MIN"]
+QUERIES = ["rev", "venue", "customer margin", "retention 12", "forcast", "invetory", "q3", "zzz"]
+REPEAT = 20
+
+
+def synthetic_metrics(n: int, seed: int = 1) -> DataFrame:
+    rnd = Random(seed)
+    rows = []
+    for i in range(n):
+        words = rnd.sample(WORDS, 3)
+        rows.append({
+            "id": f"metric_{i}",
+            "title": f"{words[0].title()} {words[1]} {i}",
+            "description": f"{words[2]} by {rnd.choice(WORDS)} for q{rnd.randint(1, 4)}",
+            "tags": rnd.sample(WORDS, 2),
+            "maql": f"SELECT {rnd.choice(AGGREGATIONS)}({{fact/{words[0]}_{rnd.randint(1, 50)}}})",
+        })
+    return DataFrame(rows)
+
+
+def scan(df: DataFrame, query: str) -> DataFrame:
+    df = df.copy()
+    mask = df["title"].astype(str).str.contains(query, case=False, na=False)
+    for col in ("description", "tags", "maql"):
+        mask |= df[col].astype(str).str.contains(query, case=False, na=False)
+    return df[mask]
+
+
+def timed(fn, *args, repeat: int = REPEAT):
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = fn(*args)
+        times.append(perf_counter() - start)
+    return result, median(times)
+
+
+def main(n: int = 50000):
+    df = synthetic_metrics(n)
+    start = perf_counter()
+    index = SearchIndex.from_frame(df, METRIC_SEARCH_FIELDS)
+    print(f"objects={n} build={perf_counter() - start:.2f}s {index.stats()}")
+    for query in QUERIES:
+        index._tier_cache.clear()
+        _, cold = timed(index.search, query, None, True, 50, repeat=1)
+        rows, warm = timed(index.search, query, None, True, 50)
+        _, full = timed(index.search, query)
+        _, scanned = timed(scan, df, query, repeat=3)
+        top = df.iloc[rows[0]]["title"] if rows else "-"
+        print(f"{query!r:>18}: top 50 cold={cold * 1000:7.3f}ms warm={warm * 1000:7.3f}ms all={full * 1000:7.3f}ms "
+              f"scan={scanned * 1000:7.1f}ms  top={top!r}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,100 @@
+"""Benchmark: linear build_schema_elements vs. the former ws_schema loop with check_node_id.
+
+A synthetic get_dependent_entities_graph response is generated: datasets with attributes, labels
+(dotted ids, folded into their attribute), facts, metrics, insights and dashboards, and edges
+between them. The former builder scanned all elements for every node, so it is only measured
+up to LEGACY_MAX_NODES nodes.
+
+    python benchmarks/bench_ws_schema.py [nodes]
+"""
+import sys
+from json import dumps
+from pathlib import Path
+from random import Random
+from time import perf_counter
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from schema_graph import build_schema_elements, iter_elements_json, node_element  # noqa: E402
+
+LEGACY_MAX_NODES = 20000
+
+
+def synthetic_graph(n_nodes: int, seed: int = 1):
+    rnd = Random(seed)
+    nodes, edges = [], []
+    n_datasets = max(n_nodes // 50, 1)
+    datasets = [SimpleNamespace(id=f"ds_{i}", title=f"Dataset {i}", type="dataset") for i in range(n_datasets)]
+    nodes.extend(datasets)
+    kinds = ["attribute", "attribute", "label", "fact", "metric", "visualizationObject", "analyticalDashboard"]
+    by_kind = {k: [] for k in kinds}
+    while len(nodes) < n_nodes:
+        kind = rnd.choice(kinds)
+        i = len(nodes)
+        if kind == "label":
+            if not by_kind["attribute"]:
+                continue
+            parent = rnd.choice(by_kind["attribute"])
+            node = SimpleNamespace(id=f"{parent.id}.label_{i}", title=f"Label {i}", type="label")
+        else:
+            node = SimpleNamespace(id=f"{kind}_{i}", title=f"{kind} {i}", type=kind)
+        nodes.append(node)
+        by_kind[kind].append(node)
+        # wire the node to something upstream
+        if kind in ("attribute", "fact", "label"):
+            edges.append((node, rnd.choice(datasets)))
+        elif kind == "metric" and by_kind["fact"]:
+            edges.append((rnd.choice(by_kind["fact"]), node))
+        elif kind == "visualizationObject" and by_kind["metric"]:
+            edges.append((rnd.choice(by_kind["metric"]), node))
+        elif kind == "analyticalDashboard" and by_kind["visualizationObject"]:
+            edges.append((rnd.choice(by_kind["visualizationObject"]), node))
+    return nodes, edges
+
+
+def legacy_build(nodes, edges) -> list[dict]:
+    def check_node_id(node_id, list_of_objects):
+        for obj in list_of_objects:
+            if 'data' in obj and 'id' in obj['data']:
+                if obj['data']['id'] == node_id:
+                    return True
+        return False
+
+    elements = []
+    for node in nodes:
+        node_id = node.id.split(".")[0] if "." in node.id else node.id
+        if check_node_id(node_id, elements):
+            continue
+        elements.append(node_element(node_id, node.title, node.type))
+    for source, target in edges:
+        if "." in source.id or "." in target.id:
+            continue
+        elements.append({"data": {"source": source.id, "target": target.id}})
+    return elements
+
+
+def timed(fn, *args):
+    start = perf_counter()
+    result = fn(*args)
+    return result, perf_counter() - start
+
+
+def main(n_nodes: int = 100000):
+    for size in sorted({1000, 5000, LEGACY_MAX_NODES, n_nodes}):
+        nodes, edges = synthetic_graph(size)
+        elements, linear = timed(build_schema_elements, nodes, edges)
+        if size <= LEGACY_MAX_NODES:
+            legacy_elements, legacy = timed(legacy_build, nodes, edges)
+            assert legacy_elements == elements
+            legacy_txt = f"{legacy:8.3f}s"
+        else:
+            legacy_txt = "  skipped"
+        _, dump_time = timed(dumps, elements)
+        chunks, stream_time = timed(lambda: list(iter_elements_json(elements)))
+        assert "".join(chunks) == dumps(elements)
+        print(f"nodes={size:>7} elements={len(elements):>7} legacy={legacy_txt} linear={linear:8.3f}s "
+              f"dumps={dump_time:6.3f}s streamed={stream_time:6.3f}s in {len(chunks)} chunks")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -1,24 +1,54 @@
-# import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import time
 
 from fpdf import FPDF  # temporary pdf handling
 from gooddata_sdk import (GoodDataSdk, CatalogDataSourcePermissionAssignment,
                           # CatalogDeclarativeDashboardPermissionsForAssignee, CatalogAssigneeRule,
                           CatalogAssigneeIdentifier, CatalogPermissionAssignments,
                           CatalogPermissionsForAssigneeRule, CatalogPermissionsForAssigneeIdentifier,
-                          CatalogWorkspace, CatalogWorkspacePermissionAssignment, CatalogUser, CatalogUserGroup)
+                          CatalogWorkspace, CatalogWorkspacePermissionAssignment, CatalogUser, CatalogUserGroup,
+                          ExecutionDefinition, TableDimension)
 from gooddata_pandas import GoodPandas
 import graphviz
 from json import dumps
-import math
 
 from gooddata_sdk.catalog.workspace.declarative_model.workspace.analytics_model.analytics_model import \
-    CatalogDeclarativeAnalyticsLayer
-from pandas import read_csv
+    CatalogDeclarativeAnalyticalDashboard, CatalogDeclarativeAnalyticsLayer, CatalogDeclarativeFilterContext, \
+    CatalogDeclarativeMetric, CatalogDeclarativeVisualizationObject
+from pandas import DataFrame, RangeIndex, Series, read_csv
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
 from pathlib import Path
-from tabulate import tabulate
+from membership import MembershipIndex
+from permissions import DEFAULT_MAX_WORKERS, DEFAULT_RATE_LIMIT, PermissionBatch
+from provisioning import DEFAULT_MAX_WORKERS as PROVISIONING_MAX_WORKERS, BulkProvisioner
+from schema_graph import build_schema_elements
 from treelib import Tree
 
 
+# PDF export: font size (pt), rows converted to text at once, column count printed in portrait, minimal column width
+PDF_FONT_SIZE = 8
+PDF_CHUNK_ROWS = 5000
+PDF_PORTRAIT_MAX_COLUMNS = 6
+PDF_MIN_CHARS = 4
+
+# organization level object types and the LoadGoodDataSdk collection holding them
+ORG_OBJECT_COLLECTIONS = {
+    "user": "users",
+    "group": "groups",
+    "datasource": "datasources",
+    "workspace": "workspaces",
+}
+
+# entities API type -> (analytics layer attribute, declarative class) for incremental workspace refresh
+ANALYTICS_ENTITY_TYPES = {
+    "metrics": ("metrics", CatalogDeclarativeMetric),
+    "visualizationObjects": ("visualization_objects", CatalogDeclarativeVisualizationObject),
+    "analyticalDashboards": ("analytical_dashboards", CatalogDeclarativeAnalyticalDashboard),
+    "filterContexts": ("filter_contexts", CatalogDeclarativeFilterContext),
+}
+
+
 class LoadGoodDataSdk:
     # abstract level wrapper for GoodData Python SDK
     def __init__(self, gd_host: str = "", gd_token: str = ""):
@@ -29,21 +59,134 @@ class LoadGoodDataSdk:
         )
         self._host = gd_host.rstrip("/") if gd_host else ""
         self._token = gd_token
+        # collections are fetched lazily (and concurrently) on first access, see _bootstrap()
+        self._collections = {}
+        self._collections_lock = Lock()
+        self.load_timings = {}
+        # id/name lookup tables keyed by (object type, workspace id), see _index()
+        self._indexes = {}
+        # user <-> group memberships, built from users/groups on first use, see memberships
+        self._memberships = None
+        self._df_ws_id = None
         if gd_host:
             self._sdk = GoodDataSdk.create(gd_host, gd_token)
             self._gp = GoodPandas(gd_host, gd_token)
             self._df = None
-            self.workspaces = self._sdk.catalog_workspace.list_workspaces()
-            self.datasources = self._sdk.catalog_data_source.list_data_sources()
-            try:
-                self.users = (
-                    self._sdk.catalog_user.list_users()
-                )  # alternative get_declarative_users()
-                self.groups = self._sdk.catalog_user.list_user_groups()
-                self.admin = True
-            except Exception as ex:
-                self.admin = False
+
+    def _collection_loaders(self) -> dict:
+        # users and groups are admin-only calls, their failure must not block the rest
+        return {
+            "workspaces": self._sdk.catalog_workspace.list_workspaces,
+            "datasources": self._sdk.catalog_data_source.list_data_sources,
+            "users": self._sdk.catalog_user.list_users,  # alternative get_declarative_users()
+            "groups": self._sdk.catalog_user.list_user_groups,
+        }
+
+    def _timed_load(self, name: str, loader):
+        start = time()
+        try:
+            return loader()
+        finally:
+            self.load_timings[name] = time() - start
+            print(f"{name} loaded in {self.load_timings[name]:.2f} seconds")
+
+    def _bootstrap(self):
+        """Submit the collection loads not loaded (or loading) yet at once on a thread pool."""
+        with self._collections_lock:
+            loaders = {name: loader for name, loader in self._collection_loaders().items()
+                       if name not in self._collections}
+            if not loaders:
+                return
+            executor = ThreadPoolExecutor(max_workers=len(loaders), thread_name_prefix="gd-bootstrap")
+            self._collections.update({name: executor.submit(self._timed_load, name, loader)
+                                      for name, loader in loaders.items()})
+            executor.shutdown(wait=False)
+
+    def _drop_failed(self, names=None):
+        # failed loads are submitted again on the next access
+        with self._collections_lock:
+            for name in [n for n, f in self._collections.items()
+                         if (names is None or n in names) and f.done() and f.exception() is not None]:
+                del self._collections[name]
+
+    def _collection(self, name: str) -> list:
+        if not self._host:
+            return []
+        self._bootstrap()
+        try:
+            return self._collections[name].result()
+        except Exception as ex:
+            if name in ("users", "groups"):
+                # admin-only listings: their failure tells admin (kept until reload())
                 print(ex)
+                return []
+            self._drop_failed((name,))
+            raise
+
+    @property
+    def workspaces(self) -> list:
+        return self._collection("workspaces")
+
+    @property
+    def datasources(self) -> list:
+        return self._collection("datasources")
+
+    @property
+    def users(self) -> list:
+        return self._collection("users")
+
+    @property
+    def groups(self) -> list:
+        return self._collection("groups")
+
+    def _index(self, of_type: str, ws_id: str = "") -> dict:
+        """Return the lookup index for an object type, building it on first use.
+        Organization level objects are indexed by name, workspace objects (insights,
+        dashboards, metrics) by title - those are built by details() for the workspace.
+        """
+        key = (of_type, ws_id)
+        if key not in self._indexes:
+            if of_type in ORG_OBJECT_COLLECTIONS:
+                self._indexes[key] = build_lookup_index(getattr(self, ORG_OBJECT_COLLECTIONS[of_type]), "name")
+            else:
+                self.details(wks_id=ws_id, by="id")
+        return self._indexes[key]
+
+    def _index_analytics(self, wks_id: str, analytics: CatalogDeclarativeAnalyticsLayer):
+        for of_type, objects in (("insight", analytics.visualization_objects),
+                                 ("dashboard", analytics.analytical_dashboards),
+                                 ("metric", analytics.metrics)):
+            self._indexes[(of_type, wks_id)] = build_lookup_index(objects, "title")
+
+    def reload(self, wks_id: str = ""):
+        """Invalidate cached lookups of a single workspace (and collections that failed to load),
+        or of everything (collections included)."""
+        if wks_id:
+            for key in [k for k in self._indexes if k[1] == wks_id]:
+                del self._indexes[key]
+            self._drop_failed()
+            return
+        with self._collections_lock:
+            self._collections = {}
+            self._memberships = None
+        self._indexes = {}
+
+    @property
+    def memberships(self) -> MembershipIndex:
+        if self._memberships is None:
+            users, groups = self.users, self.groups
+            with self._collections_lock:
+                if self._memberships is None:
+                    self._memberships = MembershipIndex.build(users, groups)
+        return self._memberships
+
+    @property
+    def admin(self) -> bool:
+        # admin rights are derived from the success of the user/group listing
+        if not self._host:
+            return False
+        self._bootstrap()
+        return all(self._collections[name].exception() is None for name in ("users", "groups"))
 
     def clear_cache(self, ds_id: str):
         if ds_id:
@@ -51,43 +194,57 @@ class LoadGoodDataSdk:
         else:
             print("no datasource id submitted...")
 
+    def _remember(self, of_type: str, entity) -> None:
+        """Put an entity created in this session into its loaded collection and drop the lookup index built from it."""
+        with self._collections_lock:
+            future = self._collections.get(ORG_OBJECT_COLLECTIONS[of_type])
+            if future is not None and future.done() and future.exception() is None:
+                items = future.result()
+                items[:] = [item for item in items if item.id != entity.id] + [entity]
+        self._indexes.pop((of_type, ""), None)
+
     def create(self, ent_id: str, name: str = "", of_type: str = "ws", parent: str = ""):
-        if of_type == 'ws':  # workspace
-            self._sdk.catalog_workspace.create_or_update(
-                CatalogWorkspace(workspace_id=ent_id, name=name, parent_id=parent)
-            )
-        elif of_type == 'us':  # user
+        if of_type in ('ws', 'wf'):  # workspace, workspace filter
+            workspace = CatalogWorkspace(workspace_id=ent_id, name=name, parent_id=parent)
+            self._sdk.catalog_workspace.create_or_update(workspace)
+            self._remember("workspace", workspace)
+        elif of_type in ('us', 'uf'):  # user, user filter
             name_parts = name.split(" ")
             firstname = name_parts[0] if name_parts else ""
             lastname = name_parts[-1] if name_parts else ""
-            self._sdk.catalog_user.create_or_update_user(
-                CatalogUser.init(user_id=ent_id, firstname=firstname, lastname=lastname,
-                                 user_group_ids=[parent])
-            )
+            user = CatalogUser.init(user_id=ent_id, firstname=firstname, lastname=lastname, user_group_ids=[parent])
+            self._sdk.catalog_user.create_or_update_user(user)
+            self._remember("user", user)
+            if self._memberships is not None:
+                self._memberships.set_user_groups(ent_id, [parent] if parent else [])
         elif of_type == 'ug':  # user group
-            self._sdk.catalog_user.create_or_update_user_group(
-                CatalogUserGroup.init(user_group_id=ent_id, user_group_name=name)
-            )
-        elif of_type == 'wf':  # workspace filter
-            self._sdk.catalog_workspace.create_or_update(
-                CatalogWorkspace(workspace_id=ent_id, name=name, parent_id=parent)
-            )
-        elif of_type == 'uf':  # user filter
-            name_parts = name.split(" ")
-            firstname = name_parts[0] if name_parts else ""
-            lastname = name_parts[-1] if name_parts else ""
-            self._sdk.catalog_user.create_or_update_user(
-                CatalogUser.init(user_id=ent_id, firstname=firstname, lastname=lastname,
-                                 user_group_ids=[parent])
-            )
+            group = CatalogUserGroup.init(user_group_id=ent_id, user_group_name=name)
+            self._sdk.catalog_user.create_or_update_user_group(group)
+            self._remember("group", group)
+            if self._memberships is not None:
+                self._memberships.set_group_parents(ent_id, [])
+
+    def create_bulk(self, entities, max_workers: int = PROVISIONING_MAX_WORKERS):
+        """Create many entities (CSV or DataFrame with id, name, type, parent - types as in create).
+        Workspace hierarchies are created parents first, each level in parallel; existing entities are skipped.
+        Returns a DataFrame with the status of every entity.
+        """
+        results = BulkProvisioner(self, max_workers).run(entities)
+        # listings and lookups do not know the new entities yet
+        self.reload()
+        return results
 
     def data(self, ws_id="", vis_id="", pdf_export=False, path="", using_pandas=True):
         # returns data frame or pdf / must run details first
         if not vis_id:
             return self._gp.data_frames(ws_id)
         else:
+            if ws_id and ws_id != self._df_ws_id:
+                # data frames were prepared for another workspace (or not at all)
+                self._df = self._gp.data_frames(ws_id)
+                self._df_ws_id = ws_id
             if pdf_export:
-                dataframe_to_pdf(self._df.for_visualization(visualization_id=vis_id), pdf_path=path, num_pages=2)
+                dataframe_to_pdf(self._df.for_visualization(visualization_id=vis_id), pdf_path=path)
                 return None
             else:
                 if using_pandas:
@@ -106,7 +263,77 @@ class LoadGoodDataSdk:
         if by != "id":
             wks_id = self.get_id(wks_id, of_type="workspace")
         self._df = self.data(ws_id=wks_id)
-        return self._sdk.catalog_workspace_content.get_declarative_analytics_model(wks_id).analytics
+        self._df_ws_id = wks_id
+        analytics = self._sdk.catalog_workspace_content.get_declarative_analytics_model(wks_id).analytics
+        self._index_analytics(wks_id, analytics)
+        return analytics
+
+    def modified_analytics(self, wks_id: str, since: float) -> dict:
+        """Analytics objects created or modified since a unix timestamp, fetched via the entities API.
+        Returns {analytics attribute: (declarative objects, total count of the type in the workspace)}.
+        """
+        from datetime import datetime, timezone
+        from helpers import get_workspace_entities
+
+        # entities carry minute precision timestamps in UTC
+        since_str = datetime.fromtimestamp(since, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+        changes = {}
+        for entity_type, (attr_name, declarative_cls) in ANALYTICS_ENTITY_TYPES.items():
+            entities, total = get_workspace_entities(self._host, self._token, wks_id, entity_type, since_str)
+            objects = []
+            for entity in entities:
+                attributes = entity.get("attributes") or {}
+                objects.append(declarative_cls.from_dict({
+                    "id": entity["id"],
+                    **{k: attributes[k] for k in ("title", "description", "tags", "content", "createdAt",
+                                                   "modifiedAt", "isHidden") if attributes.get(k) is not None},
+                }))
+            changes[attr_name] = (objects, total)
+        return changes
+
+    def afm_for_visualization(self, ws_id: str, vis_id: str) -> dict:
+        """AFM execution request (API JSON) of a visualization: rows (and view by) attributes in the first
+        dimension, column attributes and the measure group in the second one."""
+        from gooddata_api_client.model_utils import model_to_dict
+        from gooddata_sdk.visualization import BucketType
+
+        vis = self._sdk.visualizations.get_visualization(workspace_id=ws_id, visualization_id=vis_id)
+        attributes = [a.as_computable() for a in vis.attributes]
+        metrics = [m.as_computable() for m in vis.metrics]
+        filters = [f for f in (vf.as_computable() for vf in vis.filters) if not f.is_noop()]
+        columns = vis.get_bucket_of_type(BucketType.COLS)
+        column_ids = {a.local_id for a in columns.attributes} if columns else set()
+        row_ids = [a.local_id for a in attributes if a.local_id not in column_ids]
+        col_ids = [a.local_id for a in attributes if a.local_id in column_ids] + (["measureGroup"] if metrics else [])
+        exec_def = ExecutionDefinition(attributes=attributes, metrics=metrics, filters=filters,
+                                       dimensions=[TableDimension(item_ids=row_ids or None),
+                                                   TableDimension(item_ids=col_ids or None)])
+        return model_to_dict(exec_def.as_api_model(), serialize=True)
+
+    def refresh_dashboard(self, ws_id: str, vis_ids: list[str], max_concurrency: int | None = None) -> DataFrame:
+        """Compute the visualizations of a dashboard at once (AFM requests submitted and polled concurrently).
+        Returns one row per visualization with its result size, pages read and error."""
+        from afm_client import execute_many
+        from helpers import HTTP_POOL_MAXSIZE
+
+        start = time()
+        executions, errors = {}, {}
+        for vis_id in vis_ids:
+            try:
+                executions[vis_id] = (ws_id, self.afm_for_visualization(ws_id, vis_id))
+            except Exception as ex:
+                errors[vis_id] = f"AFM not built: {ex}"
+        results = execute_many(self._host, self._token, executions, max_concurrency=max_concurrency or HTTP_POOL_MAXSIZE)
+        rows = []
+        for vis_id in vis_ids:
+            pages = results.get(vis_id, errors.get(vis_id))
+            failed = not isinstance(pages, list)
+            total = pages[0]["paging"]["total"] if not failed and pages else []
+            rows.append({"visualization_id": vis_id, "rows": total[0] if total else None,
+                         "columns": total[1] if len(total) > 1 else None, "pages": 0 if failed else len(pages),
+                         "error": str(pages) if failed else None})
+        print(f"{len(vis_ids)} visualizations of workspace {ws_id} computed in {time() - start:.2f} seconds")
+        return DataFrame(rows)
 
     def export(self, wks_id: str = "", by: str = "id", vis_id: str = "", export_format: str = "",
                location: str = ""):
@@ -144,26 +371,23 @@ class LoadGoodDataSdk:
         else:
             return None
 
+    def _workspace_index(self, of_type: str, ws_id: str = "") -> dict:
+        # lookup index of insights, dashboards or metrics, of the first workspace when ws_id is empty
+        return self._index(of_type, ws_id or self.first(of_type="workspace"))
+
     def get_id(self, name, of_type, main=""):
         if not name:
             return None
-        if of_type == "user":
-            return [u.id for u in self.users if name == u.name][0]
-        elif of_type == "group":
-            return [g.id for g in self.groups if name == g.name][0]
-        elif of_type == "datasource":
-            return [d.id for d in self.datasources if name == d.name][0]
-        elif of_type == "workspace":
-            return [w.id for w in self.workspaces if name == w.name][0]
+        if of_type in ORG_OBJECT_COLLECTIONS:
+            index = self._index(of_type)
+        elif of_type in ("insight", "dashboard", "metric"):
+            index = self._workspace_index(of_type, main)
         else:
-            temp = self.details(wks_id=main, by="id")
-            if of_type == "insight":
-                return [i.id for i in temp.visualization_objects if name == i.title][0]
-            elif of_type == "dashboard":
-                return [w.id for w in temp.analytical_dashboards if name == w.title][0]
-            elif of_type == "metric":
-                return [w.id for w in temp.metrics if name == w.title][0]
             return None
+        if name not in index["name"]:
+            # as the former list scans did
+            raise IndexError(f"no {of_type} named {name}")
+        return index["name"][name]
 
     def organization(self):
         # pretty(self._sdk.catalog_organization.get_organization().to_dict())
@@ -256,6 +480,17 @@ class LoadGoodDataSdk:
             permissions_for_assignee=[dashboard_permission]
         )
 
+    def apply_permissions(self, grants, prune: bool = False, dry_run: bool = False,
+                          max_workers: int = DEFAULT_MAX_WORKERS, rate_limit: float = DEFAULT_RATE_LIMIT) -> list[dict]:
+        """
+        Batch variant of assign_permissions/share_dashboard.
+
+        :param grants: (assignee id, 'user'/'userGroup', workspace id, level[, dashboard id]) tuples
+        :param prune: remove permissions of the touched workspaces/dashboards that are not in grants
+        :param dry_run: only compute the changes
+        :return: one dict per grant with status 'added' ('would_add' in a dry run), 'unchanged' or 'failed' (and error)
+        """
+        return PermissionBatch(self._sdk, max_workers, rate_limit).apply(grants, prune=prune, dry_run=dry_run)
 
     def specific(self, value, of_type="user", by="id", ws_id=""):
         # return specific object from semantic definition by its type
@@ -270,13 +505,14 @@ class LoadGoodDataSdk:
             return self._sdk.catalog_data_source.get_data_source(value)
         elif of_type == "workspace":
             return self._sdk.catalog_workspace.get_workspace(value)
-        elif of_type == "dashboard":
-            return [d for d in self.details(ws_id, by).analytical_dashboards if d.id == value][0]
+        elif of_type in ("dashboard", "metric"):
+            index = self._workspace_index(of_type, ws_id)
+            if value not in index["id"]:
+                raise IndexError(f"no {of_type} with id {value}")
+            return index["id"][value]
         elif of_type == "insight":
             # return self._sdk.insights.get_insight(value)
             return self.data(ws_id=ws_id, vis_id=value)
-        elif of_type == "metric":
-            return [m for m in self._sdk.catalog_workspace_content.get_metrics_catalog(ws_id) if m.id == value][0]
         return None
 
     def tree(self, of_id: str = "") -> Tree:
@@ -299,77 +535,16 @@ class LoadGoodDataSdk:
         # tree.show(line_type="ascii-em")
         return tree
 
+    def ws_schema_elements(self, ws_id) -> list[dict]:
+        """Cytoscape elements (nodes and edges) of the workspace dependency graph."""
+        ws_net = self._sdk.catalog_workspace_content.get_dependent_entities_graph(ws_id)
+        return build_schema_elements(ws_net.graph.nodes, ws_net.graph.edges)
+
     def ws_schema(self, ws_id):
         """
-        Convert CatalogDependentEntitiesResponse to a Pyvis network graph.
+        Convert CatalogDependentEntitiesResponse to Cytoscape elements (JSON).
         """
-        # Define hierarchy of node importance
-        NODE_PRIORITIES = {
-            "dataset": 1,  # Most important
-            "analyticalDashboard": 2,
-            "visualizationObject": 2,
-            "metric": 2,
-            "fact": 3,
-            "attribute": 4  # Least important # Labels not considered here
-        }
-
-        # Define colors for node types
-        NODE_COLORS = {
-            "dataset": "#FF5733",  # Bright red (Core)
-            "analyticalDashboard": "#2ECC40",  # Green (Descriptive)
-            "visualizationObject": "#3498DB",  # Blue (Measurable)
-            "metric": "#9B59B6",  # Purple
-            "fact": "#F1C40F",  # Yellow
-            "attribute": "#95A5A6"  # Gray
-        }
-
-        # Define node sizes based on importance
-        NODE_SIZES = {
-            "dataset": 50,
-            "analyticalDashboard": 40,
-            "visualizationObject": 40,
-            "metric": 40,
-            "fact": 30,
-            "attribute": 25
-        }
-
-        ws_net = self._sdk.catalog_workspace_content.get_dependent_entities_graph(ws_id)
-        elements = []
-
-        # Add nodes
-        for node in ws_net.graph.nodes:
-            if "." in node.id:
-                node_id = node.id.split(".")[0]
-            else:
-                node_id = node.id
-            if check_node_id(node_id, elements):
-                print("element present, skipping", node_id)
-                continue
-            elements.append({
-                "data": {
-                    "id": node_id,
-                    "label": node.title,
-                    "type": node.type,
-                    "importance": NODE_PRIORITIES.get(node.type, 5)  # Default to 0
-                },
-                "style": {
-                    "background-color": NODE_COLORS.get(node.type, "#999"),
-                    "width": NODE_SIZES.get(node.type, 20),
-                    "height": NODE_SIZES.get(node.type, 20),
-                    "font-size": "12px"
-                }
-            })
-
-        # Add edges
-        for edge in ws_net.graph.edges:
-            source, target = edge
-            if "." in source.id or "." in target.id:
-                continue
-            # source = source.split(".")[0]
-            # target = target.split(".")[0]
-            elements.append({"data": {"source": source.id, "target": target.id}})
-
-        return dumps(elements)
+        return dumps(self.ws_schema_elements(ws_id))
 
     def schema(self, dashboard_name, ws_id):
         """
@@ -400,11 +575,25 @@ class LoadGoodDataSdk:
 
         return schema
 
-    def users_in_group(self, group_id):
+    def users_in_group(self, group_id, nested: bool = False):
         # return users that belong to a specific group
-        listed = [user for user in self.users if user.relationships for group in user.relationships.user_groups.data if
-                  group and group.id == group_id]
-        return listed
+        return self.users_in_groups([group_id], nested)[group_id]
+
+    def users_in_groups(self, group_ids, nested: bool = False) -> dict:
+        """Users of many groups at once: {group id: [users]} (nested includes members of child groups)."""
+        users_by_id = self._index("user")["id"]
+        return {
+            group_id: [users_by_id[user_id] for user_id in sorted(user_ids) if user_id in users_by_id]
+            for group_id, user_ids in self.memberships.members_of(group_ids, nested).items()
+        }
+
+    def groups_of_users(self, user_ids, inherited: bool = False) -> dict:
+        """Groups of many users at once: {user id: [groups]} (inherited adds parent groups)."""
+        groups_by_id = self._index("group")["id"]
+        return {
+            user_id: [groups_by_id[group_id] for group_id in sorted(group_ids) if group_id in groups_by_id]
+            for user_id, group_ids in self.memberships.groups_of(user_ids, inherited).items()
+        }
 
     # ---------- LDM helpers ----------
     def get_declarative_ldm(self, wks_id: str):
@@ -699,6 +888,15 @@ def first_item(dataset, attr=""):
         return next(iter(dataset)).__getattribute__(attr)
 
 
+def build_lookup_index(objects, name_attr="name") -> dict:
+    # {"id": {id: object}, "name": {name/title: id}}, first occurrence wins (as the former list scans did)
+    index = {"id": {}, "name": {}}
+    for obj in objects or []:
+        index["id"].setdefault(obj.id, obj)
+        index["name"].setdefault(getattr(obj, name_attr, None), obj.id)
+    return index
+
+
 def encapsulate(column_name: str):
     if not column_name.startswith('"') and not column_name.endswith('"'):
         return '"' + column_name + '"'
@@ -706,49 +904,118 @@ def encapsulate(column_name: str):
         return column_name
 
 
-def check_node_id(node_id, list_of_objects):
-    for obj in list_of_objects:
-        if 'data' in obj and 'id' in obj['data']:
-            if obj['data']['id'] == node_id:
-                return True  # Found the node_id
-    return False  # node_id no
-
-def dataframe_to_pdf(dataframe, pdf_path, num_pages):
-    rows_per_page = math.ceil(len(dataframe) / num_pages)
-    pdf = FPDF()
-    for page in range(num_pages):
-        start_idx = page * rows_per_page
-        end_idx = min((page + 1) * rows_per_page, len(dataframe))
-        page_df = dataframe.iloc[start_idx:end_idx]
+def _pdf_text(values: Series, max_chars: int) -> list:
+    # cell texts of a column: cut to the column width, characters outside latin-1 (core fonts) replaced
+    text = values.astype(str).where(values.notna(), "")
+    long = text.str.len() > max_chars
+    text = text.where(~long, text.str.slice(0, max(max_chars - 1, 1)) + "~")
+    text = text.str.replace("\r", "", regex=False).str.replace("\n", " ", regex=False)
+    return [t.encode("latin-1", "replace").decode("latin-1") for t in text.tolist()]
+
+
+def dataframe_to_pdf(dataframe, pdf_path, font_size: int = PDF_FONT_SIZE, chunk_rows: int = PDF_CHUNK_ROWS,
+                     max_pages: int | None = None):
+    """Write a DataFrame as a PDF table: one line per row, header repeated on every page, page breaks
+    by row height. Rows are converted to text chunk by chunk (chunk_rows at once) instead of all at once,
+    but FPDF keeps the content of every page in memory until output(), so memory still grows with the
+    number of pages - use max_pages to cap it. Column widths follow the header and the first chunk,
+    longer texts are cut (ending with ~)."""
+    if not isinstance(dataframe.index, RangeIndex):
+        # row attributes of insight data frames are in the index
+        dataframe = dataframe.reset_index()
+    columns = [str(c) for c in dataframe.columns]
+    orientation = "L" if len(columns) > PDF_PORTRAIT_MAX_COLUMNS else "P"
+    pdf = FPDF(orientation=orientation, unit="mm", format="A4")
+    pdf.set_auto_page_break(False)
+    pdf.set_font("Arial", size=font_size)
+    margin = pdf.l_margin
+    row_height = font_size * 0.5
+    char_width = pdf.get_string_width("0")
+    usable_width = pdf.w - 2 * margin
+    rows_per_page = int((pdf.h - 2 * margin) // row_height) - 1
+
+    # widths proportional to the typical text length of the first chunk (and the header), at least PDF_MIN_CHARS
+    sample = dataframe.iloc[:chunk_rows]
+    wanted = [max(len(name), PDF_MIN_CHARS, int(sample[col].astype(str).str.len().quantile(0.9)) if len(sample) else 0)
+              for name, col in zip(columns, dataframe.columns)]
+    scale = min(1.0, usable_width / (sum(wanted) * char_width + len(wanted) * 2)) if wanted else 1.0
+    widths = [w * char_width * scale + 2 for w in wanted]
+    max_chars = [max(int((w - 2) / char_width), 1) for w in widths]
+    x_positions = [margin + sum(widths[:i]) for i in range(len(widths))]
+    header = [t.encode("latin-1", "replace").decode("latin-1")[:m] for t, m in zip(columns, max_chars)]
+    x_text = [x + 1 for x in x_positions]
+    y_text = [margin + row_height * (i + 1.75) for i in range(rows_per_page)]
+
+    def new_page():
         pdf.add_page()
-        # Convert DataFrame to a formatted table
-        table = tabulate(page_df, headers='keys', tablefmt='grid', showindex=False)
-        # Add the table to the PDF
-        pdf.set_font("Arial", size=12)
-        pdf.multi_cell(0, 10, table)
-    # Save the PDF
+        pdf.set_font("Arial", style="B", size=font_size)
+        for x, text in zip(x_positions, header):
+            pdf.text(x + 1, margin + row_height * 0.75, text)
+        pdf.set_font("Arial", size=font_size)
+        pdf.line(margin, margin + row_height, margin + sum(widths), margin + row_height)
+
+    page_row = rows_per_page  # start with a new page
+    pages = 0
+    for start in range(0, len(dataframe), chunk_rows):
+        chunk = dataframe.iloc[start:start + chunk_rows]
+        texts = [_pdf_text(chunk[col], m) for col, m in zip(dataframe.columns, max_chars)]
+        for offset, row in enumerate(zip(*texts)):
+            if page_row >= rows_per_page:
+                if max_pages and pages >= max_pages:
+                    pdf.text(margin, pdf.h - margin / 2, f"... {len(dataframe) - start - offset} more rows not exported")
+                    pdf.output(pdf_path)
+                    return
+                new_page()
+                pages += 1
+                page_row = 0
+            y = y_text[page_row]
+            for x, text in zip(x_text, row):
+                if text:
+                    pdf.text(x, y, text)
+            page_row += 1
+    if not pages:
+        new_page()
     pdf.output(pdf_path)
 
 
+def sql_literals(values: Series) -> Series:
+    """SQL literals of a column: strings quoted (with ' doubled), numbers as is, booleans TRUE/FALSE, missing NULL."""
+    missing = values.isna()
+    if is_bool_dtype(values):
+        literals = values.map({True: "TRUE", False: "FALSE"})
+    elif is_numeric_dtype(values):
+        literals = values.astype(str)
+    else:
+        is_text = values.map(type).eq(str)
+        text = values.where(is_text, "").astype(str)
+        literals = ("'" + text.str.replace("'", "''", regex=False) + "'").where(is_text, values.astype(str))
+    return literals.where(~missing, "NULL")
+
+
+def iter_csv_sql(csv_filename, batch_rows: int = 1000, limit: int | None = None, chunk_batches: int = 50,
+                 dtype=None):
+    """SQL queries (SELECT ... UNION ALL SELECT ...;) of at most batch_rows CSV rows each.
+    The CSV is read in chunks of chunk_batches batches and only up to limit rows; literals are
+    rendered column by column. Column aliases are set in the first SELECT of each query."""
+    reader = read_csv(csv_filename, chunksize=batch_rows * chunk_batches, nrows=limit, dtype=dtype)
+    for chunk in reader:
+        aliases = [encapsulate(str(col).strip()) for col in chunk.columns]
+        columns = [sql_literals(chunk[col]) for col in chunk.columns]
+        selects = columns[0]
+        for column in columns[1:]:
+            selects = selects + ", " + column
+        selects = ("SELECT " + selects).tolist()
+        for start in range(0, len(chunk), batch_rows):
+            first = "SELECT " + ", ".join(f"{column.iat[start]} AS {alias}" for column, alias in zip(columns, aliases))
+            rest = selects[start + 1:start + batch_rows]
+            yield " UNION ALL ".join([first] + rest) + ";"
+
+
 def csv_to_sql(csv_filename, limit=200):
-    # return single SQL query from CSV content
-    df = read_csv(csv_filename)
-    columns = df.columns
-    # Construct the SQL query using list comprehension
-    rows = [
-        "SELECT "
-        + ", ".join(
-            [
-                f"'{str(row[col])}' AS {encapsulate(col.strip())}"
-                if isinstance(row[col], str)
-                else f"{str(row[col])} AS {encapsulate(col.strip())}"
-                for col in columns
-            ]
-        )
-        for _, row in df.iterrows()
-    ]
+    # return single SQL query from the first limit rows of the CSV content
+    query = next(iter_csv_sql(csv_filename, batch_rows=limit, limit=limit), "")
     # return the dictionary of the final SQL query and table_name
-    return {"title": csv_filename, "query": " UNION ALL ".join(rows[:limit]) + ";"}
+    return {"title": csv_filename, "query": query}
 
 
 if __name__ == "__main__":
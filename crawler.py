@@ -0,0 +1,127 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import time
+from typing import Callable
+
+from pandas import DataFrame, concat
+from treelib import Tree
+
+from snapshot_store import SnapshotStore
+
+DEFAULT_MAX_WORKERS = 4
+CRAWL_STATE_FILE = "crawl_state.json"
+# bundle frames combined into the organization-wide tables
+ORG_TABLES = {"metrics": "metrics_df", "visualizations": "visuals_df", "dashboards": "dashes_df"}
+
+
+def workspace_order(tree: Tree) -> list[tuple[str, str]]:
+    """(workspace id, name) of a LoadGoodDataSdk.tree() breadth first, so parents come before their children."""
+    return [(node_id, tree.get_node(node_id).tag) for node_id in tree.expand_tree(mode=Tree.WIDTH) if node_id != "root"]
+
+
+class WorkspaceCrawler:
+    """Load the bundles (analytics, LDM, PDM mapping) of all workspaces with bounded concurrency.
+
+    Workspaces are taken from the tree() hierarchy, loaded by load_bundle(gd, ws_id, ws_name) on
+    max_workers threads and written to the snapshot store as they finish. The start of an unfinished
+    run is kept in a state file next to the snapshots; resuming skips the workspaces whose snapshot
+    is newer than that. run() returns throughput stats, org_tables() the organization-wide tables.
+    fingerprint(host, workspace_id), when given, is stored with each snapshot as its model version.
+    """
+
+    def __init__(self, gd, load_bundle: Callable, store: SnapshotStore, max_workers: int = DEFAULT_MAX_WORKERS,
+                 exclude: tuple = (), fingerprint: Callable | None = None):
+        self.gd = gd
+        self.load_bundle = load_bundle
+        self.store = store
+        self.max_workers = max_workers
+        self.exclude = exclude
+        self.fingerprint = fingerprint
+        self.state_path = store.root / CRAWL_STATE_FILE
+
+    def _read_state(self) -> dict:
+        try:
+            return json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, state: dict) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.state_path)
+
+    def _crawl_one(self, ws_id: str, ws_name: str) -> dict:
+        start = time()
+        # taken before loading: a change made during the load leaves the snapshot marked as older
+        fingerprint = self.fingerprint(self.gd._host, ws_id) if self.fingerprint else ""
+        bundle = self.load_bundle(self.gd, ws_id, ws_name)
+        self.store.save(self.gd._host, ws_id, bundle, exclude=self.exclude, fingerprint=fingerprint)
+        return {
+            "workspace_id": ws_id,
+            "seconds": time() - start,
+            "objects": sum(len(bundle.get(key, ())) for key in ORG_TABLES.values()),
+        }
+
+    def run(self, root_id: str = "", resume: bool = True, progress: Callable | None = None) -> dict:
+        """Crawl root_id and its descendants (all workspaces by default).
+        progress(finished, total, workspace_id) is called from the calling thread after each workspace."""
+        start = time()
+        workspaces = workspace_order(self.gd.tree(root_id))
+        state = self._read_state() if resume else {}
+        if state.get("finished") is False and state.get("root_id") == root_id:
+            since = state["started_at"]
+            todo = [(i, n) for i, n in workspaces if (self.store.saved_at(self.gd._host, i) or 0) < since]
+        else:
+            state = {"root_id": root_id, "started_at": start, "finished": False}
+            todo = workspaces
+        self._write_state(state)
+        skipped = len(workspaces) - len(todo)
+        print(f"crawling {len(todo)} workspaces with {self.max_workers} workers ({skipped} done before)")
+
+        results, failed = [], {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crawler") as pool:
+            futures = {pool.submit(self._crawl_one, ws_id, ws_name): ws_id for ws_id, ws_name in todo}
+            for finished, future in enumerate(as_completed(futures), start=1):
+                ws_id = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as ex:
+                    failed[ws_id] = str(ex)
+                    print(f"crawling workspace {ws_id} failed: {ex}")
+                if progress:
+                    progress(finished, len(todo), ws_id)
+        if not failed:
+            self._write_state({**state, "finished": True, "finished_at": time()})
+        elapsed = time() - start
+        objects = sum(r["objects"] for r in results)
+        slowest = max(results, key=lambda r: r["seconds"], default=None)
+        return {
+            "workspaces": len(workspaces),
+            "crawled": len(results),
+            "skipped": skipped,
+            "failed": failed,
+            "objects": objects,
+            "seconds": round(elapsed, 1),
+            "workspaces_per_second": round(len(results) / elapsed, 2) if elapsed else 0,
+            "objects_per_second": round(objects / elapsed, 1) if elapsed else 0,
+            "slowest": slowest and {"workspace_id": slowest["workspace_id"], "seconds": round(slowest["seconds"], 1)},
+        }
+
+    def org_tables(self, root_id: str = "") -> dict[str, DataFrame]:
+        """{"metrics", "visualizations", "dashboards": DataFrame} of all crawled workspaces, read from the
+        snapshots, with workspace_id/workspace_name columns in front."""
+        frames = {name: [] for name in ORG_TABLES}
+        for ws_id, ws_name in workspace_order(self.gd.tree(root_id)):
+            for name, key in ORG_TABLES.items():
+                df = self.store.load_frame(self.gd._host, ws_id, key)
+                if df is not None and not df.empty:
+                    frames[name].append(df.assign(workspace_id=ws_id, workspace_name=ws_name))
+        tables = {}
+        for name, parts in frames.items():
+            df = concat(parts, ignore_index=True) if parts else DataFrame()
+            if not df.empty:
+                df = df[["workspace_id", "workspace_name"] + [c for c in df.columns if c not in ("workspace_id", "workspace_name")]]
+            tables[name] = df
+        return tables
@@ -0,0 +1,248 @@
+import re
+
+import numpy as np
+from pandas import DataFrame, read_csv, to_datetime, to_numeric
+
+DEFAULT_CHUNKSIZE = 100000
+# rows kept (reservoir sampling) for example values
+DEFAULT_SAMPLE_ROWS = 1000
+# distinct values remembered per column, above that cardinality is reported as a lower bound
+DEFAULT_MAX_DISTINCT = 100000
+# date formats tried in order, the first one parsing every value of a column wins
+DATE_FORMATS = ["%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M", "%Y/%m/%d",
+                "%d.%m.%Y", "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d/%m/%Y", "%d/%m/%Y %H:%M",
+                "%m/%d/%Y", "%m/%d/%Y %H:%M", "%d-%m-%Y", "%Y-%m"]
+BOOLEAN_VALUES = {"true", "false", "yes", "no", "t", "f", "y", "n"}
+# integer columns with at most this share of distinct values are attributes, not facts
+ATTRIBUTE_MAX_DISTINCT_SHARE = 0.05
+KEY_NAME_RE = re.compile(r"(^|_)(id|key|code)$", re.IGNORECASE)
+# GoodData source column data types per inferred type
+SOURCE_DATA_TYPES = {"int": "INT", "float": "NUMERIC", "bool": "BOOLEAN", "date": "DATE", "timestamp": "TIMESTAMP",
+                     "text": "STRING"}
+DATE_GRANULARITIES = ["DAY", "WEEK", "MONTH", "QUARTER", "YEAR"]
+
+
+def identifier(name: str) -> str:
+    """GoodData object id from a column/file name."""
+    return re.sub(r"[^a-z0-9_]+", "_", str(name).strip().lower()).strip("_") or "column"
+
+
+def _title(name: str) -> str:
+    return re.sub(r"[_\s]+", " ", str(name)).strip().capitalize()
+
+
+class _ColumnStats:
+    # running statistics of one column, updated chunk by chunk with vectorized operations
+    def __init__(self, name: str, max_distinct: int):
+        self.name = name
+        self.max_distinct = max_distinct
+        self.rows = 0
+        self.nulls = 0
+        self.distinct = set()
+        self.overflow = False
+        self.duplicates = False
+        self.is_int = self.is_float = self.is_bool = True
+        self.date_formats = list(DATE_FORMATS)
+        self.min_length = None
+        self.max_length = 0
+
+    def update(self, values) -> None:
+        self.rows += len(values)
+        present = values[values.str.strip() != ""]
+        self.nulls += len(values) - len(present)
+        if present.empty:
+            return
+        # uniqueness within the chunk is known even when the distinct set overflowed
+        self.duplicates = self.duplicates or bool(present.duplicated().any())
+        unique = present.drop_duplicates()
+        if not self.overflow:
+            new = set(unique.tolist()) - self.distinct
+            if not self.duplicates and len(new) < len(unique):
+                self.duplicates = True  # seen in an earlier chunk
+            self.distinct |= new
+            if len(self.distinct) > self.max_distinct:
+                self.overflow = True
+                self.distinct = set()
+        lengths = unique.str.len()
+        self.min_length = int(lengths.min()) if self.min_length is None else min(self.min_length, int(lengths.min()))
+        self.max_length = max(self.max_length, int(lengths.max()))
+        # type checks on the distinct values of the chunk only
+        stripped = unique.str.strip()
+        if self.is_int:
+            self.is_int = bool(stripped.str.fullmatch(r"[+-]?\d+").all())
+        if self.is_float and not self.is_int:
+            self.is_float = bool(to_numeric(stripped, errors="coerce").notna().all())
+        if self.is_bool:
+            self.is_bool = bool(stripped.str.lower().isin(BOOLEAN_VALUES).all())
+        if self.date_formats and not self.is_float:
+            self.date_formats = [fmt for fmt in self.date_formats
+                                 if to_datetime(stripped, format=fmt, errors="coerce").notna().all()]
+        elif self.is_float:
+            self.date_formats = []
+
+    def profile(self) -> dict:
+        non_null = self.rows - self.nulls
+        if not non_null:
+            data_type, date_format = "text", None
+        elif self.is_bool and not self.is_int:
+            data_type, date_format = "bool", None
+        elif self.is_int:
+            data_type, date_format = "int", None
+        elif self.is_float:
+            data_type, date_format = "float", None
+        elif self.date_formats:
+            date_format = self.date_formats[0]
+            data_type = "timestamp" if "%H" in date_format else "date"
+        else:
+            data_type, date_format = "text", None
+        return {
+            "column": self.name,
+            "data_type": data_type,
+            "date_format": date_format,
+            "rows": self.rows,
+            "nulls": self.nulls,
+            "distinct": self.max_distinct if self.overflow else len(self.distinct),
+            "distinct_exact": not self.overflow,
+            "unique": non_null > 0 and not self.nulls and not self.duplicates,
+            "min_length": self.min_length,
+            "max_length": self.max_length,
+        }
+
+
+class CsvProfiler:
+    """Single pass, bounded memory profile of a CSV.
+
+    The file is read in chunks (as text) and every column keeps running statistics: null count,
+    distinct values up to max_distinct, within-file uniqueness, candidate types (int, float, bool,
+    date formats) and value lengths. A reservoir of sample_rows rows gives example values whatever
+    the file size. profile() returns one row per column with the inferred type and key role.
+    """
+
+    def __init__(self, chunksize: int = DEFAULT_CHUNKSIZE, sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                 max_distinct: int = DEFAULT_MAX_DISTINCT, seed: int = 0):
+        self.chunksize = chunksize
+        self.sample_rows = sample_rows
+        self.max_distinct = max_distinct
+        self._rng = np.random.default_rng(seed)
+        self.columns = {}
+        self.sample = DataFrame()
+        self.rows = 0
+
+    def _sample(self, chunk: DataFrame) -> None:
+        # reservoir sampling (algorithm R) applied to a whole chunk at once
+        positions = np.arange(self.rows, self.rows + len(chunk))
+        free = max(self.sample_rows - len(self.sample), 0)
+        if free:
+            self.sample = chunk.iloc[:free] if self.sample.empty else \
+                DataFrame(np.vstack([self.sample.to_numpy(), chunk.iloc[:free].to_numpy()]), columns=chunk.columns)
+        rest = positions[free:]
+        if not len(rest):
+            return
+        slots = (self._rng.random(len(rest)) * (rest + 1)).astype(np.int64)
+        accepted = np.flatnonzero(slots < self.sample_rows)
+        if len(accepted):
+            values = self.sample.to_numpy()
+            # later rows win a slot drawn twice, as in the sequential algorithm
+            values[slots[accepted]] = chunk.iloc[free:].to_numpy()[accepted]
+            self.sample = DataFrame(values, columns=chunk.columns)
+
+    def read(self, source) -> "CsvProfiler":
+        if hasattr(source, "seek"):
+            source.seek(0)
+        for chunk in read_csv(source, chunksize=self.chunksize, dtype=str, keep_default_na=False):
+            for name in chunk.columns:
+                self.columns.setdefault(name, _ColumnStats(name, self.max_distinct)).update(chunk[name])
+            self._sample(chunk)
+            self.rows += len(chunk)
+        return self
+
+    def profile(self) -> DataFrame:
+        rows = [stats.profile() for stats in self.columns.values()]
+        df = DataFrame(rows)
+        if df.empty:
+            return df
+        df["example"] = [self.sample[c].replace("", None).dropna().head(3).tolist() if c in self.sample else []
+                         for c in df["column"]]
+        roles = [column_role(row, self.rows) for row in rows]
+        # the first primary key candidate is the key, other unique key-like columns stay attributes
+        keys = [i for i, role in enumerate(roles) if role == "primary_key"]
+        for i in keys[1:]:
+            roles[i] = "attribute"
+        df["role"] = roles
+        return df
+
+
+def column_role(profile: dict, rows: int) -> str:
+    """primary_key, reference, date, fact or attribute."""
+    name = str(profile["column"])
+    if profile["data_type"] in ("date", "timestamp"):
+        return "date"
+    if KEY_NAME_RE.search(name) and profile["data_type"] in ("int", "text"):
+        return "primary_key" if profile["unique"] else "reference"
+    if profile["data_type"] == "float":
+        return "fact"
+    if profile["data_type"] == "int":
+        share = profile["distinct"] / max(rows - profile["nulls"], 1)
+        return "attribute" if profile["distinct_exact"] and share <= ATTRIBUTE_MAX_DISTINCT_SHARE else "fact"
+    return "attribute"
+
+
+def profile_csv(source, **kwargs) -> DataFrame:
+    return CsvProfiler(**kwargs).read(source).profile()
+
+
+def ldm_request(profile: DataFrame, dataset_id: str, data_source_id: str = "", table_path: list | None = None,
+                referenced_datasets: dict | None = None) -> dict:
+    """Declarative LDM ({"ldm": {"datasets", "dateInstances"}}) of one dataset built from a CSV profile.
+
+    The primary key becomes the grain, date columns become date datasets referenced by
+    the dataset, reference columns reference referenced_datasets[column] (or a dataset named after the
+    column without its _id suffix). Facts and attributes follow the profiled roles.
+    """
+    dataset_id = identifier(dataset_id)
+    referenced_datasets = referenced_datasets or {}
+    attributes, facts, references, date_instances, grain = [], [], [], [], []
+    for row in profile.to_dict("records"):
+        column, data_type = row["column"], SOURCE_DATA_TYPES[row["data_type"]]
+        obj_id = f"{dataset_id}.{identifier(column)}"
+        role = row["role"]
+        if role == "date":
+            date_id = identifier(column)
+            date_instances.append({
+                "id": date_id, "title": _title(column), "granularities": DATE_GRANULARITIES,
+                "granularitiesFormatting": {"titleBase": "", "titlePattern": "%titleBase - %granularityTitle"},
+                "tags": [_title(dataset_id)],
+            })
+            references.append({"identifier": {"id": date_id, "type": "dataset"}, "multivalue": False,
+                               "sourceColumns": [column], "sourceColumnDataTypes": [data_type]})
+        elif role == "reference":
+            target = referenced_datasets.get(column) or identifier(KEY_NAME_RE.sub("", identifier(column)) or column)
+            references.append({"identifier": {"id": target, "type": "dataset"}, "multivalue": False,
+                               "sourceColumns": [column], "sourceColumnDataTypes": [data_type]})
+        elif role == "fact":
+            facts.append({"id": obj_id, "title": _title(column), "sourceColumn": column,
+                          "sourceColumnDataType": data_type, "tags": [_title(dataset_id)]})
+        else:
+            attributes.append({"id": obj_id, "title": _title(column), "sourceColumn": column,
+                               "sourceColumnDataType": data_type, "labels": [], "tags": [_title(dataset_id)]})
+            if role == "primary_key":
+                grain.append({"id": obj_id, "type": "attribute"})
+    dataset = {
+        "id": dataset_id, "title": _title(dataset_id), "grain": grain, "references": references,
+        "attributes": attributes, "facts": facts, "tags": [_title(dataset_id)],
+    }
+    if data_source_id:
+        dataset["dataSourceTableId"] = {"dataSourceId": data_source_id, "id": dataset_id, "type": "dataSource",
+                                        "path": table_path or [dataset_id]}
+    return {"ldm": {"datasets": [dataset], "dateInstances": date_instances}}
+
+
+def pdm_request(profile: DataFrame, table_id: str, table_path: list | None = None) -> dict:
+    """Declarative PDM table ({"tables": [...]}) of the CSV as loaded into a data source."""
+    table_id = identifier(table_id)
+    return {"tables": [{
+        "id": table_id, "type": "TABLE", "path": table_path or [table_id],
+        "columns": [{"name": row["column"], "dataType": SOURCE_DATA_TYPES[row["data_type"]],
+                     "isPrimaryKey": row["role"] == "primary_key"}
+                    for row in profile.to_dict("records")],
+    }]}
@@ -8,6 +8,7 @@ from gooddata_sdk import CatalogAttribute, CatalogFact, CatalogLabel
 
 from gooddata.__init import DEFAULT_EMPTY_SELECT_OPTION_ID
 from gooddata.catalog import Catalog, ids_with_default, get_title_for_id
+from gooddata.execute import PagedInsightResult
 from streamlit_ext.altair_charts import AltairCharts
 from streamlit_ext.geo_chart import render_geo_chart
 
@@ -197,6 +198,16 @@ class Charts:
     def render_table(self, df: pd.DataFrame) -> None:
         # TODO - find or implement a robust table component supporting sorting/paging out-of-the-box
         sub_df = self.app_state.handle_paging(df)
+        self.render_html_table(sub_df)
+
+    def render_paged_table(self, paged_result: PagedInsightResult) -> None:
+        # Only the window of the current page is fetched from the execution result
+        page_number = self.app_state.render_paging(paged_result.row_count)
+        with st.container():
+            self.render_html_table(paged_result.page(page_number))
+
+    @staticmethod
+    def render_html_table(sub_df: pd.DataFrame) -> None:
         #st.dataframe(sub_df, use_container_width=True, height=500)
         #st.table(sub_df)
         #st.write(sub_df)
@@ -5,9 +5,11 @@ import streamlit as st
 from gooddata.__init import DEFAULT_EMPTY_SELECT_OPTION_ID
 from app_ext.charts import Charts
 from app_ext.catalog_dropdown import CatalogDropDown
-from app_ext.state import AppState
+from app_ext.state import AppState, PER_PAGE
 from gooddata.catalog import Catalog
-from gooddata.execute import execute_custom_insight, get_attribute_values, invalidate_gd_caches
+from gooddata.execute import (
+    execute_custom_insight, execute_custom_insight_paged, get_attribute_values, invalidate_gd_caches
+)
 from gooddata.sdk_wrapper import GoodDataSdkWrapper
 from gooddata_sdk import CatalogAttribute, CatalogLabel
 
@@ -157,20 +159,37 @@ class InsightBuilder:
             st.info("Add a non-date attribute or fact/metric.")
         elif self.app_state.is_anything_selected():
             charts.render_chart_header_filters_metric_func_sort_by()
-            gd_frames = self.sdk_wrapper.pandas.data_frames(self.workspace_id)
             # Execute report only with metrics/attributes relevant for the chart type
             # E.g. Donut Chart makes sense with only 1 metric and 1 attribute(view_by)
             metrics_with_functions, attribute_ids = self.get_relevant_metrics_attributes(charts.chart_type, catalog)
-            df = execute_custom_insight(
-                self.logger, gd_frames,
-                # Must pass each property separately to utilize st.cache_data feature!
-                metrics_with_functions,
-                attribute_ids,
-                self.app_state.selected_filter_attribute_values(),
-            )
-            df = self.sort_data_frame(df, catalog)
-
-            charts.render_chart(df, metrics_with_functions)
+            if charts.chart_type == "Table" and not catalog.selected_sort_by:
+                # Unsorted tables are read page by page, sorting is done locally on the whole result
+                paged_result = execute_custom_insight_paged(
+                    self.logger, self.sdk_wrapper.sdk, self.workspace_id,
+                    metrics_with_functions,
+                    attribute_ids,
+                    self.app_state.selected_filter_attribute_values(),
+                    PER_PAGE,
+                )
+                try:
+                    charts.render_paged_table(paged_result)
+                except Exception as e:
+                    # even a fresh execution could not be read, compute this result again on the next rerun
+                    paged_result.invalidate()
+                    self.logger.error(f"Reading the paged result failed: {e}")
+                    st.error("Reading the report failed, rerun to compute it again.")
+            else:
+                gd_frames = self.sdk_wrapper.pandas.data_frames(self.workspace_id)
+                df, _ = execute_custom_insight(
+                    self.logger, gd_frames,
+                    # Must pass each property separately to utilize st.cache_data feature!
+                    metrics_with_functions,
+                    attribute_ids,
+                    self.app_state.selected_filter_attribute_values(),
+                )
+                df = self.sort_data_frame(df, catalog)
+
+                charts.render_chart(df, metrics_with_functions)
         else:
             st.info(
                 "Either pick metrics/view_by/segmented_by in the left panel "
@@ -115,8 +115,11 @@ class AppState:
             result[object_id] = self.get(f"selected_sort_by_desc__{object_id}", False)
         return result
 
-    def handle_paging(self, df: pd.DataFrame) -> pd.DataFrame:
-        last_page = (len(df) // PER_PAGE) + 1
+    def render_paging(self, row_count: int) -> int:
+        last_page = max((row_count - 1) // PER_PAGE + 1, 1)
+        if self.get("page_number") > last_page:
+            # the result got smaller (e.g. a filter was added)
+            self.set("page_number", 1)
         first_row = st.container()
         left_column, mid_column, right_column = first_row.columns([1, 1, 1])
         if left_column.button("Previous"):
@@ -131,10 +134,13 @@ class AppState:
                 self.set("page_number", self.get("page_number") + 1)
         with mid_column:
             st.write(f"Page number: {self.get('page_number')}/{last_page}")
+        return self.get("page_number")
 
+    def handle_paging(self, df: pd.DataFrame) -> pd.DataFrame:
+        page_number = self.render_paging(len(df))
         # Get start and end indices of the next page of the dataframe
-        start_idx = (self.get('page_number') - 1) * PER_PAGE
-        end_idx = self.get('page_number') * PER_PAGE
+        start_idx = (page_number - 1) * PER_PAGE
+        end_idx = page_number * PER_PAGE
         return df.iloc[start_idx:end_idx]
 
     def debug_state(self, state_field: str = None, suffix_msg: str = ""):
@@ -9,8 +9,7 @@ def get_parser(description: str) -> argparse.ArgumentParser:
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
 
-def parse_arguments(description: str):
-    parser = get_parser(description)
+def add_gooddata_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
     parser.add_argument('--debug', action='store_true', default=False,
                         help='Increase logging level to DEBUG')
 
@@ -26,4 +25,10 @@ def parse_arguments(description: str):
                         default=os.getenv("GOODDATA_OVERRIDE_HOST"))
     parser.add_argument("-gacc", "--gooddata-allow-clear-caches", action='store_true', default=False,
                         help="Allow button for clearing GoodData caches.")
+    return parser
+
+
+def parse_arguments(description: str):
+    parser = get_parser(description)
+    add_gooddata_arguments(parser)
     return parser.parse_args()
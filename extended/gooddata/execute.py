@@ -1,14 +1,18 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
 from time import time
 from datetime import date
-from typing import Union
+from typing import Optional, Union
+import attr
 import streamlit as st
 import pandas as pd
 from logging import Logger
 from gooddata_sdk import (
     ObjId, CatalogMetric, CatalogAttribute, Insight, CatalogWorkspace,
-    AbsoluteDateFilter,
+    AbsoluteDateFilter, ExecutionDefinition, Execution, ExecutionResult,
 )
 import gooddata_pandas as gp
+from gooddata_pandas.result_convertor import DataFrameMetadata
 from gooddata_sdk import GoodDataSdk
 from gooddata.__init import log_duration, generate_execution_definition
 from gooddata.catalog import get_data_source_id
@@ -26,6 +30,14 @@ def execute_stored_insight(_logger: Logger, _frames: gp.DataFrameFactory, insigh
 def get_attribute_values(_sdk: GoodDataSdk, workspace_id: str, attribute_id: str) -> list[str]:
     return _sdk.catalog_workspace_content.get_label_elements(workspace_id, attribute_id)
 
+def exec_def_to_data_frame(
+    frames: gp.DataFrameFactory, execution_definition: ExecutionDefinition, page_size: int = 10000
+) -> tuple[pd.DataFrame, DataFrameMetadata]:
+    # Single pass - the execution result is read (and converted) exactly once
+    df, df_metadata = frames.for_exec_def(exec_def=execution_definition, page_size=page_size)
+    df.columns = df.columns.map(''.join)
+    return df, df_metadata
+
 @st.cache_data
 def execute_custom_insight(
     _logger: Logger,
@@ -33,20 +45,160 @@ def execute_custom_insight(
     metrics_with_func: dict[str, str],
     attribute_ids: list[str],
     filter_values: dict[str, list[str]] = None
-) -> pd.DataFrame:
+) -> tuple[pd.DataFrame, DataFrameMetadata]:
     start = time()
     execution_definition = generate_execution_definition(
         metrics_with_func,
         attribute_ids,
         filter_values
     )
-    df, df_metadata = _frames.for_exec_def(exec_def=execution_definition, page_size=10000)
-    df_from_result_id, df_metadata_from_result_id = _frames.for_exec_result_id(
-        result_id=df_metadata.execution_response.result_id,
-    )
-    df_from_result_id.columns = df_from_result_id.columns.map(''.join)
+    df, df_metadata = exec_def_to_data_frame(_frames, execution_definition)
+    # Live execution response holds the API client, it can't be pickled, it can't be cached by Streamlit
+    df_metadata = attr.evolve(df_metadata, execution_response=None)
     log_duration(_logger, f"execute_custom_insight", start)
-    return df_from_result_id
+    return df, df_metadata
+
+# shared by all paged results (cached by Streamlit, never shut down one by one), one window is read ahead per result
+PREFETCH_WORKERS = 4
+_prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="gd-page-prefetch")
+
+
+class PagedInsightResult:
+    """Execution result read window by window (offset/limit paging), the next window is prefetched in background.
+
+    Only a few windows are kept in memory, the whole result never leaves the server. The object outlives
+    the server-side result (it is cached by Streamlit), so a window that cannot be read triggers a new
+    execution of the same definition and one more try. invalidate() makes the next page() execute again.
+    """
+    KEEP_PAGES = 3
+
+    def __init__(self, logger: Logger, sdk: GoodDataSdk, workspace_id: str, exec_def: ExecutionDefinition,
+                 page_size: int) -> None:
+        self.logger = logger
+        self.sdk = sdk
+        self.workspace_id = workspace_id
+        self.exec_def = exec_def
+        self.page_size = page_size
+        self.total_rows: Optional[int] = None
+        self._pages: dict[int, Future] = {}
+        self._lock = Lock()
+        self._stale = False
+        self.execution = self._execute()
+
+    def _execute(self) -> Execution:
+        start = time()
+        execution = self.sdk.compute.for_exec_def(self.workspace_id, self.exec_def)
+        log_duration(self.logger, "execute_custom_insight_paged", start)
+        return execution
+
+    def _reexecute(self, failed: Execution) -> None:
+        with self._lock:
+            # another window may have re-executed already
+            if self.execution is not failed:
+                return
+        # outside the lock, page() and the prefetch are not blocked for the whole execution
+        execution = self._execute()
+        with self._lock:
+            if self.execution is failed:
+                self.execution = execution
+                self._pages.clear()
+                self._stale = False
+
+    def invalidate(self) -> None:
+        """Drop the read windows, the next page() executes the definition again."""
+        with self._lock:
+            self._stale = True
+            self._pages.clear()
+
+    @property
+    def measure_count(self) -> int:
+        return max(len(self.exec_def.metrics), 1)
+
+    def _read_window(self, execution: Execution, offset: int):
+        if len(execution.dimensions) > 1:
+            return execution.read_result(limit=[self.page_size, self.measure_count], offset=[offset, 0])
+        return execution.read_result(limit=[self.page_size], offset=[offset])
+
+    def read_page(self, page_number: int) -> pd.DataFrame:
+        start = time()
+        offset = (page_number - 1) * self.page_size
+        execution = self.execution
+        try:
+            result = self._read_window(execution, offset)
+        except Exception as e:
+            # the result expired on the server (or the execution failed), compute it again
+            self.logger.warning(f"read_page {page_number=} failed, re-executing: {e}")
+            self._reexecute(execution)
+            execution = self.execution
+            result = self._read_window(execution, offset)
+        self.total_rows = result.paging_total[0]
+        log_duration(self.logger, f"read_page {page_number=}", start)
+        return page_to_data_frame(execution, result)
+
+    def _submit(self, page_number: int) -> Future:
+        with self._lock:
+            if page_number not in self._pages:
+                self._pages[page_number] = _prefetch_executor.submit(self.read_page, page_number)
+                # forget the oldest windows
+                for old_page in list(self._pages)[:-self.KEEP_PAGES]:
+                    del self._pages[old_page]
+            return self._pages[page_number]
+
+    @property
+    def row_count(self) -> int:
+        if self.total_rows is None:
+            # total is known after the first window is read, it is displayed first anyway
+            self.page(1)
+        return self.total_rows
+
+    def page(self, page_number: int) -> pd.DataFrame:
+        if self._stale:
+            self._reexecute(self.execution)
+        future = self._submit(page_number)
+        try:
+            df = future.result()
+        except Exception:
+            # do not keep the failure cached, next rerun tries again
+            with self._lock:
+                if self._pages.get(page_number) is future:
+                    del self._pages[page_number]
+            raise
+        if page_number * self.page_size < (self.total_rows or 0):
+            self._submit(page_number + 1)
+        return df
+
+
+def page_to_data_frame(execution: Execution, result: ExecutionResult) -> pd.DataFrame:
+    # Same column names as the flattened (and index-reset) data frame produced by execute_custom_insight
+    data = {}
+    row_headers = execution.dimensions[0]["headers"]
+    for i, header in enumerate(row_headers):
+        if "attributeHeader" in header:
+            label_name = header["attributeHeader"]["labelName"]
+            data[label_name] = [h["attributeHeader"]["labelValue"] for h in result.get_all_headers(0)[i]]
+    if len(execution.dimensions) > 1:
+        measure_headers = execution.dimensions[1]["headers"][0]["measureGroupHeaders"]
+        for j, measure in enumerate(measure_headers):
+            data[measure.get("name", measure["localIdentifier"])] = [row[j] for row in result.data]
+    return pd.DataFrame(data)
+
+
+@st.cache_resource(max_entries=16)
+def execute_custom_insight_paged(
+    _logger: Logger,
+    _sdk: GoodDataSdk,
+    workspace_id: str,
+    metrics_with_func: dict[str, str],
+    attribute_ids: list[str],
+    filter_values: dict[str, list[str]] = None,
+    page_size: int = 20,
+) -> PagedInsightResult:
+    execution_definition = generate_execution_definition(
+        metrics_with_func,
+        attribute_ids,
+        filter_values
+    )
+    return PagedInsightResult(_logger, _sdk, workspace_id, execution_definition, page_size)
 
 def datetime_to_str(date_obj: date) -> str:
     return date_obj.strftime("%Y-%m-%d")
@@ -0,0 +1,203 @@
+import json
+import os
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from logging import Logger
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Optional
+
+from gooddata_sdk import GoodDataSdk
+
+from gooddata.args import add_gooddata_arguments, get_parser
+from gooddata.logger import get_logger
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PER_WORKSPACE = 2
+DEFAULT_CHECKPOINT = ".gooddata_cache/pre_cache_checkpoint.json"
+# how often (in finished insights) progress is logged and the checkpoint written
+REPORT_EVERY = 25
+
+
+def dashboard_usage(analytics) -> Counter:
+    """Count how many dashboards reference each insight (visualization object) id."""
+    usage = Counter()
+
+    def walk(node, found: set):
+        if isinstance(node, dict):
+            identifier = node.get("identifier")
+            if isinstance(identifier, dict) and identifier.get("type") in ("visualizationObject", "insight"):
+                found.add(identifier.get("id"))
+            for value in node.values():
+                walk(value, found)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value, found)
+
+    for dashboard in getattr(analytics, "analytical_dashboards", None) or []:
+        found = set()
+        walk(dashboard.content, found)
+        usage.update(found)
+    return usage
+
+
+class InsightPreCache:
+    """Warm up GoodData caches by computing insights in parallel.
+
+    At most max_workers insights compute at once overall and at most per_workspace within one
+    workspace. Insights used by more dashboards go first. Finished insights are recorded in a
+    checkpoint file, so an interrupted run (or one with failures) resumes where it stopped; the
+    checkpoint of a complete run is marked finished and the next run starts over.
+    """
+
+    def __init__(self, logger: Logger, sdk: GoodDataSdk, max_workers: int = DEFAULT_MAX_WORKERS,
+                 per_workspace: int = DEFAULT_PER_WORKSPACE, checkpoint: Optional[str] = DEFAULT_CHECKPOINT):
+        self.logger = logger
+        self.sdk = sdk
+        self.max_workers = max_workers
+        self.per_workspace = per_workspace
+        self.checkpoint = Path(checkpoint) if checkpoint else None
+        self._lock = Lock()
+        self._done = self._read_checkpoint()
+
+    def _read_checkpoint(self) -> set:
+        if not self.checkpoint or not self.checkpoint.exists():
+            return set()
+        try:
+            state = json.loads(self.checkpoint.read_text())
+        except (OSError, ValueError):
+            self.logger.warning(f"Checkpoint {self.checkpoint} unreadable, starting from scratch")
+            return set()
+        if state.get("finished"):
+            # the previous run completed, this is a new warm-up rather than a resume
+            return set()
+        return set(state.get("done", []))
+
+    def _write_checkpoint(self, finished: bool = False) -> None:
+        if not self.checkpoint:
+            return
+        self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint.with_suffix(".tmp")
+        with self._lock:
+            tmp.write_text(json.dumps({"done": sorted(self._done), "finished": finished}))
+        os.replace(tmp, self.checkpoint)
+
+    def plan(self, workspaces: list) -> list[tuple]:
+        """(workspace_id, insight, dashboard usage) still to compute, most used first."""
+        tasks = []
+        for workspace_id in workspaces:
+            insights = self.sdk.insights.get_insights(workspace_id)
+            try:
+                analytics = self.sdk.catalog_workspace_content.get_declarative_analytics_model(workspace_id).analytics
+                usage = dashboard_usage(analytics)
+            except Exception as e:
+                self.logger.warning(f"Dashboard usage of workspace={workspace_id} not available: {e}")
+                usage = Counter()
+            for insight in insights:
+                if f"{workspace_id}/{insight.id}" not in self._done:
+                    tasks.append((workspace_id, insight, usage[insight.id]))
+        tasks.sort(key=lambda t: -t[2])
+        return tasks
+
+    def run(self, workspaces: list = None) -> dict:
+        start = time()
+        if not workspaces:
+            workspaces = [w.id for w in self.sdk.catalog_workspace.list_workspaces()]
+        tasks = self.plan(workspaces)
+        skipped = len(self._done)
+        self.logger.info(f"Pre-caching {len(tasks)} insights in {len(workspaces)} workspaces ({skipped} done before)")
+        # one queue per workspace (most used first), a task is submitted only when its workspace has a free
+        # slot, so pool threads never wait on a busy workspace while other workspaces have work
+        queues = {}
+        for ws_id, insight, usage in tasks:
+            queues.setdefault(ws_id, deque()).append((insight, usage))
+        running = Counter()
+
+        def next_task():
+            ready = [ws_id for ws_id, queue in queues.items() if queue and running[ws_id] < self.per_workspace]
+            if not ready:
+                return None
+            ws_id = max(ready, key=lambda w: queues[w][0][1])
+            running[ws_id] += 1
+            return ws_id, queues[ws_id].popleft()[0]
+
+        finished, failed = 0, []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pre_cache") as pool:
+            futures = {}
+            try:
+                while True:
+                    while len(futures) < self.max_workers and (task := next_task()):
+                        ws_id, insight = task
+                        futures[pool.submit(self.sdk.tables.for_insight, ws_id, insight)] = (ws_id, insight.id)
+                    if not futures:
+                        break
+                    completed, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        ws_id, insight_id = futures.pop(future)
+                        running[ws_id] -= 1
+                        finished += 1
+                        if future.exception() is not None:
+                            failed.append(f"{ws_id}/{insight_id}")
+                            self.logger.warning(f"Pre-cache of insight={insight_id} workspace={ws_id} failed: {future.exception()}")
+                        else:
+                            with self._lock:
+                                self._done.add(f"{ws_id}/{insight_id}")
+                        if finished % REPORT_EVERY == 0 or finished == len(tasks):
+                            self._report(finished, len(tasks), start)
+                            self._write_checkpoint()
+            except KeyboardInterrupt:
+                self.logger.warning("Interrupted, saving checkpoint")
+                for future in futures:
+                    future.cancel()
+                self._write_checkpoint()
+                raise
+        # a complete run is marked finished, the next run warms up everything again
+        self._write_checkpoint(finished=not failed)
+        elapsed = time() - start
+        return {
+            "computed": finished - len(failed),
+            "failed": failed,
+            "skipped": skipped,
+            "seconds": round(elapsed, 1),
+            "insights_per_second": round((finished - len(failed)) / elapsed, 2) if elapsed else 0,
+        }
+
+    def _report(self, finished: int, total: int, start: float) -> None:
+        elapsed = time() - start
+        rate = finished / elapsed if elapsed else 0
+        eta = (total - finished) / rate if rate else 0
+        self.logger.info(f"Pre-cached {finished}/{total} insights, {rate:.2f} insights/s, eta={int(eta)}s")
+
+
+def parse_arguments(description: str):
+    parser = add_gooddata_arguments(get_parser(description))
+    parser.add_argument("-w", "--workspaces", nargs="*", default=None,
+                        help="Workspace ids to warm up (all workspaces by default)")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Insights computed concurrently overall")
+    parser.add_argument("--per-workspace", type=int, default=DEFAULT_PER_WORKSPACE,
+                        help="Insights computed concurrently within one workspace")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                        help="File tracking finished insights, to resume an interrupted run")
+    parser.add_argument("--restart", action="store_true", default=False,
+                        help="Ignore the checkpoint and warm up all insights again")
+    return parser.parse_args()
+
+
+def main():
+    from gooddata.sdk_wrapper import GoodDataSdkWrapper
+
+    args = parse_arguments("Warm up GoodData caches by computing insights")
+    logger = get_logger("pre-cache", args.debug)
+    if args.restart and Path(args.checkpoint).exists():
+        Path(args.checkpoint).unlink()
+    sdk_wrapper = GoodDataSdkWrapper(args, logger)
+    stats = sdk_wrapper.pre_cache_insights(
+        args.workspaces, max_workers=args.max_workers, per_workspace=args.per_workspace, checkpoint=args.checkpoint
+    )
+    logger.info(f"Pre-cache finished {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ from typing import Optional
 from gooddata_sdk import GoodDataSdk
 import gooddata_pandas as gp
 
+from gooddata.pre_cache import DEFAULT_MAX_WORKERS, DEFAULT_PER_WORKSPACE, InsightPreCache
+
 
 class GoodDataSdkWrapper:
     # Timeout=600 because supporting waiting for All-in-one image starts
@@ -46,11 +48,8 @@ class GoodDataSdkWrapper:
         self.sdk.support.wait_till_available(timeout=timeout)
         self.logger.info(f"Host {self.host} is up")
 
-    def pre_cache_insights(self, workspaces: list = None) -> None:
-        if not workspaces:
-            workspaces = [w.id for w in self.sdk.catalog_workspace.list_workspaces()]
-        for workspace_id in workspaces:
-            insights = self.sdk.insights.get_insights(workspace_id)
-
-            for insight in insights:
-                self.sdk.tables.for_insight(workspace_id, insight)
+    def pre_cache_insights(self, workspaces: list = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                           per_workspace: int = DEFAULT_PER_WORKSPACE, checkpoint: Optional[str] = None) -> dict:
+        # see gooddata.pre_cache for the CLI entry point
+        pre_cache = InsightPreCache(self.logger, self.sdk, max_workers, per_workspace, checkpoint)
+        return pre_cache.run(workspaces)
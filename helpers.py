@@ -1,8 +1,113 @@
-from requests import exceptions, get, post, delete
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from hashlib import sha1
+from pathlib import Path
+from threading import Lock
+from requests import Session, exceptions
+from requests.adapters import HTTPAdapter
 from time import time
+from urllib3.util.retry import Retry
 import json
 
-def html_cytoscape(elements_json: str):
+from csv_profile import identifier, ldm_request, pdm_request, profile_csv
+
+# shared HTTP client limits: (connect, read) timeout in seconds, pooled connections per host
+HTTP_TIMEOUT = (5, 30)
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 20
+HTTP_RETRIES = 3
+# entity collections making up the model version of a workspace (see workspace_model_version)
+MODEL_VERSION_TIMESTAMPED_TYPES = ("metrics", "visualizationObjects", "analyticalDashboards", "filterContexts")
+MODEL_VERSION_COUNTED_TYPES = ("datasets", "attributes", "facts")
+# JSON:API type of the workspace entity collections writable one object at a time
+ENTITY_TYPES = {"attributeHierarchies": "attributeHierarchy", "metrics": "metric", "filterContexts": "filterContext",
+                "visualizationObjects": "visualizationObject", "dashboardPlugins": "dashboardPlugin",
+                "analyticalDashboards": "analyticalDashboard"}
+
+
+class HttpClient:
+    """Keep-alive HTTP client shared by all REST helpers.
+
+    One requests Session with pooled connections per host, uniform timeouts, gzip negotiation and
+    retries with exponential backoff on 429/503 (honouring Retry-After).
+    """
+
+    def __init__(self, timeout=HTTP_TIMEOUT, pool_connections: int = HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE, retries: int = HTTP_RETRIES):
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset({"GET", "HEAD", "POST", "PUT", "DELETE"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+
+    def request(self, method: str, url: str, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def stats(self) -> dict:
+        """Connections opened versus reused across all pooled hosts."""
+        pools = self.adapter.poolmanager.pools
+        # public mapping API only, a pool evicted in between is skipped
+        host_pools = [pool for pool in (pools.get(key) for key in pools.keys()) if pool is not None]
+        opened = sum(p.num_connections for p in host_pools)
+        requests_sent = sum(p.num_requests for p in host_pools)
+        return {
+            "hosts": len(host_pools),
+            "requests": requests_sent,
+            "connections_opened": opened,
+            "connections_reused": max(requests_sent - opened, 0),
+        }
+
+
+_client = None
+_client_lock = Lock()
+
+
+def http_client() -> HttpClient:
+    """Process-wide HttpClient (created on first use)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+@lru_cache(maxsize=32)
+def auth_headers(token: str, content_type: str = "", accept: str = "") -> dict:
+    """Bearer headers for a token, built once per token/content type combination (do not mutate)."""
+    headers = {"Authorization": f"Bearer {token}"}
+    if content_type:
+        headers["Content-Type"] = content_type
+    if accept:
+        headers["Accept"] = accept
+    return headers
+
+
+def html_cytoscape(elements_json: str, layout_key: str = ""):
+    """Cytoscape page of the graph elements. Nodes with positions use a preset layout; otherwise the
+    positions computed by dagre are kept in the browser localStorage under layout_key (a graph hash)
+    and reused while the graph does not change."""
     html_code = f"""
     <!DOCTYPE html>
     <html lang="en">
@@ -116,7 +221,27 @@ def html_cytoscape(elements_json: str):
             }}
 
             const elements = {elements_json};
-            const graphLayout = getGraphLayout();
+            const layoutKey = {json.dumps("gd-graph-layout:" + layout_key if layout_key else None)};
+            const isNode = el => el.data.source === undefined;
+
+            function storedPositions() {{
+                try {{
+                    const raw = layoutKey && window.localStorage.getItem(layoutKey);
+                    return raw ? JSON.parse(raw) : null;
+                }} catch (error) {{
+                    return null;
+                }}
+            }}
+
+            // positions precomputed on the server side (schema_graph.reduce_graph) or cached from a former layout skip the client layout
+            let hasPositions = elements.length > 0 && elements.every(el => !isNode(el) || el.position);
+            const stored = hasPositions ? null : storedPositions();
+            if (stored && elements.every(el => !isNode(el) || stored[el.data.id])) {{
+                elements.forEach(el => {{ if (isNode(el)) el.position = stored[el.data.id]; }});
+                hasPositions = true;
+                console.log("Using cached layout positions");
+            }}
+            const graphLayout = hasPositions ? {{ name: 'preset', fit: true, padding: 30 }} : getGraphLayout();
 
             var cy = cytoscape({{
                 container: document.getElementById('cy'),
@@ -219,9 +344,23 @@ def html_cytoscape(elements_json: str):
                         }}
                     }}
                 ],
-                layout: graphLayout
+                layout: {{ name: 'null' }}
             }});
 
+            const layout = cy.layout(graphLayout);
+            if (!hasPositions && layoutKey) {{
+                layout.one('layoutstop', function() {{
+                    const positions = {{}};
+                    cy.nodes().forEach(n => {{ positions[n.id()] = n.position(); }});
+                    try {{
+                        window.localStorage.setItem(layoutKey, JSON.stringify(positions));
+                    }} catch (error) {{
+                        console.warn("Layout positions not cached", error);
+                    }}
+                }});
+            }}
+            layout.run();
+
             console.log("✅ Graph initialized successfully!");
 
             // Tooltip on Hover
@@ -371,78 +510,132 @@ def demo_content():
         },
     }
 
-# Helper for LDM preparation (stub)
-def csv_to_ldm_request(uploaded_file):
-    import pandas as pd
-    if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file, nrows=1)  # Just to get columns
-        fields = list(df.columns)
-        # Placeholder: generate a dict/request with these fields for LDM
-        return f"LDM request would be generated for fields: {fields}"
-    return "No file uploaded."
+# Helper for LDM preparation
+def csv_to_ldm_request(uploaded_file, data_source_id: str = ""):
+    """Profile an uploaded CSV (streamed in chunks) and build the declarative LDM and PDM of it.
+    Returns {"profile": DataFrame, "ldm": dict, "pdm": dict}, None without a file."""
+    if uploaded_file is None:
+        return None
+    dataset_id = identifier(Path(getattr(uploaded_file, "name", "") or "dataset").stem)
+    profile = profile_csv(uploaded_file)
+    return {
+        "profile": profile,
+        "ldm": ldm_request(profile, dataset_id, data_source_id=data_source_id),
+        "pdm": pdm_request(profile, dataset_id),
+    }
 
 
 def reload_cache(hostname, token, data_source_id):
     url = f"{hostname}/api/v1/actions/dataSources/{data_source_id}/uploadNotification"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-    return post(url, headers=headers)
+    return http_client().post(url, headers=auth_headers(token, "application/json"))
 
 
 def execute_api_call(hostname, token, workspace_id, data):
     url = f"{hostname}/api/v1/actions/workspaces/{workspace_id}/execution/afm/execute"
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-    return post(url, headers=headers, json=data)
+    return http_client().post(url, headers=auth_headers(token, "application/json", "application/json"), json=data)
 
 
-def get_results(hostname, token, workspace_id, execution_result_id):
+def get_results(hostname, token, workspace_id, execution_result_id, offset: list[int] = None, limit: list[int] = None):
     url = f"{hostname}/api/v1/actions/workspaces/{workspace_id}/execution/afm/execute/result/{execution_result_id}"
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-    return get(url, headers=headers)
+    params = {}
+    if offset:
+        params["offset"] = ",".join(str(o) for o in offset)
+    if limit:
+        params["limit"] = ",".join(str(l) for l in limit)
+    return http_client().get(url, headers=auth_headers(token), params=params)
 
 
 def get_filter_contexts(hostname, token, workspace_id):
     """Fetch filter contexts via REST API (fallback when SDK fails)."""
     url = f"{hostname}/api/v1/entities/workspaces/{workspace_id}/filterContexts?size=200"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json"
-    }
-    return get(url, headers=headers, timeout=30)
+    return http_client().get(url, headers=auth_headers(token, accept="application/json"))
+
+
+def get_workspace_entities(hostname, token, workspace_id, entity_type, modified_since: str = None, page_size: int = 500,
+                           origin: str = "NATIVE"):
+    """Fetch workspace entities of a type (metrics, visualizationObjects, ...), optionally only those
+    created or modified since a timestamp ('YYYY-MM-DD HH:MM', UTC).
+    Only objects of the workspace itself are returned by default (origin NATIVE, as in the declarative
+    layout), objects inherited from the parent workspace need origin ALL or PARENTS.
+    Returns (entities, total) where total is the number of all entities of the type (of that origin) in the workspace.
+    """
+    url = f"{hostname}/api/v1/entities/workspaces/{workspace_id}/{entity_type}"
+    headers = auth_headers(token, accept="application/vnd.gooddata.api+json")
+    # total count of the type (used to detect deletions)
+    resp = http_client().get(url, headers=headers, params={"size": 1, "metaInclude": "page", "origin": origin})
+    resp.raise_for_status()
+    total = ((resp.json().get("meta") or {}).get("page") or {}).get("totalElements", 0)
+    params = {"size": page_size, "page": 0, "origin": origin}
+    if modified_since:
+        params["filter"] = f"modifiedAt=ge='{modified_since}',createdAt=ge='{modified_since}'"
+    entities = []
+    while True:
+        resp = http_client().get(url, headers=headers, params=params)
+        resp.raise_for_status()
+        data = resp.json().get("data") or []
+        entities.extend(data)
+        if len(data) < page_size:
+            return entities, total
+        params["page"] += 1
+
+
+def workspace_model_version(hostname, token, workspace_id) -> str:
+    """Fingerprint of the workspace model: count and latest change of its analytics objects, count of its
+    datasets, attributes and facts. One small request per type (in parallel); it changes whenever objects
+    are created, modified or deleted, also outside the app."""
+    headers = auth_headers(token, accept="application/vnd.gooddata.api+json")
+
+    def probe(entity_type):
+        url = f"{hostname}/api/v1/entities/workspaces/{workspace_id}/{entity_type}"
+        params = {"size": 1, "metaInclude": "page", "origin": "NATIVE"}
+        if entity_type in MODEL_VERSION_TIMESTAMPED_TYPES:
+            params["sort"] = "modifiedAt,desc"
+        resp = http_client().get(url, headers=headers, params=params)
+        resp.raise_for_status()
+        body = resp.json()
+        latest = ((body.get("data") or [{}])[0].get("attributes") or {})
+        total = ((body.get("meta") or {}).get("page") or {}).get("totalElements", 0)
+        return entity_type, total, latest.get("modifiedAt") or latest.get("createdAt")
+
+    types = MODEL_VERSION_TIMESTAMPED_TYPES + MODEL_VERSION_COUNTED_TYPES
+    with ThreadPoolExecutor(max_workers=len(types), thread_name_prefix="gd-model-version") as pool:
+        parts = list(pool.map(probe, types))
+    return sha1(json.dumps(parts).encode()).hexdigest()[:16]
+
+
+def put_workspace_entity(hostname, token, workspace_id, entity_type, entity_id, attributes: dict):
+    """Create or replace one workspace entity (JSON:API), entity_type being the collection name (metrics, ...)
+    and ENTITY_TYPES its singular. Tries PUT first and creates the entity with POST when it does not exist."""
+    url = f"{hostname}/api/v1/entities/workspaces/{workspace_id}/{entity_type}"
+    headers = auth_headers(token, "application/vnd.gooddata.api+json", "application/vnd.gooddata.api+json")
+    body = {"data": {"id": entity_id, "type": ENTITY_TYPES[entity_type], "attributes": attributes}}
+    resp = http_client().put(f"{url}/{entity_id}", headers=headers, json=body)
+    if resp.status_code == 404:
+        resp = http_client().post(url, headers=headers, json=body)
+    return resp
+
+
+def delete_workspace_entity(hostname, token, workspace_id, entity_type, entity_id):
+    url = f"{hostname}/api/v1/entities/workspaces/{workspace_id}/{entity_type}/{entity_id}"
+    return http_client().delete(url, headers=auth_headers(token))
 
 
 def get_ldm_via_rest(hostname, token, workspace_id):
     """Fetch LDM via REST API (fallback when SDK fails)."""
     url = f"{hostname}/api/v1/layout/workspaces/{workspace_id}/ldm"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json"
-    }
-    return get(url, headers=headers, timeout=30)
+    return http_client().get(url, headers=auth_headers(token, accept="application/json"))
 
 
 def get_pdm_via_rest(hostname, token, workspace_id):
     """Fetch PDM via REST API (fallback when SDK fails)."""
     url = f"{hostname}/api/v1/layout/workspaces/{workspace_id}/pdm"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json"
-    }
-    return get(url, headers=headers, timeout=30)
+    return http_client().get(url, headers=auth_headers(token, accept="application/json"))
 
 
 def probe_url(url):
     """Probe if a URL is accessible (for dashboard embedding)."""
     try:
-        r = get(url, timeout=5)
+        r = http_client().get(url, timeout=5)
         return r.status_code < 400
     except Exception:
         return False
@@ -650,11 +843,11 @@ def general_request(host: str, token: str, obj_id: str, req_type: str, ws_id: st
 
         try:
             if contact["type"].lower() == "get":
-                response = get(contact["adr"], headers=contact["headers"])
+                response = http_client().get(contact["adr"], headers=contact["headers"])
             elif contact["type"].lower() == "del":
-                response = delete(contact["adr"], headers=contact["headers"])
+                response = http_client().delete(contact["adr"], headers=contact["headers"])
             elif contact["type"].lower() == "post":
-                response = post(contact["adr"], headers=contact["headers"])
+                response = http_client().post(contact["adr"], headers=contact["headers"])
             else:
                 raise ValueError("not known request method: " + contact["type"])
             # Check if the request was successful (status code 200-299 indicates success)
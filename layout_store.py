@@ -0,0 +1,198 @@
+import gzip
+import json
+import re
+from pathlib import Path
+from time import strftime, time
+
+from gooddata_sdk import CatalogDeclarativeAnalytics, CatalogDeclarativeModel
+
+from backup import LDM_KINDS, assemble_layouts, fetch_layouts, layout_objects, object_hash
+from helpers import ENTITY_TYPES, delete_workspace_entity, put_workspace_entity
+from lineage import maql_references
+
+DEFAULT_LAYOUT_ROOT = Path.cwd() / ".gooddata_cache" / "layouts"
+# set by the server on every change, left out of hashes so a restored object equals its snapshot
+AUDIT_FIELDS = ("createdAt", "createdBy", "modifiedAt", "modifiedBy")
+# declarative attributes of an entity sent when it is restored through the entities API
+ENTITY_ATTRIBUTES = ("title", "description", "tags", "content", "areRelationsValid")
+
+
+def stable_content(content: dict) -> dict:
+    return {k: v for k, v in content.items() if k not in AUDIT_FIELDS}
+
+
+def diff_manifests(old: dict, new: dict) -> dict:
+    """{"added", "removed", "changed"} object keys ("kind/id") between two {key: hash} manifests."""
+    return {
+        "added": sorted(new.keys() - old.keys()),
+        "removed": sorted(old.keys() - new.keys()),
+        "changed": sorted(k for k in old.keys() & new.keys() if old[k] != new[k]),
+    }
+
+
+def _restore_order(keys: list[str], contents: dict) -> list[str]:
+    # entity types in dependency order (ENTITY_TYPES), metrics after the metrics their MAQL references
+    ordered, visiting = [], set()
+    pending = set(keys)
+
+    def visit(key):
+        if key in visiting or key not in pending:
+            return
+        visiting.add(key)
+        kind = key.split("/", 1)[0]
+        if kind == "metrics":
+            for ref in maql_references((contents[key].get("content") or {}).get("maql")):
+                if ref.startswith("metric/"):
+                    visit(f"metrics/{ref.split('/', 1)[1]}")
+        pending.discard(key)
+        ordered.append(key)
+
+    for kind in ENTITY_TYPES:
+        for key in sorted(k for k in keys if k.split("/", 1)[0] == kind):
+            visit(key)
+    return ordered
+
+
+class LayoutStore:
+    """Content-addressed store of declarative workspace layouts.
+
+    Every analytics/LDM object is stored once as a gzipped blob named by the hash of its content
+    (audit fields left out), a snapshot is a manifest {"kind/id": hash}. Snapshotting an unchanged
+    workspace writes only the manifest; diffs compare manifests without reading any blob; restore()
+    sends only the objects that differ from the target workspace, of the same or another environment.
+    Layout: <root>/objects/<hash[:2]>/<hash>.json.gz, <root>/manifests/<host>/<workspace id>/<name>.json.
+    """
+
+    def __init__(self, root: Path = DEFAULT_LAYOUT_ROOT):
+        self.root = Path(root)
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.json.gz"
+
+    def manifest_dir(self, host: str, ws_id: str) -> Path:
+        host_slug = re.sub(r"[^a-zA-Z0-9_.-]", "_", host.split("://")[-1])
+        return self.root / "manifests" / host_slug / ws_id
+
+    def snapshots(self, host: str, ws_id: str) -> list[str]:
+        """Snapshot names of a workspace, oldest first."""
+        folder = self.manifest_dir(host, ws_id)
+        return sorted(p.stem for p in folder.glob("*.json")) if folder.exists() else []
+
+    def manifest(self, host: str, ws_id: str, name: str = "") -> dict:
+        """Manifest of a snapshot (the latest by default)."""
+        name = name or (self.snapshots(host, ws_id) or [""])[-1]
+        path = self.manifest_dir(host, ws_id) / f"{name}.json"
+        if not name or not path.exists():
+            raise FileNotFoundError(f"no layout snapshot {name or '(latest)'} of workspace {ws_id}")
+        return json.loads(path.read_text())
+
+    def read_object(self, digest: str) -> dict:
+        with gzip.open(self._blob_path(digest), "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_object(self, digest: str, content: dict) -> int:
+        # bytes written, 0 when the blob is already stored
+        path = self._blob_path(digest)
+        if path.exists():
+            return 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(content, f, separators=(",", ":"))
+        tmp.replace(path)
+        return path.stat().st_size
+
+    @staticmethod
+    def live(gd, ws_id: str) -> tuple[dict, dict]:
+        """({"kind/id": hash}, {"kind/id": content}) of the live workspace layouts."""
+        objects, contents = {}, {}
+        for kind, obj_id, content in layout_objects(*fetch_layouts(gd, ws_id)):
+            key = f"{kind}/{obj_id}"
+            contents[key] = stable_content(content)
+            objects[key] = object_hash(contents[key])
+        return objects, contents
+
+    def snapshot(self, gd, ws_id: str, label: str = "") -> dict:
+        """Store the live layouts of a workspace as a new snapshot, returns its report."""
+        start = time()
+        objects, contents = self.live(gd, ws_id)
+        written = [self._write_object(objects[key], content) for key, content in contents.items()]
+        folder = self.manifest_dir(gd._host, ws_id)
+        folder.mkdir(parents=True, exist_ok=True)
+        name = f"{strftime('%Y%m%dT%H%M%S')}-{int(time() * 1000) % 1000:03d}"
+        manifest = {"workspace_id": ws_id, "name": name, "label": label, "created_at": time(), "objects": objects}
+        (folder / f"{name}.json").write_text(json.dumps(manifest, sort_keys=True))
+        return {
+            "workspace_id": ws_id,
+            "snapshot": name,
+            "objects": len(objects),
+            "new_objects": sum(1 for b in written if b),
+            "bytes": sum(written),
+            "seconds": round(time() - start, 2),
+        }
+
+    def diff(self, host: str, ws_id: str, old: str, new: str = "") -> dict:
+        """Differences between two snapshots of a workspace (old against the latest by default)."""
+        return diff_manifests(self.manifest(host, ws_id, old)["objects"], self.manifest(host, ws_id, new)["objects"])
+
+    def diff_live(self, gd, ws_id: str, name: str = "", target_ws_id: str = "", source_host: str = "") -> dict:
+        """Differences from a snapshot of ws_id (taken on source_host, gd's host by default) to the live
+        target_ws_id of gd (the same workspace by default)."""
+        live_objects, _ = self.live(gd, target_ws_id or ws_id)
+        return diff_manifests(self.manifest(source_host or gd._host, ws_id, name)["objects"], live_objects)
+
+    def restore(self, gd, ws_id: str, name: str = "", target_ws_id: str = "", source_host: str = "",
+                delete: bool = True, dry_run: bool = False) -> dict:
+        """Make the live target_ws_id of gd equal to a snapshot of ws_id, sending only the objects that differ.
+
+        The snapshot was taken on source_host (gd's host by default), so gd may point to another
+        environment to promote it there; target_ws_id defaults to ws_id. The LDM goes first, so the
+        analytics written next see the datasets they reference. Dashboards, visualizations, metrics,
+        filter contexts, plugins and hierarchies go one by one through the entities API (referenced
+        objects first), then objects missing in the snapshot are deleted (dependants first) unless
+        delete is False. Other analytics kinds (export definitions, ...) have no per-object endpoint:
+        the analytics layer is put declaratively, the live layout patched by the changed objects.
+        """
+        start = time()
+        target_ws_id = target_ws_id or ws_id
+        snapshot = self.manifest(source_host or gd._host, ws_id, name)["objects"]
+        live_objects, live_contents = self.live(gd, target_ws_id)
+        changes = diff_manifests(snapshot, live_objects)
+        # snapshot vs live: "removed" are in the snapshot only, "added" in the live workspace only
+        upserts = changes["removed"] + changes["changed"]
+        deletes = changes["added"] if delete else []
+        contents = {key: self.read_object(snapshot[key]) for key in upserts}
+        report = {"workspace_id": target_ws_id, "upserted": len(upserts), "deleted": len(deletes),
+                  "bytes_sent": sum(len(json.dumps(c, separators=(",", ":"))) for c in contents.values())}
+        if dry_run:
+            return {**report, "upserts": upserts, "deletes": deletes, "seconds": round(time() - start, 2)}
+
+        def kind_of(key):
+            return key.split("/", 1)[0]
+
+        patched = {**live_contents, **contents}
+        for key in deletes:
+            patched.pop(key, None)
+        workspace_content = gd._sdk.catalog_workspace_content
+        if any(kind_of(k) in LDM_KINDS for k in upserts + deletes):
+            _, ldm = assemble_layouts((*k.split("/", 1), c) for k, c in patched.items() if kind_of(k) in LDM_KINDS)
+            workspace_content.put_declarative_ldm(target_ws_id, CatalogDeclarativeModel.from_dict(ldm))
+
+        for key in _restore_order([k for k in upserts if kind_of(k) in ENTITY_TYPES], contents):
+            kind, obj_id = key.split("/", 1)
+            attributes = {a: contents[key][a] for a in ENTITY_ATTRIBUTES if a in contents[key]}
+            resp = put_workspace_entity(gd._host, gd._token, target_ws_id, kind, obj_id, attributes)
+            if resp.status_code >= 300:
+                raise RuntimeError(f"restoring {key} failed ({resp.status_code}): {resp.text[:500]}")
+        # dependants first
+        for key in reversed(_restore_order([k for k in deletes if kind_of(k) in ENTITY_TYPES], live_contents)):
+            kind, obj_id = key.split("/", 1)
+            resp = delete_workspace_entity(gd._host, gd._token, target_ws_id, kind, obj_id)
+            if resp.status_code >= 300 and resp.status_code != 404:
+                raise RuntimeError(f"deleting {key} failed ({resp.status_code}): {resp.text[:500]}")
+
+        if any(kind_of(k) not in LDM_KINDS and kind_of(k) not in ENTITY_TYPES for k in upserts + deletes):
+            analytics, _ = assemble_layouts((*k.split("/", 1), c) for k, c in patched.items()
+                                            if kind_of(k) not in LDM_KINDS)
+            workspace_content.put_declarative_analytics_model(target_ws_id, CatalogDeclarativeAnalytics.from_dict(analytics))
+        return {**report, "seconds": round(time() - start, 2)}
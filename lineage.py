@@ -0,0 +1,97 @@
+import re
+from typing import Iterable
+
+from pandas import DataFrame
+
+# {metric/revenue}, {fact/order_lines.price}, {label/customer.name}, {attribute/region}, {dataset/orders}
+MAQL_REFERENCE_RE = re.compile(r"\{(metric|fact|label|attribute|dataset)/([^{}\s]+)\}")
+REFERENCE_TYPES = ("metric", "fact", "label", "attribute", "dataset")
+
+
+def maql_references(maql) -> list[str]:
+    """Distinct "type/id" references of a MAQL expression, in order of appearance."""
+    if not isinstance(maql, str):
+        return []
+    return list(dict.fromkeys(f"{of_type}/{obj_id}" for of_type, obj_id in MAQL_REFERENCE_RE.findall(maql)))
+
+
+def _closure(keys: Iterable[str], edges: dict) -> set:
+    # everything reachable from keys over edges, without the keys themselves unless on a cycle
+    seen = set()
+    stack = list(keys)
+    while stack:
+        for related in edges.get(stack.pop(), ()):
+            if related not in seen:
+                seen.add(related)
+                stack.append(related)
+    return seen
+
+
+class LineageIndex:
+    """Upstream/downstream index of metric dependencies parsed from MAQL.
+
+    Objects are keyed "type/id" as in MAQL ({metric/revenue} -> "metric/revenue"). Each metric points
+    upstream to the metrics, facts, labels, attributes and datasets its MAQL references; downstream is
+    the reverse. Built from the metrics frame of a workspace bundle, so impact analysis needs no API calls.
+    """
+
+    def __init__(self):
+        self._upstream = {}  # key -> set of referenced keys
+        self._downstream = {}  # key -> set of keys referencing it
+
+    @classmethod
+    def from_metrics(cls, metrics_df: DataFrame) -> "LineageIndex":
+        index = cls()
+        if not metrics_df.empty and {"id", "maql"} <= set(metrics_df.columns):
+            for metric_id, maql in zip(metrics_df["id"].tolist(), metrics_df["maql"].tolist()):
+                if metric_id:
+                    index.set_references(f"metric/{metric_id}", maql_references(maql))
+        return index
+
+    def set_references(self, key: str, references: Iterable[str]) -> None:
+        """Replace what key references (adds key when new)."""
+        references = set(references)
+        for old in self._upstream.get(key, set()) - references:
+            self._downstream[old].discard(key)
+        for ref in references:
+            self._downstream.setdefault(ref, set()).add(key)
+        self._upstream[key] = references
+
+    def upstream(self, key: str, transitive: bool = True) -> set:
+        """Keys key depends on (directly or through other metrics)."""
+        return _closure([key], self._upstream) if transitive else set(self._upstream.get(key, ()))
+
+    def downstream(self, key: str, transitive: bool = True) -> set:
+        """Keys depending on key (directly or through other metrics)."""
+        return _closure([key], self._downstream) if transitive else set(self._downstream.get(key, ()))
+
+    def impact(self, keys: Iterable[str]) -> set:
+        """Metrics affected by a change of any of the keys."""
+        return _closure(keys, self._downstream)
+
+    def missing(self) -> dict:
+        """{metric key: referenced metric keys not defined in the workspace}"""
+        return {
+            key: missing for key, refs in self._upstream.items()
+            if (missing := {r for r in refs if r.startswith("metric/") and r not in self._upstream})
+        }
+
+    def cycles(self) -> set:
+        """Metrics that (transitively) reference themselves."""
+        return {key for key in self._upstream if key in _closure([key], self._upstream)}
+
+    def to_frame(self, keys: Iterable[str] | None = None) -> DataFrame:
+        """Direct references as rows (metric_id, ref_type, ref_id), optionally only of the given keys."""
+        keys = self._upstream if keys is None else [k for k in keys if k in self._upstream]
+        rows = [
+            {"metric_id": key.split("/", 1)[1], "ref_type": ref.split("/", 1)[0], "ref_id": ref.split("/", 1)[1]}
+            for key in keys for ref in sorted(self._upstream[key])
+        ]
+        return DataFrame(rows, columns=["metric_id", "ref_type", "ref_id"])
+
+    def stats(self) -> dict:
+        return {
+            "metrics": len(self._upstream),
+            "references": sum(len(r) for r in self._upstream.values()),
+            "referenced": len(self._downstream),
+        }
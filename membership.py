@@ -0,0 +1,131 @@
+from threading import Lock
+from typing import Iterable
+
+
+def _related_ids(relationship) -> list[str]:
+    # CatalogUserGroupsData / CatalogUserGroupParents -> ids of the related groups
+    return [item.id for item in (getattr(relationship, "data", None) or []) if item is not None and item.id]
+
+
+class MembershipIndex:
+    """Bidirectional user <-> group membership index.
+
+    Built once from the user and group listings (users carry their groups, groups their parent groups),
+    then kept up to date with set_user_groups/remove_user/set_group_parents. Lookups are dict/set
+    based, bulk queries cost one lookup per requested id.
+    """
+
+    def __init__(self):
+        self._groups_of = {}  # user id -> set of group ids
+        self._members_of = {}  # group id -> set of user ids
+        self._parents_of = {}  # group id -> set of parent group ids
+        self._children_of = {}  # group id -> set of child group ids
+        self._lock = Lock()
+
+    @classmethod
+    def build(cls, users: Iterable, groups: Iterable = ()) -> "MembershipIndex":
+        index = cls()
+        for user in users:
+            relationships = getattr(user, "relationships", None)
+            index.set_user_groups(user.id, _related_ids(getattr(relationships, "user_groups", None)))
+        for group in groups:
+            relationships = getattr(group, "relationships", None)
+            index.set_group_parents(group.id, _related_ids(getattr(relationships, "parents", None)))
+        return index
+
+    # ---------- incremental updates ----------
+    def set_user_groups(self, user_id: str, group_ids: Iterable[str]) -> None:
+        """Replace the group memberships of a user (adds the user when new)."""
+        group_ids = set(group_ids)
+        with self._lock:
+            for group_id in self._groups_of.get(user_id, set()) - group_ids:
+                self._members_of[group_id].discard(user_id)
+            for group_id in group_ids:
+                self._members_of.setdefault(group_id, set()).add(user_id)
+            self._groups_of[user_id] = group_ids
+
+    def add_membership(self, user_id: str, group_id: str) -> None:
+        with self._lock:
+            self._groups_of.setdefault(user_id, set()).add(group_id)
+            self._members_of.setdefault(group_id, set()).add(user_id)
+
+    def remove_membership(self, user_id: str, group_id: str) -> None:
+        with self._lock:
+            self._groups_of.get(user_id, set()).discard(group_id)
+            self._members_of.get(group_id, set()).discard(user_id)
+
+    def remove_user(self, user_id: str) -> None:
+        with self._lock:
+            for group_id in self._groups_of.pop(user_id, set()):
+                self._members_of[group_id].discard(user_id)
+
+    def set_group_parents(self, group_id: str, parent_ids: Iterable[str]) -> None:
+        """Replace the parent groups of a group (adds the group when new)."""
+        parent_ids = set(parent_ids)
+        with self._lock:
+            for parent_id in self._parents_of.get(group_id, set()) - parent_ids:
+                self._children_of[parent_id].discard(group_id)
+            for parent_id in parent_ids:
+                self._children_of.setdefault(parent_id, set()).add(group_id)
+            self._parents_of[group_id] = parent_ids
+            self._members_of.setdefault(group_id, set())
+
+    def remove_group(self, group_id: str) -> None:
+        with self._lock:
+            for user_id in self._members_of.pop(group_id, set()):
+                self._groups_of[user_id].discard(group_id)
+            for parent_id in self._parents_of.pop(group_id, set()):
+                self._children_of[parent_id].discard(group_id)
+            for child_id in self._children_of.pop(group_id, set()):
+                self._parents_of[child_id].discard(group_id)
+
+    # ---------- queries ----------
+    def _closure(self, group_ids: Iterable[str], edges: dict) -> set:
+        # group_ids plus everything reachable over edges (parents or children), cycle safe
+        seen = set(group_ids)
+        stack = list(seen)
+        while stack:
+            for related in edges.get(stack.pop(), ()):
+                if related not in seen:
+                    seen.add(related)
+                    stack.append(related)
+        return seen
+
+    def members(self, group_id: str, nested: bool = False) -> set:
+        """User ids of a group; nested includes members of its (transitive) child groups."""
+        return self.members_of([group_id], nested)[group_id]
+
+    def groups(self, user_id: str, inherited: bool = False) -> set:
+        """Group ids of a user; inherited adds the (transitive) parents of those groups."""
+        return self.groups_of([user_id], inherited)[user_id]
+
+    def members_of(self, group_ids: Iterable[str], nested: bool = False) -> dict:
+        """{group id: set of user ids} for many groups at once."""
+        with self._lock:
+            result = {}
+            for group_id in group_ids:
+                groups = self._closure([group_id], self._children_of) if nested else (group_id,)
+                result[group_id] = set().union(*(self._members_of.get(g, ()) for g in groups))
+            return result
+
+    def groups_of(self, user_ids: Iterable[str], inherited: bool = False) -> dict:
+        """{user id: set of group ids} for many users at once."""
+        with self._lock:
+            result = {}
+            for user_id in user_ids:
+                groups = self._groups_of.get(user_id, set())
+                result[user_id] = self._closure(groups, self._parents_of) if inherited else set(groups)
+            return result
+
+    def users_in_any(self, group_ids: Iterable[str]) -> set:
+        """User ids belonging to at least one of the groups."""
+        with self._lock:
+            return set().union(*(self._members_of.get(g, ()) for g in group_ids))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._groups_of),
+                "groups": len(self._members_of),
+                "memberships": sum(len(g) for g in self._groups_of.values()),
+            }
@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic, sleep
+from typing import Iterable, NamedTuple, Optional
+
+from gooddata_sdk import (CatalogAssigneeIdentifier, CatalogDeclarativeSingleWorkspacePermission,
+                          CatalogDeclarativeWorkspacePermissions, CatalogPermissionsForAssigneeIdentifier,
+                          GoodDataSdk)
+
+DEFAULT_MAX_WORKERS = 8
+# API calls per second across all workers
+DEFAULT_RATE_LIMIT = 10.0
+
+
+class PermissionGrant(NamedTuple):
+    """One permission of a user/user group on a workspace, or on a dashboard when dashboard_id is set."""
+    assignee_id: str
+    assignee_type: str  # 'user' or 'userGroup'
+    workspace_id: str
+    level: str  # e.g. VIEW, ANALYZE, MANAGE (workspace) or VIEW, SHARE, EDIT (dashboard)
+    dashboard_id: Optional[str] = None
+
+
+class RateLimiter:
+    """Spread calls evenly: at most `rate` calls per second across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate else 0
+        self._next = 0.0
+        self._lock = Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            sleep(slot - now)
+
+
+def _assignee_type(entity_type: str) -> str:
+    return "user" if entity_type == "user" else "userGroup"
+
+
+class PermissionBatch:
+    """Apply many permission grants with as few API calls as possible.
+
+    Grants are grouped by target (workspace or dashboard). For each target the current permissions are
+    read once, diffed against the grants and only the missing ones are written (one call per target;
+    with prune=True, permissions not in the grants are removed as well). Targets are processed in
+    parallel, API calls are rate limited. apply() returns one result dict per grant; with dry_run=True
+    nothing is written and grants that would be added get the status "would_add" instead of "added".
+    """
+
+    def __init__(self, sdk: GoodDataSdk, max_workers: int = DEFAULT_MAX_WORKERS, rate_limit: float = DEFAULT_RATE_LIMIT):
+        self.sdk = sdk
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate_limit)
+
+    def apply(self, grants: Iterable, prune: bool = False, dry_run: bool = False) -> list[dict]:
+        targets = {}
+        for grant in grants:
+            grant = PermissionGrant(*grant)
+            grant = grant._replace(assignee_type=_assignee_type(grant.assignee_type))
+            targets.setdefault((grant.workspace_id, grant.dashboard_id), []).append(grant)
+
+        def run(target, target_grants):
+            try:
+                if target[1]:
+                    return self._apply_dashboard(*target, target_grants, prune, dry_run)
+                return self._apply_workspace(target[0], target_grants, prune, dry_run)
+            except Exception as ex:
+                return [self._result(g, "failed", str(ex)) for g in target_grants]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="permissions") as pool:
+            futures = [pool.submit(run, target, target_grants) for target, target_grants in targets.items()]
+            return [result for future in futures for result in future.result()]
+
+    @staticmethod
+    def _result(grant: PermissionGrant, status: str, error: str = None) -> dict:
+        return {**grant._asdict(), "status": status, "error": error}
+
+    def _apply_workspace(self, workspace_id: str, grants: list, prune: bool, dry_run: bool) -> list[dict]:
+        self.limiter.wait()
+        current = self.sdk.catalog_permission.get_declarative_permissions(workspace_id)
+        existing = {(p.assignee.id, p.assignee.type, p.name) for p in current.permissions}
+        wanted = {(g.assignee_id, g.assignee_type, g.level) for g in grants}
+        missing = wanted - existing
+        removed = existing - wanted if prune else set()
+        added = "would_add" if dry_run else "added"
+        statuses = {key: added if key in missing else "unchanged" for key in wanted}
+        if (missing or removed) and not dry_run:
+            permissions = [p for p in current.permissions if (p.assignee.id, p.assignee.type, p.name) not in removed]
+            permissions += [
+                CatalogDeclarativeSingleWorkspacePermission(
+                    name=level, assignee=CatalogAssigneeIdentifier(id=assignee_id, type=assignee_type))
+                for assignee_id, assignee_type, level in sorted(missing)
+            ]
+            self.limiter.wait()
+            self.sdk.catalog_permission.put_declarative_permissions(
+                workspace_id,
+                CatalogDeclarativeWorkspacePermissions(
+                    permissions=permissions, hierarchy_permissions=current.hierarchy_permissions),
+            )
+        if removed:
+            print(f"workspace {workspace_id}: {len(removed)} permissions {'to remove' if dry_run else 'removed'}")
+        return [self._result(g, statuses[(g.assignee_id, g.assignee_type, g.level)]) for g in grants]
+
+    def _apply_dashboard(self, workspace_id: str, dashboard_id: str, grants: list, prune: bool, dry_run: bool) -> list[dict]:
+        self.limiter.wait()
+        current = self.sdk.catalog_permission.list_dashboard_permissions(workspace_id, dashboard_id)
+        # direct permissions per assignee (inherited ones cannot be managed on the dashboard)
+        existing = {}
+        for assignee_type, assignees in (("user", current.users), ("userGroup", current.user_groups)):
+            for assignee in assignees or []:
+                levels = {p.level for p in assignee.permissions or [] if p.source == "direct"}
+                if levels:
+                    existing[(assignee.id, assignee_type)] = levels
+        wanted = {}
+        for g in grants:
+            wanted.setdefault((g.assignee_id, g.assignee_type), set()).add(g.level)
+        updates = {}
+        for key, levels in wanted.items():
+            target_levels = levels if prune else levels | existing.get(key, set())
+            if target_levels != existing.get(key, set()):
+                updates[key] = target_levels
+        if prune:
+            # assignees not in the grants lose their direct permissions
+            updates.update({key: set() for key in existing if key not in wanted})
+        if updates and not dry_run:
+            self.limiter.wait()
+            self.sdk.catalog_permission.manage_dashboard_permissions(
+                workspace_id=workspace_id,
+                dashboard_id=dashboard_id,
+                permissions_for_assignee=[
+                    CatalogPermissionsForAssigneeIdentifier(
+                        assignee_identifier=CatalogAssigneeIdentifier(id=assignee_id, type=assignee_type),
+                        permissions=sorted(levels))
+                    for (assignee_id, assignee_type), levels in sorted(updates.items())
+                ],
+            )
+        added = "would_add" if dry_run else "added"
+        return [
+            self._result(g, "unchanged" if g.level in existing.get((g.assignee_id, g.assignee_type), set()) else added)
+            for g in grants
+        ]
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from pandas import DataFrame, read_csv
+
+DEFAULT_MAX_WORKERS = 8
+# LoadGoodDataSdk.create entity types in provisioning order: groups, workspaces (hierarchy), users
+PROVISIONING_STAGES = [("ug",), ("ws", "wf"), ("us", "uf")]
+ENTITY_TYPES = [of_type for stage in PROVISIONING_STAGES for of_type in stage]
+WORKSPACE_TYPES = ("ws", "wf")
+
+
+def read_entities(source) -> DataFrame:
+    """Entities to provision from a CSV path/buffer or DataFrame with columns id, name, type, parent
+    (type as in LoadGoodDataSdk.create: ws, us, ug, wf, uf; parent optional)."""
+    df = source.copy() if isinstance(source, DataFrame) else read_csv(source, dtype=str)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    missing = {"id", "type"} - set(df.columns)
+    if missing:
+        raise ValueError(f"entities need columns id and type, missing: {', '.join(sorted(missing))}")
+    for col in ("name", "parent"):
+        if col not in df.columns:
+            df[col] = ""
+    df = df[["id", "name", "type", "parent"]].fillna("").astype(str)
+    df = df.apply(lambda col: col.str.strip())
+    unknown = set(df["type"]) - set(ENTITY_TYPES)
+    if unknown:
+        raise ValueError(f"unknown entity types: {', '.join(sorted(unknown))}")
+    duplicated = df.loc[df.duplicated(["type", "id"]), "id"].tolist()
+    if duplicated:
+        raise ValueError(f"duplicated entity ids: {', '.join(duplicated[:10])}")
+    return df.reset_index(drop=True)
+
+
+def workspace_levels(rows: list[dict], existing_ids: set) -> tuple[list[list[dict]], list[dict]]:
+    """Order workspaces so that parents come first: ([level 0 rows, level 1 rows, ...], rows that cannot be placed).
+    A workspace is placed once its parent is placed or exists already; cycles and unknown parents stay unplaced."""
+    pending = {row["id"]: row for row in rows}
+    placed = set(existing_ids) - set(pending)
+    levels = []
+    while pending:
+        level = [row for row in pending.values() if not row["parent"] or row["parent"] in placed]
+        if not level:
+            break
+        levels.append(level)
+        for row in level:
+            placed.add(row["id"])
+            del pending[row["id"]]
+    return levels, list(pending.values())
+
+
+class BulkProvisioner:
+    """Create workspaces, users and user groups from a table of entities through LoadGoodDataSdk.create.
+
+    Groups go first, then workspaces level by level (each level in parallel, children after their parents),
+    then users. Entities that already exist as requested are left alone, so a re-run only creates what
+    is missing. An existing workspace only gets its name updated: GoodData cannot move a workspace to
+    another parent, so a different parent is reported as a conflict and the workspace is left as it is.
+    run() returns a DataFrame with a status per entity.
+    """
+
+    def __init__(self, gd, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.gd = gd
+        self.max_workers = max_workers
+
+    def _current(self, of_type: str, row: dict):
+        # None when the entity does not exist, else whether it matches the requested state
+        if of_type in WORKSPACE_TYPES:
+            ws = self.gd._index("workspace")["id"].get(row["id"])
+            return None if ws is None else (ws.name == (row["name"] or ws.name) and (ws.parent_id or "") == row["parent"])
+        if of_type == "ug":
+            return None if row["id"] not in self.gd._index("group")["id"] else True
+        user = self.gd._index("user")["id"].get(row["id"])
+        if user is None:
+            return None
+        return self.gd.memberships.groups(row["id"]) == ({row["parent"]} if row["parent"] else set())
+
+    def _conflict(self, of_type: str, row: dict) -> str | None:
+        # why the requested state cannot be reached by an update, None when it can
+        if of_type in WORKSPACE_TYPES:
+            ws = self.gd._index("workspace")["id"].get(row["id"])
+            if ws is not None and (ws.parent_id or "") != row["parent"]:
+                return (f"workspace {row['id']} has parent {ws.parent_id or '(none)'}, "
+                        f"a workspace cannot be moved to {row['parent'] or '(none)'}")
+        return None
+
+    def _provision(self, row: dict) -> dict:
+        try:
+            conflict = self._conflict(row["type"], row)
+            if conflict:
+                return {**row, "status": "conflict", "error": conflict}
+            current = self._current(row["type"], row)
+            if current:
+                return {**row, "status": "unchanged", "error": None}
+            self.gd.create(row["id"], row["name"], row["type"], row["parent"])
+            return {**row, "status": "created" if current is None else "updated", "error": None}
+        except Exception as ex:
+            return {**row, "status": "failed", "error": str(ex)}
+
+    def _run_parallel(self, pool: ThreadPoolExecutor, rows: list[dict]) -> list[dict]:
+        return list(pool.map(self._provision, rows))
+
+    def run(self, entities) -> DataFrame:
+        df = read_entities(entities)
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="provision") as pool:
+            for stage in PROVISIONING_STAGES:
+                rows = df[df["type"].isin(stage)].to_dict("records")
+                if not rows:
+                    continue
+                if stage[0] not in WORKSPACE_TYPES:
+                    results.extend(self._run_parallel(pool, rows))
+                    continue
+                existing = set(self.gd._index("workspace")["id"])
+                levels, unplaced = workspace_levels(rows, existing)
+                failed = set()
+                for depth, level in enumerate(levels):
+                    # children of workspaces that failed cannot be created
+                    blocked = [r for r in level if r["parent"] in failed]
+                    level = [r for r in level if r["parent"] not in failed]
+                    for row in blocked:
+                        failed.add(row["id"])
+                        results.append({**row, "status": "skipped", "error": f"parent {row['parent']} failed"})
+                    level_results = self._run_parallel(pool, level)
+                    failed.update(r["id"] for r in level_results if r["status"] == "failed")
+                    results.extend(level_results)
+                    print(f"provisioned {len(level)} workspaces of hierarchy level {depth}")
+                for row in unplaced:
+                    results.append({**row, "status": "skipped", "error": f"parent {row['parent']} not found or cyclic"})
+        return DataFrame(results, columns=["id", "name", "type", "parent", "status", "error"])
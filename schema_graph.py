@@ -0,0 +1,285 @@
+from hashlib import sha1
+from heapq import heappop, heappush
+from json import dumps
+from typing import Iterable, Iterator
+
+# Define hierarchy of node importance
+NODE_PRIORITIES = {
+    "dataset": 1,  # Most important
+    "analyticalDashboard": 2,
+    "visualizationObject": 2,
+    "metric": 2,
+    "fact": 3,
+    "attribute": 4  # Least important # Labels not considered here
+}
+
+# Define colors for node types
+NODE_COLORS = {
+    "dataset": "#FF5733",  # Bright red (Core)
+    "analyticalDashboard": "#2ECC40",  # Green (Descriptive)
+    "visualizationObject": "#3498DB",  # Blue (Measurable)
+    "metric": "#9B59B6",  # Purple
+    "fact": "#F1C40F",  # Yellow
+    "attribute": "#95A5A6"  # Gray
+}
+
+# Define node sizes based on importance
+NODE_SIZES = {
+    "dataset": 50,
+    "analyticalDashboard": 40,
+    "visualizationObject": 40,
+    "metric": 40,
+    "fact": 30,
+    "attribute": 25
+}
+
+
+def node_element(node_id: str, label: str, node_type: str) -> dict:
+    """Cytoscape node element styled by its type."""
+    return {
+        "data": {
+            "id": node_id,
+            "label": label,
+            "type": node_type,
+            "importance": NODE_PRIORITIES.get(node_type, 5)
+        },
+        "style": {
+            "background-color": NODE_COLORS.get(node_type, "#999"),
+            "width": NODE_SIZES.get(node_type, 20),
+            "height": NODE_SIZES.get(node_type, 20),
+            "font-size": "12px"
+        }
+    }
+
+
+def build_schema_elements(nodes: Iterable, edges: Iterable) -> list[dict]:
+    """Cytoscape elements of a dependent entities graph (nodes with id/title/type, edges as source/target pairs).
+
+    Node ids are cut at the first dot (labels fold into their attribute), the first node of an id wins.
+    Edges touching dotted ids are left out. Both passes are linear, duplicates are found via a set.
+    """
+    elements = []
+    seen = set()
+    for node in nodes:
+        node_id = node.id.split(".", 1)[0]
+        if node_id in seen:
+            continue
+        seen.add(node_id)
+        elements.append(node_element(node_id, node.title, node.type))
+    for source, target in edges:
+        if "." in source.id or "." in target.id:
+            continue
+        elements.append({"data": {"source": source.id, "target": target.id}})
+    return elements
+
+
+def graph_hash(elements: list[dict]) -> str:
+    """Hash of the graph structure (node ids, types, labels and edges), stable across reloads."""
+    digest = sha1()
+    for el in elements:
+        data = el["data"]
+        if "source" in data:
+            digest.update(f"e\0{data['source']}\0{data['target']}\n".encode())
+        else:
+            digest.update(f"n\0{data['id']}\0{data.get('type')}\0{data.get('label')}\n".encode())
+    return digest.hexdigest()
+
+
+def iter_elements_json(elements: list[dict], chunk_size: int = 5000) -> Iterator[str]:
+    """Serialize elements as a JSON array in chunks of chunk_size elements (joined they equal dumps(elements))."""
+    if not elements:
+        yield "[]"
+        return
+    for start in range(0, len(elements), chunk_size):
+        chunk = ", ".join(dumps(e) for e in elements[start:start + chunk_size])
+        prefix = "[" if start == 0 else ", "
+        suffix = "]" if start + chunk_size >= len(elements) else ""
+        yield f"{prefix}{chunk}{suffix}"
+
+
+# vertical order of node types in the layered layout (top to bottom), unknown types go last
+LAYER_ORDER = {
+    "analyticalDashboard": 0,
+    "visualizationObject": 1,
+    "metric": 2,
+    "fact": 3,
+    "attribute": 3,
+    "dataset": 4
+}
+LAYER_SPACING = 160
+NODE_SPACING = 140
+MAX_NODES_PER_ROW = 40
+# node types folded into their dataset by collapse_to_datasets
+DATASET_MEMBER_TYPES = ("attribute", "fact")
+
+
+def split_elements(elements: list[dict]) -> tuple[dict, list[dict]]:
+    """({node id: node element}, [edge elements])"""
+    nodes, edges = {}, []
+    for el in elements:
+        if "source" in el["data"]:
+            edges.append(el)
+        else:
+            nodes[el["data"]["id"]] = el
+    return nodes, edges
+
+
+def _rebuild(nodes: dict, edges: list[dict], mapping: dict | None = None) -> list[dict]:
+    # keep edges between remaining nodes (after renaming by mapping), without loops and duplicates
+    mapping = mapping or {}
+    seen = set()
+    kept = []
+    for edge in edges:
+        source = mapping.get(edge["data"]["source"], edge["data"]["source"])
+        target = mapping.get(edge["data"]["target"], edge["data"]["target"])
+        if source == target or source not in nodes or target not in nodes or (source, target) in seen:
+            continue
+        seen.add((source, target))
+        kept.append({"data": {**edge["data"], "source": source, "target": target}})
+    return list(nodes.values()) + kept
+
+
+def dataset_members(elements: list[dict]) -> dict:
+    """{attribute/fact/label id: id of the dataset it is folded into by collapse_to_datasets}"""
+    nodes, edges = split_elements(elements)
+    mapping = {}
+    for edge in edges:
+        source, target = edge["data"]["source"], edge["data"]["target"]
+        for member, owner in ((source, target), (target, source)):
+            if (member not in mapping and nodes.get(member, {}).get("data", {}).get("type") in DATASET_MEMBER_TYPES
+                    and nodes.get(owner, {}).get("data", {}).get("type") == "dataset"):
+                mapping[member] = owner
+    return mapping
+
+
+def collapse_to_datasets(elements: list[dict]) -> list[dict]:
+    """Fold attributes and facts into the dataset they are connected to; their edges move to the dataset."""
+    nodes, edges = split_elements(elements)
+    mapping = dataset_members(elements)
+    folded = {}
+    for member, owner in mapping.items():
+        folded[owner] = folded.get(owner, 0) + 1
+    collapsed = {}
+    for node_id, node in nodes.items():
+        if node_id in mapping:
+            continue
+        if node_id in folded:
+            node = {**node, "data": {**node["data"], "collapsed": folded[node_id],
+                                     "label": f"{node['data']['label']} ({folded[node_id]})"}}
+        collapsed[node_id] = node
+    return _rebuild(collapsed, edges, mapping)
+
+
+def filter_node_types(elements: list[dict], types: Iterable[str]) -> list[dict]:
+    """Keep only nodes of the given types (and the edges between them)."""
+    types = set(types)
+    nodes, edges = split_elements(elements)
+    return _rebuild({k: v for k, v in nodes.items() if v["data"]["type"] in types}, edges)
+
+
+def neighborhood(elements: list[dict], center: str, hops: int = 2) -> list[dict]:
+    """Nodes within hops edges of center (ignoring edge direction)."""
+    nodes, edges = split_elements(elements)
+    adjacency = {}
+    for edge in edges:
+        source, target = edge["data"]["source"], edge["data"]["target"]
+        adjacency.setdefault(source, []).append(target)
+        adjacency.setdefault(target, []).append(source)
+    reached = {center}
+    frontier = [center]
+    for _ in range(hops):
+        frontier = [n for node_id in frontier for n in adjacency.get(node_id, []) if n not in reached]
+        reached.update(frontier)
+    return _rebuild({k: v for k, v in nodes.items() if k in reached}, edges)
+
+
+def layered_layout(elements: list[dict]) -> dict:
+    """Positions {node id: {"x", "y"}}: one band of rows per node type (LAYER_ORDER), nodes in a band
+    ordered by the mean position of their neighbors in the bands above (barycenter heuristic)."""
+    nodes, edges = split_elements(elements)
+    adjacency = {}
+    for edge in edges:
+        source, target = edge["data"]["source"], edge["data"]["target"]
+        adjacency.setdefault(source, []).append(target)
+        adjacency.setdefault(target, []).append(source)
+    layers = {}
+    for node_id, node in nodes.items():
+        layers.setdefault(LAYER_ORDER.get(node["data"]["type"], len(LAYER_ORDER)), []).append(node_id)
+    order = {}  # node id -> horizontal rank, for barycenters
+    positions = {}
+    y = 0
+    for layer in sorted(layers):
+        members = sorted(layers[layer])
+
+        def barycenter(node_id):
+            ranks = [order[n] for n in adjacency.get(node_id, []) if n in order]
+            return sum(ranks) / len(ranks) if ranks else float("inf")
+
+        members.sort(key=barycenter)
+        width = min(len(members), MAX_NODES_PER_ROW)
+        for i, node_id in enumerate(members):
+            row, col = divmod(i, MAX_NODES_PER_ROW)
+            # spread the rank over the same scale in every layer so barycenters stay comparable
+            order[node_id] = col / max(width - 1, 1)
+            positions[node_id] = {"x": (col - (width - 1) / 2) * NODE_SPACING, "y": y + row * LAYER_SPACING / 2}
+        y += (len(members) - 1) // MAX_NODES_PER_ROW * LAYER_SPACING / 2 + LAYER_SPACING
+    return positions
+
+
+def top_nodes(elements: list[dict], max_nodes: int) -> list[dict]:
+    """Keep max_nodes nodes grown best-first from the most connected node, so the kept part stays connected
+    (a next component is started from the most connected node left once one is exhausted)."""
+    nodes, edges = split_elements(elements)
+    if len(nodes) <= max_nodes:
+        return elements
+    adjacency = {}
+    for edge in edges:
+        source, target = edge["data"]["source"], edge["data"]["target"]
+        adjacency.setdefault(source, []).append(target)
+        adjacency.setdefault(target, []).append(source)
+
+    def rank(node_id):
+        return -len(adjacency.get(node_id, [])), nodes[node_id]["data"].get("importance", 5), node_id
+
+    seeds = iter(sorted(nodes, key=rank))
+    kept = set()
+    heap = []
+    while len(kept) < max_nodes:
+        if not heap:
+            seed = next(s for s in seeds if s not in kept)
+            heap.append((rank(seed), seed))
+        _, node_id = heappop(heap)
+        if node_id in kept:
+            continue
+        kept.add(node_id)
+        for neighbor in adjacency.get(node_id, []):
+            if neighbor not in kept and neighbor in nodes:
+                heappush(heap, (rank(neighbor), neighbor))
+    return _rebuild({n: nodes[n] for n in kept}, edges)
+
+
+def center_candidates(elements: list[dict], collapse: bool = True, types: Iterable[str] | None = None) -> dict:
+    """{node id: label} of the nodes left after collapsing and type filtering, the possible centers of reduce_graph."""
+    if collapse:
+        elements = collapse_to_datasets(elements)
+    if types:
+        elements = filter_node_types(elements, types)
+    return {el["data"]["id"]: f'{el["data"]["label"]} ({el["data"]["type"]})' for el in elements if "source" not in el["data"]}
+
+
+def reduce_graph(elements: list[dict], collapse: bool = True, types: Iterable[str] | None = None,
+                 center: str | None = None, hops: int = 2, max_nodes: int | None = None) -> list[dict]:
+    """Level-of-detail view of the graph with precomputed positions (for a Cytoscape preset layout).
+    A center folded into a dataset is replaced by that dataset."""
+    if collapse:
+        center = dataset_members(elements).get(center, center) if center else center
+        elements = collapse_to_datasets(elements)
+    if types:
+        elements = filter_node_types(elements, types)
+    if center:
+        elements = neighborhood(elements, center, hops)
+    if max_nodes:
+        elements = top_nodes(elements, max_nodes)
+    positions = layered_layout(elements)
+    return [{**el, "position": positions[el["data"]["id"]]} if "source" not in el["data"] else el
+            for el in elements]
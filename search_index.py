@@ -0,0 +1,177 @@
+import re
+from bisect import bisect_left
+from heapq import nsmallest
+from typing import Iterable
+
+from pandas import DataFrame
+
+# searchable columns and their weight in the ranking
+METRIC_SEARCH_FIELDS = {"title": 3.0, "tags": 2.0, "description": 1.0, "maql": 1.0}
+VISUAL_SEARCH_FIELDS = {"title": 3.0, "tags": 2.0, "description": 1.0}
+# score multipliers per kind of match of a query term
+EXACT_MATCH = 4.0
+PREFIX_MATCH = 2.0
+SUBSTRING_MATCH = 1.0
+# fuzzy matching kicks in for terms without any other match
+FUZZY_MIN_LENGTH = 4
+FUZZY_MIN_SIMILARITY = 0.45
+# per-term match sets kept for repeated queries (reruns, extended queries)
+TIER_CACHE_SIZE = 256
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _text(value) -> str:
+    if value is None or value != value:  # None or NaN
+        return ""
+    if isinstance(value, (list, tuple, set)):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Inverted index over text columns of a DataFrame (titles, descriptions, tags, MAQL).
+
+    Built once per workspace bundle; search() answers prefix, substring and fuzzy queries from
+    token postings, a sorted vocabulary (prefixes) and a trigram index of the vocabulary (substrings,
+    similar tokens) instead of scanning the frame. Query terms are word tokens, so a substring match
+    is always inside one token and only the vocabulary, not the rows, has to be checked.
+    Results are row positions of the indexed frame, best match first.
+    """
+
+    def __init__(self, texts: dict[str, list[str]], weights: dict[str, float]):
+        self.weights = weights
+        self.size = len(next(iter(texts.values()))) if texts else 0
+        self._postings = {}  # field -> token -> set of rows
+        self._vocab = {}  # field -> sorted tokens
+        self._token_grams = {}  # padded trigram -> set of tokens (all fields)
+        self._tier_cache = {}  # (term, fields, fuzzy) -> match tiers, oldest first
+        for field, values in texts.items():
+            postings = {}
+            for row, text in enumerate(values):
+                for token in _TOKEN_RE.findall(text):
+                    postings.setdefault(token, set()).add(row)
+            self._postings[field] = postings
+            self._vocab[field] = sorted(postings)
+            for token in postings:
+                for gram in _trigrams(f"${token}$"):
+                    self._token_grams.setdefault(gram, set()).add(token)
+
+    @classmethod
+    def from_frame(cls, df: DataFrame, fields: dict[str, float]) -> "SearchIndex":
+        fields = {f: w for f, w in fields.items() if f in df.columns}
+        return cls({f: [_text(v).lower() for v in df[f].tolist()] for f in fields}, fields)
+
+    def _substring_tokens(self, term: str) -> list[str]:
+        # tokens containing the term (3+ characters): intersect the trigram postings, then verify
+        grams = sorted((self._token_grams.get(g, set()) for g in _trigrams(term)), key=len)
+        if not grams or not grams[0]:
+            return []
+        return [token for token in grams[0].intersection(*grams[1:]) if term in token]
+
+    def _prefix_rows(self, field: str, term: str) -> set:
+        vocab = self._vocab[field]
+        postings = self._postings[field]
+        tokens = []
+        for i in range(bisect_left(vocab, term), len(vocab)):
+            if not vocab[i].startswith(term):
+                break
+            tokens.append(postings[vocab[i]])
+        return set().union(*tokens)
+
+    def _fuzzy_tokens(self, term: str) -> dict[str, float]:
+        # tokens sharing enough trigrams with the term (Jaccard similarity of padded trigram sets)
+        term_grams = _trigrams(f"${term}$")
+        shared = {}
+        for gram in term_grams:
+            for token in self._token_grams.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        similar = {}
+        for token, count in shared.items():
+            similarity = count / (len(term_grams) + len(token) - count)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                similar[token] = similarity
+        return similar
+
+    def _tiers(self, term: str, fields: tuple, fuzzy: bool) -> list[tuple[float, set]]:
+        """[(score, rows)] of the term per field and kind of match, best score first and disjoint
+        (a row is only in the tier of its best match)."""
+        key = (term, fields, fuzzy)
+        tiers = self._tier_cache.get(key)
+        if tiers is not None:
+            return tiers
+        tiers = []
+        substring_tokens = self._substring_tokens(term) if len(term) >= 3 else []
+        for field in fields:
+            weight = self.weights[field]
+            postings = self._postings[field]
+            exact = postings.get(term, set())
+            prefix = self._prefix_rows(field, term)
+            tiers.append((weight * EXACT_MATCH, exact))
+            tiers.append((weight * PREFIX_MATCH, prefix - exact))
+            if substring_tokens:
+                substring = set().union(*(postings.get(token, ()) for token in substring_tokens))
+                tiers.append((weight * SUBSTRING_MATCH, substring - prefix))
+        tiers = [(score, rows) for score, rows in tiers if rows]
+        if not tiers and fuzzy and len(term) >= FUZZY_MIN_LENGTH:
+            for token, similarity in self._fuzzy_tokens(term).items():
+                for field in fields:
+                    rows = self._postings[field].get(token)
+                    if rows:
+                        tiers.append((self.weights[field] * SUBSTRING_MATCH * similarity, rows))
+        tiers.sort(key=lambda tier: -tier[0])
+        seen = set()
+        disjoint = []
+        for score, rows in tiers:
+            rows = rows - seen
+            if rows:
+                seen |= rows
+                disjoint.append((score, rows))
+        tiers = disjoint
+        if len(self._tier_cache) >= TIER_CACHE_SIZE:
+            self._tier_cache.pop(next(iter(self._tier_cache)), None)
+        self._tier_cache[key] = tiers
+        return tiers
+
+    def search(self, query: str, fields: Iterable[str] | None = None, fuzzy: bool = True,
+               limit: int | None = None) -> list[int]:
+        """Row positions matching every term of the query in any of the fields, best first.
+        A term matches a whole token, a token prefix, a substring (3+ characters) or, when nothing
+        else matches, similar tokens (fuzzy, 4+ characters). A row scores the best match of each term."""
+        terms = sorted(set(_TOKEN_RE.findall(query.lower())))
+        fields = tuple(f for f in (fields or self.weights) if f in self.weights)
+        if not terms or not fields:
+            return list(range(self.size))[:limit]
+        term_tiers = [self._tiers(term, fields, fuzzy) for term in terms]
+        # split the matching rows into buckets of equal total score with set intersections only,
+        # starting from the term with the fewest matches
+        term_tiers.sort(key=lambda tiers: sum(len(rows) for _, rows in tiers))
+        buckets = {}
+        for score, rows in term_tiers[0]:
+            buckets[score] = buckets.get(score, set()) | rows
+        for tiers in term_tiers[1:]:
+            regrouped = {}
+            for total, rows in buckets.items():
+                for score, tier_rows in tiers:
+                    hit = rows & tier_rows
+                    if hit:
+                        regrouped[total + score] = regrouped.get(total + score, set()) | hit
+            buckets = regrouped
+        ranked = []
+        for total in sorted(buckets, reverse=True):
+            rows = buckets[total]
+            ranked.extend(sorted(rows) if limit is None else nsmallest(limit - len(ranked), rows))
+            if limit is not None and len(ranked) >= limit:
+                break
+        return ranked
+
+    def stats(self) -> dict:
+        return {
+            "rows": self.size,
+            "tokens": sum(len(v) for v in self._vocab.values()),
+            "trigrams": len(self._token_grams),
+        }
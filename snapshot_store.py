@@ -0,0 +1,141 @@
+import json
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from time import time
+
+import pyarrow as pa
+from gooddata_sdk.catalog.workspace.declarative_model.workspace.analytics_model.analytics_model import \
+    CatalogDeclarativeAnalyticsLayer
+from pandas import DataFrame
+
+# bump when the layout of a snapshot changes, older snapshots are then ignored
+SNAPSHOT_FORMAT = 2
+DEFAULT_SNAPSHOT_ROOT = Path.cwd() / ".gooddata_cache" / "snapshots"
+# bundle keys added by load(), describing the snapshot itself
+SNAPSHOT_KEYS = ("snapshot_saved_at", "snapshot_fingerprint")
+
+
+def _json_columns(df: DataFrame) -> list[str]:
+    # object columns holding anything but plain strings (tags lists, definitions, mixed flags) go as JSON text
+    json_cols = []
+    for col in df.columns:
+        if df[col].dtype == object and any(v is not None and not isinstance(v, str) for v in df[col].tolist()):
+            json_cols.append(col)
+    return json_cols
+
+
+def write_frame(df: DataFrame, path: Path):
+    """Write a DataFrame as an Arrow IPC file (JSON-encoding nested object columns)."""
+    json_cols = _json_columns(df)
+    if json_cols:
+        df = df.copy()
+        for col in json_cols:
+            df[col] = [None if v is None else json.dumps(v, default=str) for v in df[col].tolist()]
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           b"json_columns": json.dumps(json_cols).encode()})
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_frame(path: Path) -> DataFrame:
+    """Read an Arrow IPC file written by write_frame into a DataFrame (a copy of the data, not a view of the file)."""
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    json_cols = json.loads((table.schema.metadata or {}).get(b"json_columns", b"[]"))
+    df = table.to_pandas()
+    for col in json_cols:
+        df[col] = [None if v is None else json.loads(v) for v in df[col].tolist()]
+    return df
+
+
+class SnapshotStore:
+    """On-disk snapshots of workspace bundles (see app.load_workspace_bundle).
+
+    DataFrames are stored as Arrow IPC files, the analytics layer as its declarative JSON and the
+    remaining small values in meta.json, together with the model fingerprint of the workspace taken
+    before the bundle was loaded. One directory per host and workspace.
+    """
+
+    def __init__(self, root: Path = DEFAULT_SNAPSHOT_ROOT):
+        self.root = Path(root)
+
+    def path(self, host: str, ws_id: str) -> Path:
+        host_slug = re.sub(r"[^a-zA-Z0-9_.-]", "_", host.split("://")[-1])
+        return self.root / host_slug / ws_id
+
+    def saved_at(self, host: str, ws_id: str) -> float | None:
+        meta = self._read_meta(self.path(host, ws_id))
+        return meta.get("saved_at") if meta else None
+
+    def save(self, host: str, ws_id: str, bundle: dict, exclude: tuple = (), fingerprint: str = "") -> Path:
+        """Write the bundle, leaving out the keys in exclude (values derived on load).
+        fingerprint is the model version the bundle was loaded at (see WorkspaceCache)."""
+        target = self.path(host, ws_id)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # unique per save, concurrent saves of one workspace (background refresh, crawler) do not share it
+        tmp = Path(tempfile.mkdtemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent))
+        meta = {"format": SNAPSHOT_FORMAT, "saved_at": time(), "fingerprint": fingerprint, "frames": [], "values": {}}
+        for key, value in bundle.items():
+            if key in exclude or key in SNAPSHOT_KEYS:
+                continue
+            if isinstance(value, DataFrame):
+                write_frame(value, tmp / f"{key}.arrow")
+                meta["frames"].append(key)
+            elif isinstance(value, CatalogDeclarativeAnalyticsLayer):
+                (tmp / f"{key}.json").write_text(json.dumps(value.to_dict(), default=str))
+                meta["analytics"] = key
+            else:
+                meta["values"][key] = value
+        (tmp / "meta.json").write_text(json.dumps(meta, default=str))
+        # swap the complete snapshot in place of the previous one, the last save wins
+        try:
+            shutil.rmtree(target, ignore_errors=True)
+            tmp.rename(target)
+        except OSError as ex:
+            # another save put its snapshot in place in between
+            print(f"snapshot {target} replaced concurrently, dropping this one: {ex}")
+            shutil.rmtree(tmp, ignore_errors=True)
+        return target
+
+    def load(self, host: str, ws_id: str) -> dict | None:
+        """The stored bundle with its snapshot_saved_at and snapshot_fingerprint, None when there is none."""
+        target = self.path(host, ws_id)
+        meta = self._read_meta(target)
+        if not meta or meta.get("format") != SNAPSHOT_FORMAT:
+            return None
+        try:
+            bundle = dict(meta["values"])
+            for key in meta["frames"]:
+                bundle[key] = read_frame(target / f"{key}.arrow")
+            if meta.get("analytics"):
+                key = meta["analytics"]
+                bundle[key] = CatalogDeclarativeAnalyticsLayer.from_dict(json.loads((target / f"{key}.json").read_text()))
+        except Exception as ex:
+            print(f"snapshot {target} could not be loaded: {ex}")
+            return None
+        bundle["snapshot_saved_at"] = meta["saved_at"]
+        bundle["snapshot_fingerprint"] = meta.get("fingerprint", "")
+        return bundle
+
+    def load_frame(self, host: str, ws_id: str, key: str) -> DataFrame | None:
+        """A single DataFrame of a snapshot (without parsing the rest of it)."""
+        target = self.path(host, ws_id)
+        meta = self._read_meta(target)
+        if not meta or meta.get("format") != SNAPSHOT_FORMAT or key not in meta["frames"]:
+            return None
+        try:
+            return read_frame(target / f"{key}.arrow")
+        except Exception as ex:
+            print(f"snapshot frame {target / key} could not be loaded: {ex}")
+            return None
+
+    @staticmethod
+    def _read_meta(target: Path) -> dict | None:
+        try:
+            return json.loads((target / "meta.json").read_text())
+        except (OSError, ValueError):
+            return None
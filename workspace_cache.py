@@ -0,0 +1,191 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from itertools import islice
+from sys import getsizeof
+from threading import Lock
+from time import time
+from typing import Callable
+
+from attrs import fields, has
+
+from pandas import DataFrame
+
+# items measured per container by estimate_size, and how deep it looks
+SIZE_SAMPLE = 20
+SIZE_DEPTH = 8
+# seconds a workspace model fingerprint is trusted before it is checked again
+FINGERPRINT_TTL = 30
+
+
+def estimate_size(obj, sample: int = SIZE_SAMPLE, depth: int = SIZE_DEPTH) -> int:
+    """Cheap approximate size of a cached value in bytes.
+
+    DataFrames are measured (deep), containers and SDK (attrs) objects are estimated from a sample of
+    their items scaled to their length, so large analytics layers are not walked or serialized in full.
+    """
+    if isinstance(obj, DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if obj is None or isinstance(obj, (str, bytes, int, float, bool)) or depth <= 0:
+        return getsizeof(obj)
+    if isinstance(obj, dict):
+        items = list(islice(obj.items(), sample))
+        part = sum(estimate_size(k, sample, depth - 1) + estimate_size(v, sample, depth - 1) for k, v in items)
+        return getsizeof(obj) + (part * len(obj) // len(items) if items else 0)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        items = list(islice(obj, sample))
+        part = sum(estimate_size(v, sample, depth - 1) for v in items)
+        return getsizeof(obj) + (part * len(obj) // len(items) if items else 0)
+    if has(type(obj)):
+        return getsizeof(obj) + sum(estimate_size(getattr(obj, f.name, None), sample, depth - 1) for f in fields(type(obj)))
+    return getsizeof(obj)
+
+
+class WorkspaceCache:
+    """Process-wide cache of workspace bundles shared by all browser sessions.
+
+    Entries are keyed by (host, workspace_id, model version), evicted least-recently-used once the
+    total size exceeds max_bytes and expire after ttl seconds. The model version combines
+    fingerprint(host, workspace_id) - checked at most every fingerprint_ttl seconds, so edits made
+    outside the app start a new version - with a counter bumped by invalidate(). Loading is
+    single-flight: concurrent requests for the same key wait for the one running loader instead of
+    fetching again. Entries are shared between sessions and must not be mutated once stored. The
+    newest entry dropped by a version change stays available through latest(), as the base of an
+    incremental refresh of the new version.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 2**20, ttl: float = 3600, fingerprint: Callable | None = None,
+                 fingerprint_ttl: float = FINGERPRINT_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.fingerprint = fingerprint
+        self.fingerprint_ttl = fingerprint_ttl
+        self._entries = OrderedDict()  # key -> (value, size, loaded_at)
+        self._loading = {}  # key -> Future
+        self._versions = {}  # (host, workspace_id) -> local refresh counter
+        self._fingerprints = {}  # (host, workspace_id) -> (fingerprint, checked_at)
+        self._superseded = {}  # (host, workspace_id) -> newest value of an older version
+        self._lock = Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _fingerprint(self, host: str, ws_id: str) -> str:
+        if self.fingerprint is None:
+            return ""
+        with self._lock:
+            known = self._fingerprints.get((host, ws_id))
+        if known and time() - known[1] < self.fingerprint_ttl:
+            return known[0]
+        try:
+            current = self.fingerprint(host, ws_id)
+        except Exception as ex:
+            # keep serving the last known version rather than reloading on every network hiccup
+            print(f"model version of workspace {ws_id} not available: {ex}")
+            current = known[0] if known else ""
+        with self._lock:
+            self._fingerprints[(host, ws_id)] = (current, time())
+            if known and known[0] != current:
+                # the model changed, entries of the old version can not be served anymore
+                self._supersede(host, ws_id)
+        return current
+
+    def version(self, host: str, ws_id: str) -> tuple:
+        fingerprint = self._fingerprint(host, ws_id)
+        with self._lock:
+            return fingerprint, self._versions.get((host, ws_id), 0)
+
+    def key(self, host: str, ws_id: str) -> tuple:
+        return host, ws_id, self.version(host, ws_id)
+
+    def invalidate(self, host: str, ws_id: str) -> tuple:
+        """Start a new model version of the workspace and drop the entries of the older ones."""
+        with self._lock:
+            self._versions[(host, ws_id)] = self._versions.get((host, ws_id), 0) + 1
+            self._fingerprints.pop((host, ws_id), None)
+            self._supersede(host, ws_id)
+        return self.version(host, ws_id)
+
+    def latest(self, host: str, ws_id: str):
+        """The most recently loaded value of the workspace, of any version (None when there is none)."""
+        with self._lock:
+            entries = [entry for key, entry in self._entries.items() if key[:2] == (host, ws_id)]
+            if entries:
+                return max(entries, key=lambda entry: entry[2])[0]
+            superseded = self._superseded.get((host, ws_id))
+            return superseded[0] if superseded else None
+
+    def get(self, key: tuple):
+        with self._lock:
+            return self._get(key)
+
+    def get_or_load(self, key: tuple, loader):
+        """Return the cached value for key, calling loader() at most once across all waiting callers."""
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                return value
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = self._loading[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            value = loader()
+        except Exception as ex:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(ex)
+            raise
+        self.put(key, value)
+        with self._lock:
+            del self._loading[key]
+        future.set_result(value)
+        return value
+
+    def put(self, key: tuple, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time())
+            self._superseded.pop(key[:2], None)
+            self.total_bytes += size
+            # evict least recently used entries, always keep the newest one
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time() - entry[2] > self.ttl:
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def _supersede(self, host: str, ws_id: str):
+        # drop the entries of the workspace, keeping the newest one for latest()
+        keys = [k for k in self._entries if k[:2] == (host, ws_id)]
+        if keys:
+            newest = max(keys, key=lambda k: self._entries[k][2])
+            self._superseded[(host, ws_id)] = self._entries[newest]
+        for key in keys:
+            self._drop(key)
+
+    def _drop(self, key: tuple):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size